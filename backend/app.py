@@ -1,50 +1,122 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g, stream_with_context
 from flask_cors import CORS
 from datetime import datetime
 import json
 import os
+import time
 from dotenv import load_dotenv
+from src.serialization import FastJSONProvider, encode_note_rows, stream_note_rows
+from src.compression import init_compression
+from src.metrics import init_metrics
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
-# Configure CORS for Vercel deployment
-CORS(app, origins=[
+# Configure CORS for Vercel deployment (asgi.py applies the same origins to its async routes)
+CORS_ORIGINS = [
     "http://localhost:3000",
     "https://*.vercel.app",
     "https://note-taking-app-*.vercel.app"
-])
+]
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor', 'X-Change-Cursor', 'ETag', 'Server-Timing']
+CORS(app, origins=CORS_ORIGINS, expose_headers=CORS_EXPOSE_HEADERS)
+
+# gzip/brotli for large JSON bodies and streamed lists (COMPRESSION_* variables)
+init_compression(app)
+
+# Per-route latency, DB time and query counts, LLM usage: Server-Timing header and GET /metrics
+init_metrics(app)
 
 # Try to import database modules, fallback if not available
 try:
-    from models import Note, SessionLocal
-    from src.llm import translate_text, generate_structured_notes
+    from sqlalchemy import func, select
+    from models import Note, LLMCacheEntry, Job, Tag, NoteTag, SessionLocal, NOTE_FIELDS, note_row_to_dict
+    from models import NoteChange, NoteEmbedding, NoteSignature, NoteBucket, get_engine
+    from models import index_inserted_notes, index_written_notes, index_deleted_notes
+    from src.llm import translate_text, generate_structured_notes, set_response_cache
+    from src.llm import stream_translate_text, stream_structured_notes
+    from src.llm_cache import LLMCache
+    from src.search import ranked_search
+    from src.pagination import encode_cursor, keyset_page, parse_fields, parse_limit
+    from src.pool import pool_metrics
+    from src.slow_queries import slow_query_log
+    from src.events import events_between, parse_event_limit, parse_event_range
+    from src.vector_index import NUMPY_AVAILABLE, VectorIndex, embed_pending, search_without_index
+    from src.near_duplicates import (
+        DEFAULT_DUPLICATE_THRESHOLD, DEFAULT_SIMILAR_THRESHOLD, duplicate_clusters, parse_threshold, similar_notes
+    )
+    from src.batch_translate import run_batch as run_batch_translation
+    from src.jobs import FINISHED_STATUSES, enqueue, validate_job
+    from src.bulk import export_ndjson, import_ndjson
+    from src.tags import normalize_tags, parse_tags, tag_counts, tag_filters
+    from src.http_cache import make_etag, version_etag, if_match_version, is_not_modified, not_modified, with_etag
+    from src.note_updates import NoteConflict, parse_note_patch, parse_version, patch_note
+    from src.note_batch import BatchRaced, count_statuses, parse_operations, run_batch as run_note_batch
+    from src.sync import changes_since, current_seq, parse_changes_limit, parse_since
     DATABASE_AVAILABLE = True
 except ImportError as e:
     print(f"Database modules not available: {e}")
     DATABASE_AVAILABLE = False
     Note = None
+    Job = None
     SessionLocal = None
     translate_text = None
     generate_structured_notes = None
+    stream_translate_text = None
+    stream_structured_notes = None
+    ranked_search = None
+    run_batch_translation = None
+    slow_query_log = None
+
+# Cache translate/generate responses in memory and in the llm_cache table
+llm_cache = None
+if DATABASE_AVAILABLE and os.getenv('LLM_CACHE_ENABLED', 'true').lower() != 'false':
+    llm_cache = LLMCache.from_env(session_factory=SessionLocal, entry_model=LLMCacheEntry)
+    set_response_cache(llm_cache)
+
+# Without a separate `python worker.py`, queued jobs can be run by this process
+if DATABASE_AVAILABLE and os.getenv('JOB_WORKER_IN_PROCESS', 'false').lower() == 'true':
+    from worker import Worker
+    Worker().start_in_thread()
+
+# Semantic search keeps note vectors in memory when NumPy is installed
+semantic_index = None
+if DATABASE_AVAILABLE and NUMPY_AVAILABLE:
+    semantic_index = VectorIndex(SessionLocal, Note.__table__, NoteEmbedding.__table__, NoteChange.__table__)
 
 def get_db():
+    """
+    Session for the current request, created on first use and closed by
+    close_db() when the app context tears down. No connection is checked out
+    of the pool until the session first talks to the database.
+    """
     if not DATABASE_AVAILABLE or not SessionLocal:
         return None
-    db = SessionLocal()
-    try:
-        return db
-    finally:
-        pass
+    if 'db' not in g:
+        g.db = SessionLocal()
+    return g.db
 
-def close_db(db):
-    if db:
+@app.teardown_appcontext
+def close_db(exception=None):
+    db = g.pop('db', None)
+    if db is not None:
+        if exception is not None:
+            db.rollback()
         db.close()
 
+def notes_version(db):
+    """(newest updated_at, row count): changes whenever a note is created, edited or deleted"""
+    return db.query(func.max(Note.updated_at), func.count(Note.id)).one()
+
 @app.route('/notes', methods=['GET'])
 def get_notes():
+    """
+    List notes, optionally paged with ?limit=&cursor=, projected with ?fields=
+    and filtered with ?tag=a&tag=b (notes carrying every given tag)
+    """
     if not DATABASE_AVAILABLE:
         # Return sample data when database is not available
         sample_notes = [
@@ -71,10 +143,52 @@ def get_notes():
     
     db = get_db()
     try:
-        notes = db.query(Note).order_by(Note.updated_at.desc()).all()
-        return jsonify([note.to_dict() for note in notes])
-    finally:
-        close_db(db)
+        fields = parse_fields(request.args.get('fields'), NOTE_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    etag = make_etag('notes', *notes_version(db), request.query_string.decode())
+    if is_not_modified(etag):
+        return not_modified(etag)
+    
+    # Read before the notes: changes racing with this request are replayed by
+    # GET /notes/changes rather than missed
+    change_cursor = str(current_seq(db, NoteChange.__table__))
+    
+    # The sort key is always selected so a cursor can be built from the last row
+    selected = fields + [name for name in ('updatedAt', 'id') if name not in fields]
+    query = select(*[NOTE_FIELDS[name] for name in selected])
+    tags = normalize_tags(request.args.getlist('tag'))
+    if tags:
+        query = query.where(*tag_filters(db, Note.id, Tag.__table__, NoteTag.__table__, tags))
+    
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        # The whole table: stream it in batches rather than building the array in memory
+        statement = query.order_by(Note.updated_at.desc(), Note.id.desc())
+        # The stream reads on its own session; release this one's pooled connection now
+        db.close()
+        body = stream_with_context(stream_note_rows(SessionLocal, statement, fields))
+        return notes_response(body, etag, change_cursor)
+    
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        rows = db.execute(keyset_page(query, Note, request.args.get('cursor'), limit)).all()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = notes_response(encode_note_rows(rows[:limit], fields), etag, change_cursor)
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        response.headers['X-Next-Cursor'] = encode_cursor(
+            last[selected.index('updatedAt')], last[selected.index('id')]
+        )
+    return response
+
+def notes_response(body, etag, change_cursor):
+    """Note list response from pre-encoded JSON bytes or a stream of them"""
+    response = with_etag(app.response_class(body, mimetype='application/json'), etag)
+    response.headers['X-Change-Cursor'] = change_cursor
+    return response
 
 @app.route('/notes', methods=['POST'])
 def create_note():
@@ -92,19 +206,152 @@ def create_note():
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 400
-    finally:
-        close_db(db)
+
+@app.route('/tags', methods=['GET'])
+def list_tags():
+    """Tags in use with their note counts, most used first"""
+    if not DATABASE_AVAILABLE:
+        return jsonify([])
+    
+    db = get_db()
+    etag = make_etag('tags', *notes_version(db))
+    if is_not_modified(etag):
+        return not_modified(etag)
+    return with_etag(jsonify(tag_counts(db, Tag.__table__, NoteTag.__table__)), etag)
+
+@app.route('/events', methods=['GET'])
+def list_events():
+    """
+    Notes with an event date in ?from=..&to= (inclusive ISO dates; from
+    defaults to today, to to 30 days later), soonest first, as compact
+    {id, title, eventDate, eventTime} records. ?limit= caps the count
+    (default 200, max 1000); hasMore says whether the range held more.
+    """
+    if not DATABASE_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    try:
+        first, last = parse_event_range(request.args.get('from'), request.args.get('to'))
+        limit = parse_event_limit(request.args.get('limit'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    events, has_more = events_between(get_db(), Note.__table__, first, last, limit)
+    return jsonify({'events': events, 'hasMore': has_more})
+
+@app.route('/notes/changes', methods=['GET'])
+def get_note_changes():
+    """
+    Notes created or updated and ids deleted since ?since=<cursor>, in change
+    order, projected with ?fields=. Start from the X-Change-Cursor of GET /notes
+    (or 0) and pass back the returned cursor; repeat while hasMore.
+    """
+    if not DATABASE_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    
+    try:
+        since = parse_since(request.args.get('since'))
+        limit = parse_changes_limit(request.args.get('limit'))
+        fields = parse_fields(request.args.get('fields'), NOTE_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Clients match deltas to cached notes by id
+    if 'id' not in fields:
+        fields = ['id'] + fields
+    db = get_db()
+    columns = {name: NOTE_FIELDS[name] for name in fields}
+    changes = changes_since(db, NoteChange.__table__, Note.__table__, columns, note_row_to_dict, since, limit)
+    return jsonify(changes)
+
+@app.route('/notes/export', methods=['GET'])
+def export_notes():
+    """Stream every note as NDJSON, in id order, without loading the table into memory"""
+    if not DATABASE_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    
+    columns = {name: column for name, column in NOTE_FIELDS.items() if name != 'preview'}
+    return Response(
+        stream_with_context(export_ndjson(SessionLocal, columns, Note.id, note_row_to_dict)),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename="notes.ndjson"'}
+    )
+
+@app.route('/notes/import', methods=['POST'])
+def import_notes():
+    """
+    Insert notes from an NDJSON body (one note per line, as exported), in
+    batches. Ids in the input are ignored; invalid lines are skipped and
+    reported. Returns counts and throughput.
+    """
+    if not DATABASE_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    
+    db = get_db()
+    try:
+        summary = import_ndjson(db, Note.__table__, request.stream, after_insert=index_inserted_notes)
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': f'Import failed: {str(e)}'}), 500
+    
+    return jsonify(summary), 200 if summary['imported'] or not summary['failed'] else 400
+
+@app.route('/notes/batch', methods=['POST'])
+def batch_notes():
+    """
+    Apply {"operations": [{"op": "create", "note": {...}}, {"op": "update",
+    "id": 1, "note": {...}, "version": 2}, {"op": "delete", "id": 3}, ...]}
+    in one transaction with set-based SQL. Returns one result per operation;
+    operations that cannot apply are skipped unless "atomic": true, which
+    rolls back the whole batch instead.
+    """
+    if not DATABASE_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    
+    data = request.get_json(silent=True)
+    try:
+        operations = parse_operations(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    atomic = data.get('atomic') is True
+    
+    def index_batch(conn, written, note_tags, deleted):
+        index_written_notes(conn, written, note_tags)
+        index_deleted_notes(conn, deleted)
+    
+    db = get_db()
+    try:
+        results = run_note_batch(db.connection(), Note.__table__, operations,
+                                 lambda row: Note(**row._mapping).to_dict(), atomic, after_write=index_batch)
+        counts = count_statuses(results)
+        applied = sum(counts.get(status, 0) for status in ('created', 'updated', 'deleted'))
+        if atomic and applied < len(results):
+            db.rollback()
+            return jsonify({'results': results, 'counts': counts}), 409 if 'conflict' in counts else 400
+        db.commit()
+    except BatchRaced as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': f'Batch failed: {str(e)}'}), 500
+    
+    return jsonify({'results': results, 'counts': counts}), 200 if applied else 400
 
 @app.route('/notes/<int:note_id>', methods=['GET'])
 def get_note(note_id):
     db = get_db()
-    try:
-        note = db.query(Note).filter(Note.id == note_id).first()
-        if not note:
-            return jsonify({'error': 'Note not found'}), 404
-        return jsonify(note.to_dict())
-    finally:
-        close_db(db)
+    note = db.query(Note).filter(Note.id == note_id).first()
+    if not note:
+        return jsonify({'error': 'Note not found'}), 404
+    
+    etag = note_etag(note)
+    if is_not_modified(etag):
+        return not_modified(etag)
+    return with_etag(jsonify(note.to_dict()), etag)
+
+def note_etag(note):
+    """Version-led ETag for one note, usable as If-Match on PATCH"""
+    return version_etag(note.id, note.version, 'note', note.updated_at.isoformat())
 
 @app.route('/notes/<int:note_id>', methods=['PUT'])
 def update_note(note_id):
@@ -117,7 +364,8 @@ def update_note(note_id):
         data = request.get_json()
         note.title = data.get('title', note.title)
         note.content = data.get('content', note.content)
-        note.tags = json.dumps(data.get('tags', []))
+        if 'tags' in data:
+            note.tags = json.dumps(normalize_tags(data['tags']))
         note.updated_at = datetime.utcnow()
         
         db.commit()
@@ -125,8 +373,49 @@ def update_note(note_id):
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 400
-    finally:
-        close_db(db)
+
+@app.route('/notes/<int:note_id>', methods=['PATCH'])
+def patch_note_fields(note_id):
+    """
+    Update only the fields in the body (title, content, tags, eventDate,
+    eventTime) with one conditional UPDATE. Name the version being edited with
+    If-Match (the note's ETag) or "version" in the body; a stale one gets
+    412 / 409 with the current note.
+    """
+    if not DATABASE_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    
+    data = request.get_json(silent=True)
+    try:
+        values = parse_note_patch(data)
+        body_version = parse_version(data.get('version'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not values:
+        return jsonify({'error': 'No fields to update'}), 400
+    try:
+        header_version = if_match_version(note_id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 412
+    
+    db = get_db()
+    try:
+        row = patch_note(db.connection(), Note.__table__, note_id, values,
+                         header_version if header_version is not None else body_version)
+        if row is None:
+            return jsonify({'error': 'Note not found'}), 404
+        index_written_notes(db.connection(), [note_id],
+                            {note_id: parse_tags(values['tags'])} if 'tags' in values else None)
+        db.commit()
+    except NoteConflict as e:
+        db.rollback()
+        return jsonify({'error': str(e), 'note': Note(**e.current).to_dict()}), 412 if header_version is not None else 409
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 400
+    
+    note = Note(**row)
+    return with_etag(jsonify(note.to_dict()), note_etag(note))
 
 @app.route('/notes/<int:note_id>', methods=['DELETE'])
 def delete_note(note_id):
@@ -142,24 +431,109 @@ def delete_note(note_id):
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 400
-    finally:
-        close_db(db)
 
 @app.route('/notes/search', methods=['GET'])
 def search_notes():
     db = get_db()
+    query = request.args.get('q', '')
+    if not query:
+        return jsonify([])
+    
+    limit = min(request.args.get('limit', 50, type=int), 200)
+    notes = ranked_search(db, Note, query, limit=limit)
+    
+    return jsonify([note.to_dict() for note in notes])
+
+@app.route('/notes/semantic-search', methods=['GET'])
+def semantic_search_notes():
+    """
+    Notes closest in meaning to ?q=, best first, each with its cosine
+    similarity as `score`; ?limit= defaults to 10 (max 100)
+    """
+    if not DATABASE_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify([])
+    
+    limit = max(1, min(request.args.get('limit', 10, type=int), 100))
     try:
-        query = request.args.get('q', '')
-        if not query:
-            return jsonify([])
-        
-        notes = db.query(Note).filter(
-            Note.title.contains(query) | Note.content.contains(query)
-        ).order_by(Note.updated_at.desc()).all()
-        
-        return jsonify([note.to_dict() for note in notes])
-    finally:
-        close_db(db)
+        if semantic_index is not None:
+            matches = semantic_index.search(query, limit)
+        else:
+            embed_pending(SessionLocal, Note.__table__, NoteEmbedding.__table__)
+            matches = search_without_index(get_db(), NoteEmbedding.__table__, query, limit)
+    except Exception as e:
+        return jsonify({'error': f'Semantic search failed: {str(e)}'}), 500
+    
+    fields = [name for name in NOTE_FIELDS if name != 'preview']
+    rows = get_db().execute(
+        select(*[NOTE_FIELDS[name] for name in fields]).where(Note.id.in_([note_id for note_id, _ in matches]))
+    ).all()
+    notes = {row.id: note_row_to_dict(row, fields) for row in rows}
+    return jsonify([{**notes[note_id], 'score': score} for note_id, score in matches if note_id in notes])
+
+DUPLICATE_NOTE_FIELDS = ['id', 'title', 'updatedAt']
+
+def compact_notes(db, note_ids):
+    """{id: {id, title, updatedAt}} for the given notes"""
+    rows = db.execute(
+        select(*[NOTE_FIELDS[name] for name in DUPLICATE_NOTE_FIELDS]).where(Note.id.in_(note_ids))
+    ).all()
+    return {row.id: note_row_to_dict(row, DUPLICATE_NOTE_FIELDS) for row in rows}
+
+@app.route('/notes/<int:note_id>/similar', methods=['GET'])
+def get_similar_notes(note_id):
+    """
+    Near-duplicates of a note, most similar first, as {id, title, updatedAt}
+    with the estimated Jaccard `similarity` of their word shingles.
+    ?threshold= defaults to 0.7, ?limit= to 20 (max 100)
+    """
+    if not DATABASE_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    try:
+        threshold = parse_threshold(request.args.get('threshold'), DEFAULT_SIMILAR_THRESHOLD)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    
+    db = get_db()
+    if db.get(Note, note_id) is None:
+        return jsonify({'error': 'Note not found'}), 404
+    matches = similar_notes(db.connection(), NoteSignature.__table__, NoteBucket.__table__, note_id, threshold, limit)
+    notes = compact_notes(db, [match_id for match_id, _ in matches])
+    return jsonify([{**notes[match_id], 'similarity': score} for match_id, score in matches if match_id in notes])
+
+@app.route('/notes/duplicates', methods=['GET'])
+def get_duplicate_notes():
+    """
+    Clusters of near-duplicate notes, largest first: {clusters: [{notes,
+    minSimilarity}], totalClusters, duplicateNotes}. ?threshold= defaults
+    to 0.8, ?limit= caps the clusters returned (default 50, max 500)
+    """
+    if not DATABASE_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    try:
+        threshold = parse_threshold(request.args.get('threshold'), DEFAULT_DUPLICATE_THRESHOLD)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    limit = max(1, min(request.args.get('limit', 50, type=int), 500))
+    
+    db = get_db()
+    clusters = duplicate_clusters(db.connection(), NoteSignature.__table__, NoteBucket.__table__, threshold)
+    shown = clusters[:limit]
+    notes = compact_notes(db, [note_id for cluster in shown for note_id in cluster['ids']])
+    return jsonify({
+        'clusters': [
+            {
+                'notes': [notes[note_id] for note_id in cluster['ids'] if note_id in notes],
+                'minSimilarity': cluster['minSimilarity'],
+            }
+            for cluster in shown
+        ],
+        'totalClusters': len(clusters),
+        'duplicateNotes': sum(len(cluster['ids']) for cluster in clusters),
+    })
 
 @app.route('/notes/<int:note_id>/translate', methods=['POST'])
 def translate_note(note_id):
@@ -176,11 +550,16 @@ def translate_note(note_id):
         if not target_language:
             return jsonify({'error': 'targetLang is required'}), 400
         
+        text, title, cache_scope = note.content, note.title, f"note:{note.id}@{note.updated_at.isoformat()}"
+        # Release the pooled connection before the model call
+        db.close()
+        
         # Translate the note
         translated = translate_text(
-            text=note.content,
+            text=text,
             target_language=target_language,
-            title=note.title
+            title=title,
+            cache_scope=cache_scope
         )
         
         return jsonify({
@@ -191,8 +570,6 @@ def translate_note(note_id):
         
     except Exception as e:
         return jsonify({'error': f'Translation failed: {str(e)}'}), 500
-    finally:
-        close_db(db)
 
 @app.route('/translate', methods=['POST'])
 def translate_text_direct():
@@ -227,7 +604,7 @@ def translate_text_direct():
 @app.route('/generate-note', methods=['POST'])
 def generate_note():
     """Generate a structured note from natural language input"""
-    db = get_db()
+    db = None
     try:
         data = request.get_json()
         user_input = data.get('input', '')
@@ -236,17 +613,12 @@ def generate_note():
         if not user_input:
             return jsonify({'error': 'input is required'}), 400
         
-        # Generate structured note
+        # Generate structured note (no session is open during the model call)
         generated = generate_structured_notes(user_input, language)
         
         # Create note in database
-        note = Note()
-        note.title = generated['title']
-        note.content = generated['content']
-        note.tags = json.dumps(generated['tags'])
-        note.event_date = generated.get('event_date')
-        note.event_time = generated.get('event_time')
-        
+        db = get_db()
+        note = Note.from_generated(generated)
         db.add(note)
         db.commit()
         db.refresh(note)
@@ -254,14 +626,263 @@ def generate_note():
         return jsonify(note.to_dict()), 201
         
     except Exception as e:
-        db.rollback()
+        if db is not None:
+            db.rollback()
         return jsonify({'error': f'Note generation failed: {str(e)}'}), 500
+
+def sse_response(events):
+    """
+    Stream (event, data) tuples as Server-Sent Events. A comment line is sent
+    first so headers go out before the model produces its first token; errors
+    raised mid-stream become an `error` event.
+    """
+    def generate():
+        yield ': stream open\n\n'
+        try:
+            for event, data in events:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/translate/stream', methods=['POST'])
+def translate_text_direct_stream():
+    """Streaming variant of /translate (Server-Sent Events)"""
+    data = request.get_json()
+    title = data.get('title', '')
+    content = data.get('content', '')
+    target_language = data.get('targetLang', 'en')
+    
+    if not content:
+        return jsonify({'error': 'content is required'}), 400
+    
+    if not target_language:
+        return jsonify({'error': 'targetLang is required'}), 400
+    
+    return sse_response(stream_translate_text(
+        text=content,
+        target_language=target_language,
+        title=title
+    ))
+
+@app.route('/notes/<int:note_id>/translate/stream', methods=['POST'])
+def translate_note_stream(note_id):
+    """Streaming variant of /notes/<id>/translate (Server-Sent Events)"""
+    db = get_db()
+    note = db.query(Note).filter(Note.id == note_id).first()
+    if not note:
+        return jsonify({'error': 'Note not found'}), 404
+    
+    data = request.get_json()
+    target_language = data.get('targetLang', 'en')
+    
+    if not target_language:
+        return jsonify({'error': 'targetLang is required'}), 400
+    
+    text, title, cache_scope = note.content, note.title, f"note:{note.id}@{note.updated_at.isoformat()}"
+    # Release the pooled connection before the model call
+    db.close()
+    
+    def events():
+        for event, payload in stream_translate_text(
+            text=text,
+            target_language=target_language,
+            title=title,
+            cache_scope=cache_scope
+        ):
+            if event == 'done':
+                payload = {**payload, 'originalId': note_id}
+            yield event, payload
+    
+    return sse_response(events())
+
+@app.route('/generate-note/stream', methods=['POST'])
+def generate_note_stream():
+    """
+    Streaming variant of /generate-note (Server-Sent Events).
+    The note is saved once generation completes; `done` carries the saved note.
+    """
+    data = request.get_json()
+    user_input = data.get('input', '')
+    language = data.get('language', 'en')
+    
+    if not user_input:
+        return jsonify({'error': 'input is required'}), 400
+    
+    def events():
+        for event, payload in stream_structured_notes(user_input, language):
+            if event != 'done':
+                yield event, payload
+                continue
+            db = get_db()
+            try:
+                note = Note.from_generated(payload)
+                db.add(note)
+                db.commit()
+                db.refresh(note)
+            except Exception:
+                db.rollback()
+                raise
+            yield 'done', note.to_dict()
+    
+    return sse_response(events())
+
+# Upper bound on notes × languages per batch request
+MAX_BATCH_TRANSLATE_ITEMS = 500
+
+@app.route('/notes/translate-batch', methods=['POST'])
+def translate_notes_batch():
+    """
+    Translate many notes into many languages (Server-Sent Events).
+    Body: {"noteIds": [...], "targetLangs": [...]}. Emits a `job` event, one
+    `item` event per note × language as soon as it finishes, then `done`
+    with per-status counts.
+    """
+    data = request.get_json() or {}
+    note_ids = list(dict.fromkeys(data.get('noteIds') or []))
+    target_languages = list(dict.fromkeys(data.get('targetLangs') or []))
+    
+    if not note_ids or not all(isinstance(note_id, int) for note_id in note_ids):
+        return jsonify({'error': 'noteIds must be a non-empty list of note ids'}), 400
+    
+    if not target_languages or not all(isinstance(lang, str) and lang for lang in target_languages):
+        return jsonify({'error': 'targetLangs must be a non-empty list of language codes'}), 400
+    
+    total = len(note_ids) * len(target_languages)
+    if total > MAX_BATCH_TRANSLATE_ITEMS:
+        return jsonify({'error': f'At most {MAX_BATCH_TRANSLATE_ITEMS} note × language pairs per batch'}), 400
+    
+    db = get_db()
+    notes = {note.id: note for note in db.query(Note).filter(Note.id.in_(note_ids)).all()}
+    missing = [note_id for note_id in note_ids if note_id not in notes]
+    items = [
+        {
+            'id': note.id,
+            'title': note.title,
+            'text': note.content,
+            'targetLang': target_language,
+            'cache_scope': f"note:{note.id}@{note.updated_at.isoformat()}"
+        }
+        for note in (notes[note_id] for note_id in note_ids if note_id in notes)
+        for target_language in target_languages
+    ]
+    # Release the pooled connection before the model calls
+    db.close()
+    
+    def events():
+        yield 'job', {'total': total, 'notFound': missing}
+        counts = {'done': 0, 'error': 0, 'not_found': 0}
+        for note_id in missing:
+            for target_language in target_languages:
+                counts['not_found'] += 1
+                yield 'item', {'noteId': note_id, 'targetLang': target_language, 'status': 'not_found'}
+        for result in run_batch_translation(items):
+            counts[result['status']] += 1
+            yield 'item', result
+        yield 'done', counts
+    
+    return sse_response(events())
+
+# How often GET /jobs/<id>/events re-reads the job, and when it gives up
+JOB_EVENTS_POLL_SECONDS = float(os.getenv('JOB_EVENTS_POLL_SECONDS', 0.5))
+JOB_EVENTS_TIMEOUT_SECONDS = float(os.getenv('JOB_EVENTS_TIMEOUT_SECONDS', 300))
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    Queue an LLM task for the background worker (python worker.py).
+    Body: {"kind": "generate_note" | "translate_note", "payload": {...}}.
+    Returns 202 with the job; poll GET /jobs/<id> or stream /jobs/<id>/events.
+    """
+    data = request.get_json() or {}
+    kind = data.get('kind')
+    payload = data.get('payload')
+    
+    error = validate_job(kind, payload)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    job = enqueue(get_db(), Job, kind, payload)
+    return jsonify(job.to_dict()), 202, {'Location': f'/jobs/{job.id}'}
+
+@app.route('/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Current status of a job, with its result once done"""
+    job = get_db().get(Job, job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+def load_job(job_id):
+    """Read a job on a short-lived session, so polling streams hold no connection"""
+    db = SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        return job.to_dict() if job else None
     finally:
-        close_db(db)
+        db.close()
+
+@app.route('/jobs/<int:job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Follow a job over Server-Sent Events: a `status` event whenever its
+    status changes, then `done` with the finished job (or `timeout`).
+    """
+    job = load_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def events():
+        current, last_status = job, None
+        deadline = time.monotonic() + JOB_EVENTS_TIMEOUT_SECONDS
+        while True:
+            if current['status'] in FINISHED_STATUSES:
+                yield 'done', current
+                return
+            if current['status'] != last_status:
+                last_status = current['status']
+                yield 'status', current
+            if time.monotonic() >= deadline:
+                yield 'timeout', current
+                return
+            time.sleep(JOB_EVENTS_POLL_SECONDS)
+            current = load_job(job_id) or current
+    
+    return sse_response(events())
 
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy'})
 
+@app.route('/stats/pool', methods=['GET'])
+def pool_stats():
+    """Connection pool metrics for this process"""
+    if not DATABASE_AVAILABLE or SessionLocal is None:
+        return jsonify({'error': 'Database not available'}), 503
+    return jsonify(pool_metrics.snapshot(get_engine().pool))
+
+@app.route('/stats/llm-cache', methods=['GET'])
+def llm_cache_stats():
+    """Hit/miss counters for the LLM response cache"""
+    if llm_cache is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **llm_cache.stats()})
+
+@app.route('/debug/slow-queries', methods=['GET'])
+def slow_queries():
+    """Most recent statements over SLOW_QUERY_THRESHOLD_MS, newest first, with their plans"""
+    if slow_query_log is None:
+        return jsonify({'enabled': False})
+    return jsonify({
+        'enabled': True,
+        'thresholdMs': slow_query_log.threshold_seconds * 1000,
+        'queries': slow_query_log.recent(),
+    })
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,314 @@
+"""
+ASGI entry point: the Flask API with its model-bound routes served by async
+handlers, so a request waiting on the model holds no worker thread.
+
+    pip install uvicorn starlette a2wsgi aiosqlite    # asyncpg instead of aiosqlite for Postgres
+    uvicorn asgi:app --port 5000
+
+/translate, /notes/<id>/translate, /generate-note and their /stream variants
+run here on AsyncOpenAI and an async database session (see src/async_db.py).
+Routing, streaming and lifespan are Starlette's; every other route is the Flask
+view, run in a thread pool by a2wsgi's WSGIMiddleware. The async routes answer
+CORS with flask-cors' own matching, so both kinds of route allow the same origins.
+
+Environment variables:
+  ASGI_WSGI_THREADS  threads running Flask views for the other routes (default 32)
+"""
+
+import json
+import os
+import re
+from contextlib import asynccontextmanager
+
+import anyio
+from a2wsgi import WSGIMiddleware
+from flask_cors.core import get_cors_headers, get_cors_options
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+from app import app as flask_app, CORS_ORIGINS, CORS_EXPOSE_HEADERS, DATABASE_AVAILABLE
+from src.llm import (
+    close_async_llm_client, generate_structured_notes_async, stream_structured_notes_async,
+    stream_translate_text_async, translate_text_async
+)
+from src.metrics import METRICS_ENABLED, SERVER_TIMING_ENABLED, instrument_engine, record_request, start_request_timer
+from src.serialization import dumps
+
+database = None
+if DATABASE_AVAILABLE:
+    from models import Note, SessionLocal, get_engine
+    from src.async_db import AsyncDatabase
+    from src.slow_queries import instrument_slow_queries
+
+    if SessionLocal is not None:
+        database = AsyncDatabase(get_engine(), SessionLocal)
+        database.instrument(instrument_engine, instrument_slow_queries)
+
+CORS_OPTIONS = get_cors_options(flask_app, {'origins': CORS_ORIGINS, 'expose_headers': CORS_EXPOSE_HEADERS})
+
+routes = []
+
+
+def route(rule, methods):
+    """
+    Register an async handler for a Flask-style rule ('/notes/<int:note_id>').
+    Handlers get the request and the path parameters; the rule is the metrics
+    label, as it is for the Flask views.
+    """
+    def register(handler):
+        async def endpoint(request):
+            timer = start_request_timer() if METRICS_ENABLED else None
+            try:
+                response = await handler(request, **request.path_params)
+            except Exception as e:
+                response = jsonify({'error': str(e)}, 500)
+            response.headers.update(get_cors_headers(CORS_OPTIONS, request.headers, request.method))
+            if timer is not None:
+                if SERVER_TIMING_ENABLED:
+                    response.headers['server-timing'] = timer.server_timing()
+                response.background = BackgroundTask(record_request, timer, request.method, rule,
+                                                     response.status_code)
+            return response
+
+        routes.append(Route(re.sub(r'<int:(\w+)>', r'{\1:int}', rule), endpoint, methods=methods))
+        return handler
+    return register
+
+
+def jsonify(data, status=200):
+    return Response(dumps(data) + b'\n', status, media_type='application/json')
+
+
+def note_for_translation(db, note_id):
+    """(text, title, cache scope) of a note, or None when it does not exist"""
+    note = db.get(Note, note_id)
+    if note is None:
+        return None
+    return note.content, note.title, f"note:{note.id}@{note.updated_at.isoformat()}"
+
+
+def save_generated_note(db, generated):
+    note = Note.from_generated(generated)
+    db.add(note)
+    db.commit()
+    db.refresh(note)
+    return note.to_dict()
+
+
+def sse_response(events):
+    """Async counterpart of app.sse_response()"""
+    async def generate():
+        yield b': stream open\n\n'
+        try:
+            async for event, data in events:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n".encode()
+        finally:
+            # Starlette cancels the body when the client disconnects; still close the model stream
+            with anyio.CancelScope(shield=True):
+                await events.aclose()
+
+    return StreamingResponse(generate(), headers={
+        'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'
+    })
+
+
+async def json_body(request):
+    """The request's JSON object, or None when the body is missing, malformed or not an object"""
+    try:
+        data = json.loads(await request.body() or b'null')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+@route('/notes/<int:note_id>/translate', methods=['POST'])
+async def translate_note(request, note_id):
+    """Translate a specific note"""
+    data = await json_body(request)
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}, 400)
+    try:
+        found = await database.run(note_for_translation, note_id)
+        if found is None:
+            return jsonify({'error': 'Note not found'}, 404)
+
+        target_language = data.get('targetLang', 'en')
+        if not target_language:
+            return jsonify({'error': 'targetLang is required'}, 400)
+
+        text, title, cache_scope = found
+        translated = await translate_text_async(
+            text=text,
+            target_language=target_language,
+            title=title,
+            cache_scope=cache_scope
+        )
+
+        return jsonify({
+            'title': translated['title'],
+            'content': translated['content'],
+            'originalId': note_id
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'Translation failed: {str(e)}'}, 500)
+
+
+@route('/translate', methods=['POST'])
+async def translate_text_direct(request):
+    """Translate text directly without saving to database"""
+    data = await json_body(request)
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}, 400)
+    try:
+        title = data.get('title', '')
+        content = data.get('content', '')
+        target_language = data.get('targetLang', 'en')
+
+        if not content:
+            return jsonify({'error': 'content is required'}, 400)
+
+        if not target_language:
+            return jsonify({'error': 'targetLang is required'}, 400)
+
+        translated = await translate_text_async(
+            text=content,
+            target_language=target_language,
+            title=title
+        )
+
+        return jsonify({
+            'title': translated['title'],
+            'content': translated['content']
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'Translation failed: {str(e)}'}, 500)
+
+
+@route('/generate-note', methods=['POST'])
+async def generate_note(request):
+    """Generate a structured note from natural language input"""
+    data = await json_body(request)
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}, 400)
+    try:
+        user_input = data.get('input', '')
+        language = data.get('language', 'en')
+
+        if not user_input:
+            return jsonify({'error': 'input is required'}, 400)
+
+        generated = await generate_structured_notes_async(user_input, language)
+        return jsonify(await database.write(save_generated_note, generated), 201)
+
+    except Exception as e:
+        return jsonify({'error': f'Note generation failed: {str(e)}'}, 500)
+
+
+@route('/translate/stream', methods=['POST'])
+async def translate_text_direct_stream(request):
+    """Streaming variant of /translate (Server-Sent Events)"""
+    data = await json_body(request)
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}, 400)
+    title = data.get('title', '')
+    content = data.get('content', '')
+    target_language = data.get('targetLang', 'en')
+
+    if not content:
+        return jsonify({'error': 'content is required'}, 400)
+
+    if not target_language:
+        return jsonify({'error': 'targetLang is required'}, 400)
+
+    return sse_response(stream_translate_text_async(
+        text=content,
+        target_language=target_language,
+        title=title
+    ))
+
+
+@route('/notes/<int:note_id>/translate/stream', methods=['POST'])
+async def translate_note_stream(request, note_id):
+    """Streaming variant of /notes/<id>/translate (Server-Sent Events)"""
+    data = await json_body(request)
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}, 400)
+    found = await database.run(note_for_translation, note_id)
+    if found is None:
+        return jsonify({'error': 'Note not found'}, 404)
+
+    target_language = data.get('targetLang', 'en')
+    if not target_language:
+        return jsonify({'error': 'targetLang is required'}, 400)
+
+    text, title, cache_scope = found
+
+    async def events():
+        async for event, payload in stream_translate_text_async(
+            text=text,
+            target_language=target_language,
+            title=title,
+            cache_scope=cache_scope
+        ):
+            if event == 'done':
+                payload = {**payload, 'originalId': note_id}
+            yield event, payload
+
+    return sse_response(events())
+
+
+@route('/generate-note/stream', methods=['POST'])
+async def generate_note_stream(request):
+    """
+    Streaming variant of /generate-note (Server-Sent Events).
+    The note is saved once generation completes; `done` carries the saved note.
+    """
+    data = await json_body(request)
+    if data is None:
+        return jsonify({'error': 'Request body must be a JSON object'}, 400)
+    user_input = data.get('input', '')
+    language = data.get('language', 'en')
+
+    if not user_input:
+        return jsonify({'error': 'input is required'}, 400)
+
+    async def events():
+        async for event, payload in stream_structured_notes_async(user_input, language):
+            if event != 'done':
+                yield event, payload
+                continue
+            yield 'done', await database.write(save_generated_note, payload)
+
+    return sse_response(events())
+
+
+def flask_wsgi(environ, start_response):
+    # a2wsgi's wsgi.input ends with the request body; without this flag Werkzeug
+    # reads a chunked upload (no Content-Length, as /notes/import takes) as empty
+    environ['wsgi.input_terminated'] = True
+    return flask_app(environ, start_response)
+
+
+wsgi = WSGIMiddleware(flask_wsgi, workers=int(os.getenv('ASGI_WSGI_THREADS', 32)))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await close_async_llm_client()
+    if database is not None:
+        await database.dispose()
+    wsgi.executor.shutdown(wait=False)
+
+
+app = Starlette(
+    # Without a database every route falls through to Flask, which answers 503/500 as before
+    routes=(routes if database is not None else []) + [Mount('/', app=wsgi)],
+    lifespan=lifespan,
+)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Model-bound throughput of the sync Flask app vs. the ASGI app (asgi.py):
+both are served from a separate process against a stub LLM with a fixed
+latency, and /translate and /generate-note are driven at rising concurrency.
+
+The sync app runs on a fixed pool of worker threads (--sync-workers, like
+gunicorn's workers x threads), each held for the whole model call; the ASGI
+app runs under uvicorn on one event loop. Needs uvicorn, starlette and a2wsgi
+(and aiosqlite for the async database session).
+
+Usage:
+    python benchmarks/bench_async.py --concurrency 8,32,128 --llm-latency-ms 500
+    python benchmarks/bench_async.py --modes asgi --endpoints translate
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_load import free_port, peak_rss_mb, run_scenario, seed_database
+from common import BACKEND_DIR, WORDS, parse_sizes
+
+import requests
+
+MODES = ['sync', 'asgi']
+ENDPOINTS = ['translate', 'generate']
+
+
+class Scenarios:
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def translate(self, session):
+        return session.post(f'{self.base_url}/translate', json={
+            'title': 'Load test', 'content': ' '.join(WORDS[:30]), 'targetLang': 'fr'
+        })
+
+    def generate(self, session):
+        return session.post(f'{self.base_url}/generate-note', json={'input': ' '.join(WORDS[:12])})
+
+
+def serve_sync(port, workers):
+    from werkzeug.serving import BaseWSGIServer
+
+    from app import app
+
+    class PooledWSGIServer(BaseWSGIServer):
+        """Werkzeug server handling requests on a fixed number of threads"""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.pool = ThreadPoolExecutor(max_workers=workers)
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self._handle, request, client_address)
+
+        def _handle(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = PooledWSGIServer('127.0.0.1', port, app)
+    server.socket.listen(1024)
+    server.serve_forever()
+
+
+def serve_asgi(port):
+    import uvicorn
+
+    uvicorn.run('asgi:app', host='127.0.0.1', port=port, log_level='warning', access_log=False, backlog=1024)
+
+
+def start_llm_server(latency_ms):
+    """The stub LLM in its own process, so the load generator's threads do not slow it down"""
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, 'stub_llm_server.py', '--port', str(port), '--latency-ms', str(latency_ms)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL
+    )
+    wait_until_up(server, 'stub LLM', f'http://127.0.0.1:{port}/')
+    return server, f'http://127.0.0.1:{port}'
+
+
+def wait_until_up(server, name, url):
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'{name} server exited with code {server.returncode}')
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f'{name} server did not start within 30s')
+
+
+def start_server(mode, database_url, llm_url, port, workers):
+    env = dict(os.environ, DATABASE_URL=database_url, LLM_ENDPOINT=llm_url, GITHUB_TOKEN='stub-token',
+               LLM_CACHE_ENABLED='false', JOB_WORKER_IN_PROCESS='false',
+               # Room for every in-flight model call in both modes; the sync workers are the limit under test
+               LLM_MAX_CONNECTIONS='1000', LLM_MAX_KEEPALIVE_CONNECTIONS='1000')
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), f'--serve-{mode}', '--port', str(port),
+         '--sync-workers', str(workers)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL
+    )
+    wait_until_up(server, mode, f'http://127.0.0.1:{port}/health')
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', type=lambda value: value.split(','), default=MODES)
+    parser.add_argument('--endpoints', type=lambda value: value.split(','), default=ENDPOINTS)
+    parser.add_argument('--concurrency', type=parse_sizes, default=parse_sizes('8,32,128'))
+    parser.add_argument('--requests', type=int, default=None,
+                        help='requests per endpoint and concurrency level (default: 4 x concurrency)')
+    parser.add_argument('--llm-latency-ms', type=int, default=500)
+    parser.add_argument('--sync-workers', type=int, default=8, help='worker threads of the sync server')
+    parser.add_argument('--database-url', default=None, help='throwaway database (default: temporary SQLite file)')
+    parser.add_argument('--serve-sync', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--serve-asgi', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_sync:
+        return serve_sync(args.port, args.sync_workers)
+    if args.serve_asgi:
+        return serve_asgi(args.port)
+
+    if 'asgi' in args.modes:
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            print("❌ uvicorn is not installed (pip install uvicorn aiosqlite)")
+            return
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='notes-async-'), 'async.db')}"
+    seed_database(database_url, 100)
+
+    print(f"model latency {args.llm_latency_ms} ms, sync server: {args.sync_workers} worker threads")
+    print(f"{'mode':<5} {'endpoint':<10} {'conc':>5} {'p50 ms':>8} {'p95 ms':>8} {'req/s':>8} "
+          f"{'errors':>6} {'peak RSS MB':>12}")
+    llm_server, llm_url = start_llm_server(args.llm_latency_ms)
+    try:
+        for mode in args.modes:
+            port = free_port()
+            server = start_server(mode, database_url, llm_url, port, args.sync_workers)
+            scenarios = Scenarios(f'http://127.0.0.1:{port}')
+            try:
+                for endpoint in args.endpoints:
+                    request_fn = getattr(scenarios, endpoint)
+                    run_scenario(request_fn, 1, 2)  # warm up
+                    for concurrency in args.concurrency:
+                        stats = run_scenario(request_fn, concurrency, args.requests or 4 * concurrency)
+                        rss = peak_rss_mb(server.pid)
+                        print(f"{mode:<5} {endpoint:<10} {concurrency:>5} {stats['p50']:>8.0f} {stats['p95']:>8.0f} "
+                              f"{stats['throughput']:>8.1f} {stats['errors']:>6} "
+                              f"{f'{rss:.0f}' if rss is not None else 'n/a':>12}")
+                        if stats['firstError']:
+                            print(f"   ⚠️  {stats['firstError']}")
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        llm_server.terminate()
+        llm_server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+NDJSON export/import throughput and peak Python memory vs. corpus size.
+Memory should stay flat as the corpus grows: export streams through yield_per
+and import writes fixed-size batches.
+
+Usage:
+    python benchmarks/bench_bulk.py --sizes 10000,100000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from common import make_engine, parse_sizes, seed_notes
+
+from sqlalchemy.orm import sessionmaker
+
+from models import NOTE_FIELDS, Note, note_row_to_dict, rebuild_tag_index
+from src.bulk import export_ndjson, import_ndjson
+
+EXPORT_COLUMNS = {name: column for name, column in NOTE_FIELDS.items() if name != 'preview'}
+
+
+def measure(fn):
+    """Time fn, then run it again under tracemalloc (which slows it down) for peak memory in MB"""
+    started = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('10000,100000'))
+    args = parser.parse_args()
+
+    print(f"{'notes':>8} {'export rows/s':>14} {'export peak MB':>15} {'import rows/s':>14} {'import peak MB':>15}")
+    for size in args.sizes:
+        source = make_engine()
+        seed_notes(source, size)
+
+        def export():
+            # Keep only the byte count so the measurement reflects the exporter itself
+            return sum(len(chunk) for chunk in export_ndjson(
+                sessionmaker(bind=source), EXPORT_COLUMNS, Note.id, note_row_to_dict))
+
+        def lines():
+            for chunk in export_ndjson(sessionmaker(bind=source), EXPORT_COLUMNS, Note.id, note_row_to_dict):
+                yield from chunk.splitlines()
+
+        def load():
+            db = sessionmaker(bind=make_engine())()
+            try:
+                return import_ndjson(db, Note.__table__, lines(), after_insert=rebuild_tag_index)
+            finally:
+                db.close()
+
+        _, export_seconds, export_peak = measure(export)
+        summary, import_seconds, import_peak = measure(load)
+        assert summary['imported'] == size
+        print(
+            f"{size:>8} {size / export_seconds:>14,.0f} {export_peak:>15.1f} "
+            f"{size / import_seconds:>14,.0f} {import_peak:>15.1f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Cold start of the Vercel entry point (api/index.py): each run is a fresh
+interpreter started with `python -X importtime` that imports the entry point
+and serves its first requests, the way a new serverless instance does.
+
+Reports the import time of the entry point, the first /health request (no
+database) and the first /notes request (creates the engine and connects),
+plus the modules that cost the most to import. The median import time is
+checked against BUDGET_MS; lower the budget in the same commit as a change
+that makes startup faster, so regressions fail the check. Results are saved as
+JSON under benchmarks/results/; pass an earlier file with --compare.
+
+Usage:
+    python benchmarks/bench_cold_start.py --runs 5
+    python benchmarks/bench_cold_start.py --budget-ms 600 --compare benchmarks/results/cold-start-previous.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from bench_load import git_commit
+from common import BACKEND_DIR
+
+# Median import time of api/index.py in a fresh interpreter
+BUDGET_MS = 650
+
+API_DIR = os.path.abspath(os.path.join(BACKEND_DIR, '..', 'api'))
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Runs in the child interpreter
+COLD_START = f'''
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {API_DIR!r})
+import index
+imported = time.perf_counter()
+client = index.app.test_client()
+health = client.get('/health').status_code
+first_health = time.perf_counter()
+notes = client.get('/notes?limit=1').status_code
+first_notes = time.perf_counter()
+print(json.dumps({{
+    'importMs': (imported - started) * 1000,
+    'firstHealthMs': (first_health - imported) * 1000,
+    'firstNotesMs': (first_notes - first_health) * 1000,
+    'status': [health, notes],
+    'openaiImported': 'openai' in sys.modules,
+}}))
+'''
+
+
+def parse_importtime(stderr):
+    """{module: (self µs, cumulative µs)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def cold_start(env):
+    started = time.perf_counter()
+    child = subprocess.run([sys.executable, '-X', 'importtime', '-c', COLD_START],
+                           cwd=tempfile.gettempdir(), env=env, capture_output=True, text=True)
+    wall = (time.perf_counter() - started) * 1000
+    if child.returncode != 0:
+        raise RuntimeError(f'cold start failed:\n{child.stderr[-2000:]}')
+    result = json.loads(child.stdout.strip().splitlines()[-1])
+    result['processMs'] = wall
+    return result, parse_importtime(child.stderr)
+
+
+def init_database(env):
+    init = subprocess.run([sys.executable, 'init_db.py'], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if init.returncode != 0 or 'initialization failed' in init.stdout:
+        raise RuntimeError(f'init_db.py failed:\n{init.stdout}{init.stderr}')
+
+
+def compare(summary, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs. {baseline_path} ({baseline['meta'].get('commit')})")
+    for key, before in baseline['summary'].items():
+        after = summary.get(key)
+        if after is None or not before:
+            continue
+        print(f"{key:<16} {before:>8.1f} -> {after:>8.1f} ms ({(after - before) / before * 100:+.0f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='slowest imports to list')
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS)
+    parser.add_argument('--database-url', default=None,
+                        help='database to serve /notes from (default: temporary SQLite file)')
+    parser.add_argument('--output', default=None,
+                        help='results JSON path (default: benchmarks/results/cold-start-<commit>-<time>.json)')
+    parser.add_argument('--compare', default=None, help='earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='notes-cold-'), 'cold.db')}"
+    env = dict(os.environ, DATABASE_URL=database_url, JOB_WORKER_IN_PROCESS='false')
+    init_database(env)
+
+    runs, imports = [], []
+    for _ in range(args.runs):
+        result, modules = cold_start(env)
+        runs.append(result)
+        imports.append(modules)
+
+    summary = {
+        key: statistics.median(run[key] for run in runs)
+        for key in ('processMs', 'importMs', 'firstHealthMs', 'firstNotesMs')
+    }
+    print(f"{args.runs} cold starts of api/index.py (median)")
+    print(f"  process (interpreter + import + 2 requests) {summary['processMs']:>8.1f} ms")
+    print(f"  import api/index.py                         {summary['importMs']:>8.1f} ms")
+    print(f"  first GET /health                           {summary['firstHealthMs']:>8.1f} ms")
+    print(f"  first GET /notes (engine + connect)         {summary['firstNotesMs']:>8.1f} ms")
+    if any(run['status'] != [200, 200] for run in runs):
+        print(f"   ⚠️  unexpected status codes: {runs[0]['status']}")
+    if any(run['openaiImported'] for run in runs):
+        print("   ⚠️  the OpenAI SDK was imported before any LLM route was hit")
+
+    # Median cumulative time of each module over the runs
+    names = set().union(*imports)
+    cumulative = {
+        name: statistics.median(modules.get(name, (0, 0))[1] for modules in imports) / 1000 for name in names
+    }
+    print("\nSlowest imports (cumulative ms, nested modules included in their parents):")
+    for name, ms in sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {ms:>8.1f}  {name}")
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"cold-start-{commit or 'unknown'}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'commit': commit,
+                'timestamp': datetime.utcnow().isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'database': database_url.split(':')[0],
+                'runs': args.runs,
+                'budgetMs': args.budget_ms,
+            },
+            'summary': summary,
+            'runs': runs,
+        }, f, indent=2)
+    print(f"\n💾 Results saved to {output}")
+
+    if args.compare:
+        compare(summary, args.compare)
+
+    if summary['importMs'] > args.budget_ms:
+        print(f"\n❌ import took {summary['importMs']:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+    print(f"\n✅ import within the {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection vs. corpus size: MinHash signing throughput, GET
+/notes/<id>/similar latency, the full duplicates report through the LSH
+index, and the recall of planted near-copies. A pairwise comparison of all
+signatures is timed on small corpora for reference.
+
+Usage:
+    python benchmarks/bench_duplicates.py --sizes 10000,100000,300000
+    python benchmarks/bench_duplicates.py --sizes 2000,5000 --pairwise-max 5000
+"""
+
+import argparse
+import random
+import time
+
+from common import make_engine, parse_sizes, seed_notes, time_call
+
+from sqlalchemy import func, insert, select
+
+from models import Note, NoteBucket, NoteSignature
+from src.near_duplicates import (
+    DEFAULT_DUPLICATE_THRESHOLD, duplicate_clusters, sign_unsigned_notes, similar_notes, similarity
+)
+
+PLANT_EVERY = 100  # one planted near-copy per this many notes
+
+
+def plant_copies(conn, rng, first_id, last_id, count):
+    """Insert `count` copies of random notes in first_id..last_id with one word changed; returns (original, copy) ids"""
+    originals = rng.sample(range(first_id, last_id + 1), count)
+    rows = conn.execute(
+        select(Note.id, Note.title, Note.content, Note.tags, Note.updated_at).where(Note.id.in_(originals))
+    ).all()
+    pairs = []
+    for row in rows:
+        words = row.content.split()
+        words[rng.randrange(len(words))] = 'edited'
+        copy_id = conn.execute(insert(Note.__table__).values(
+            title=row.title, content=' '.join(words), tags=row.tags, updated_at=row.updated_at
+        )).inserted_primary_key[0]
+        pairs.append((row.id, copy_id))
+    return pairs
+
+
+def pairwise_clusters(conn, threshold):
+    """What the report costs without LSH: every pair of signatures compared"""
+    rows = conn.execute(select(NoteSignature.note_id, NoteSignature.signature)).all()
+    found = 0
+    for i, first in enumerate(rows):
+        for second in rows[i + 1:]:
+            if similarity(first.signature, second.signature) >= threshold:
+                found += 1
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('10000,100000'))
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--pairwise-max', type=int, default=2500,
+                        help='largest corpus to time the all-pairs comparison on')
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url)
+    signature_table, bucket_table = NoteSignature.__table__, NoteBucket.__table__
+    rng = random.Random(7)
+
+    print(f"{'notes':>8} {'sign s':>7} {'notes/s':>8} {'similar p50 ms':>15} {'report s':>9} "
+          f"{'clusters':>9} {'recall':>7} {'pairwise s':>11}")
+    seeded, planted = 0, []
+    for size in sorted(args.sizes):
+        seed_notes(engine, size - seeded, start=seeded)
+        with engine.begin() as conn:
+            last_id = conn.execute(select(func.max(Note.id))).scalar()
+            planted += plant_copies(conn, rng, last_id - (size - seeded) + 1, last_id,
+                                    max(1, (size - seeded) // PLANT_EVERY))
+        seeded = size
+
+        with engine.begin() as conn:
+            total = conn.execute(select(func.count()).select_from(Note.__table__)).scalar()
+            started = time.perf_counter()
+            signed = sign_unsigned_notes(conn, Note.__table__, signature_table, bucket_table)
+            sign_seconds = time.perf_counter() - started
+
+        with engine.connect() as conn:
+            sample = rng.sample(planted, min(len(planted), args.repeat))
+            lookup = time_call(
+                lambda: [similar_notes(conn, signature_table, bucket_table, original) for original, _ in sample], 3
+            )
+            started = time.perf_counter()
+            clusters = duplicate_clusters(conn, signature_table, bucket_table, DEFAULT_DUPLICATE_THRESHOLD)
+            report_seconds = time.perf_counter() - started
+            cluster_of = {note_id: index for index, cluster in enumerate(clusters) for note_id in cluster['ids']}
+            found = sum(
+                1 for original, copy in planted
+                if original in cluster_of and cluster_of.get(copy) == cluster_of[original]
+            )
+            pairwise = 'skipped'
+            if total <= args.pairwise_max:
+                started = time.perf_counter()
+                pairwise_clusters(conn, DEFAULT_DUPLICATE_THRESHOLD)
+                pairwise = f"{time.perf_counter() - started:.1f}"
+
+        print(
+            f"{total:>8} {sign_seconds:>7.1f} {signed / max(sign_seconds, 1e-9):>8.0f} "
+            f"{lookup['p50'] / len(sample):>15.2f} {report_seconds:>9.2f} {len(clusters):>9} "
+            f"{found / len(planted):>7.1%} {pairwise:>11}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Full-list GET /notes response vs. corpus size: building the whole JSON array
+before sending vs. streaming it in batches (time and peak Python memory), and
+what gzip/brotli compression saves on the wire.
+
+Usage:
+    python benchmarks/bench_list_response.py --sizes 10000,100000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from common import make_engine, parse_sizes, seed_notes
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from models import NOTE_FIELDS, Note
+from src import compression
+from src.serialization import encode_note_rows, stream_note_rows
+
+FIELDS = [name for name in NOTE_FIELDS if name != 'preview']
+STATEMENT = select(*[NOTE_FIELDS[name] for name in FIELDS]).order_by(Note.updated_at.desc(), Note.id.desc())
+
+
+def measure(fn):
+    """Time fn, then run it again under tracemalloc (which slows it down) for peak memory in MB"""
+    started = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('10000,100000'))
+    args = parser.parse_args()
+
+    encodings = ['gzip'] + (['br'] if compression.BROTLI_AVAILABLE else [])
+    print(f"{'notes':>8} {'response':<18} {'seconds':>8} {'peak MB':>8} {'body MB':>8}")
+    for size in args.sizes:
+        engine = make_engine()
+        seed_notes(engine, size)
+        session_factory = sessionmaker(bind=engine)
+
+        def buffered():
+            db = session_factory()
+            try:
+                return len(encode_note_rows(db.execute(STATEMENT).all(), FIELDS))
+            finally:
+                db.close()
+
+        def streamed(encoding=None):
+            chunks = stream_note_rows(session_factory, STATEMENT, FIELDS)
+            if encoding:
+                chunks = compression.compress_stream(chunks, encoding)
+            return sum(len(chunk) for chunk in chunks)
+
+        runs = [('buffered', buffered), ('streamed', streamed)]
+        runs += [(f'streamed + {encoding}', lambda encoding=encoding: streamed(encoding)) for encoding in encodings]
+        for label, fn in runs:
+            body, seconds, peak = measure(fn)
+            print(f"{size:>8} {label:<18} {seconds:>8.2f} {peak:>8.1f} {body / 1e6:>8.1f}")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
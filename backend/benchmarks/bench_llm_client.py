@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Per-call overhead of a fresh LLMClient vs. the shared keep-alive client,
+measured offline against stub_llm_server.py.
+
+Usage:
+    python benchmarks/bench_llm_client.py --calls 200 --latency-ms 5
+"""
+
+import argparse
+import os
+
+from common import time_call
+
+from src import llm
+from stub_llm_server import StubLLMServer
+
+MESSAGES = [{"role": "user", "content": "Title: None\nContent: Hello world"}]
+
+
+def fresh_client_call():
+    client = llm.LLMClient()
+    try:
+        client.call_llm_model(MESSAGES)
+    finally:
+        client.close()
+
+
+def shared_client_call():
+    llm.get_llm_client().call_llm_model(MESSAGES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--latency-ms', type=int, default=0)
+    args = parser.parse_args()
+
+    with StubLLMServer(latency_ms=args.latency_ms) as server:
+        os.environ['LLM_ENDPOINT'] = server.url
+        os.environ.setdefault('GITHUB_TOKEN', 'stub-token')
+        llm.reset_llm_client()
+
+        results = {
+            'fresh client per call': time_call(fresh_client_call, args.calls),
+            'shared client': time_call(shared_client_call, args.calls),
+        }
+        connections = len(server.connections)
+
+    print(f"{'mode':<24} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+    for mode, stats in results.items():
+        print(f"{mode:<24} {stats['p50']:>8.2f} {stats['p95']:>8.2f} {stats['mean']:>8.2f}")
+    print(f"TCP connections opened: {connections} for {args.calls * 2} calls")
+
+
+if __name__ == '__main__':
+    main()
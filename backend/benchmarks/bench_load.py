@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Load test for the Flask API: seeds synthetic notes, serves the app from a
+separate process (threaded Werkzeug server) and drives each endpoint at the
+given concurrency levels over real HTTP. Translate calls go to an in-process
+stub LLM (stub_llm_server.py) with the response cache off, so they measure the
+request path plus the simulated model latency.
+
+Reports p50/p95/p99 latency, throughput and the server's peak RSS per
+endpoint and concurrency, and saves everything as JSON so runs on different
+commits can be compared with --compare.
+
+The target database is dropped and re-seeded: point --database-url only at a
+throwaway database (the default is a temporary SQLite file).
+
+Usage:
+    python benchmarks/bench_load.py --notes 10000 --concurrency 1,8,32
+    python benchmarks/bench_load.py --database-url postgresql://localhost/notes_bench --endpoints list,get
+    python benchmarks/bench_load.py --compare benchmarks/results/previous.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from common import BACKEND_DIR, WORDS, make_engine, parse_sizes, seed_notes
+
+import requests
+
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+LIST_FIELDS = 'id,title,preview,tags,updatedAt'
+
+
+def parse_names(value):
+    return [name for name in value.split(',') if name]
+
+
+class Scenarios:
+    """One request function per endpoint; ids are drawn from the seeded notes"""
+
+    def __init__(self, base_url, note_count, seed=7):
+        self.base_url = base_url
+        self.note_count = note_count
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        # Deletes consume seeded ids from the top so each one hits an existing note;
+        # reads and updates stay below them
+        self.next_delete = note_count
+        self.delete_floor = note_count // 2
+
+    def random_id(self):
+        with self.lock:
+            return self.rng.randint(1, self.delete_floor)
+
+    def random_word(self):
+        with self.lock:
+            return self.rng.choice(WORDS)
+
+    def list(self, session):
+        return session.get(f'{self.base_url}/notes', params={'limit': 50, 'fields': LIST_FIELDS})
+
+    def list_all(self, session):
+        return session.get(f'{self.base_url}/notes', headers={'Accept-Encoding': 'gzip'})
+
+    def get(self, session):
+        return session.get(f'{self.base_url}/notes/{self.random_id()}')
+
+    def search(self, session):
+        return session.get(f'{self.base_url}/notes/search', params={'q': self.random_word()})
+
+    def create(self, session):
+        return session.post(f'{self.base_url}/notes', json={
+            'title': f'load test {self.random_word()}', 'content': ' '.join(WORDS[:40]), 'tags': ['load']
+        })
+
+    def update(self, session):
+        return session.patch(f'{self.base_url}/notes/{self.random_id()}', json={'content': self.random_word()})
+
+    def delete(self, session):
+        with self.lock:
+            if self.next_delete <= self.delete_floor:
+                raise RuntimeError('out of seeded notes to delete; seed more with --notes')
+            note_id = self.next_delete
+            self.next_delete -= 1
+        return session.delete(f'{self.base_url}/notes/{note_id}')
+
+    def translate(self, session):
+        return session.post(f'{self.base_url}/translate', json={
+            'title': 'Load test', 'content': ' '.join(WORDS[:30]), 'targetLang': 'fr'
+        })
+
+
+ENDPOINTS = ['list', 'get', 'search', 'create', 'update', 'delete', 'translate']
+OPTIONAL_ENDPOINTS = ['list_all']
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def peak_rss_mb(pid):
+    """High-water RSS of a live process (Linux /proc), or None where unavailable"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def run_scenario(request_fn, concurrency, total_requests):
+    """Issue total_requests calls from `concurrency` threads; latency samples in ms"""
+    local = threading.local()
+    samples, errors = [], []
+    lock = threading.Lock()
+
+    def one(_):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            response = request_fn(local.session)
+            response.content  # include reading the body
+            ok = response.status_code < 400
+            error = None if ok else f'HTTP {response.status_code}'
+        except Exception as e:
+            ok, error = False, str(e)
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            samples.append(elapsed)
+            if not ok:
+                errors.append(error)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(total_requests)))
+    wall = time.perf_counter() - started
+
+    samples.sort()
+    return {
+        'requests': total_requests,
+        'errors': len(errors),
+        'firstError': errors[0] if errors else None,
+        'p50': round(statistics.median(samples), 2),
+        'p95': round(percentile(samples, 0.95), 2),
+        'p99': round(percentile(samples, 0.99), 2),
+        'mean': round(statistics.fmean(samples), 2),
+        'max': round(samples[-1], 2),
+        'throughput': round(total_requests / wall, 1),
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def seed_database(database_url, notes):
+    from sqlalchemy.orm import Session
+
+    from models import rebuild_change_log, rebuild_tag_index
+    from src.search import setup_search_index
+
+    engine = make_engine(database_url)
+    setup_search_index(engine)  # triggers index the rows as they are seeded
+    seed_notes(engine, notes)
+    with Session(engine) as db, db.begin():
+        conn = db.connection()
+        rebuild_tag_index(conn)
+        rebuild_change_log(conn)
+    engine.dispose()
+
+
+def start_server(database_url, llm_url, port):
+    env = dict(os.environ, DATABASE_URL=database_url, LLM_ENDPOINT=llm_url, GITHUB_TOKEN='stub-token',
+               LLM_CACHE_ENABLED='false', JOB_WORKER_IN_PROCESS='false')
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', '--port', str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'server exited with code {server.returncode}')
+        try:
+            requests.get(f'http://127.0.0.1:{port}/health', timeout=1)
+            return server
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError('server did not start within 30s')
+
+
+def serve(port):
+    import logging
+
+    from werkzeug.serving import make_server
+
+    from app import app
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # no per-request access log
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r['endpoint'], r['concurrency']): r for r in baseline['results']}
+    print(f"\nvs. {baseline_path} ({baseline['meta'].get('commit')})")
+    print(f"{'endpoint':<10} {'conc':>5} {'p95 ms':>16} {'change':>8} {'req/s':>16} {'change':>8}")
+    for result in results:
+        before = previous.get((result['endpoint'], result['concurrency']))
+        if not before:
+            continue
+        p95_change = (result['p95'] - before['p95']) / max(before['p95'], 1e-9) * 100
+        rps_change = (result['throughput'] - before['throughput']) / max(before['throughput'], 1e-9) * 100
+        print(f"{result['endpoint']:<10} {result['concurrency']:>5} "
+              f"{before['p95']:>7.1f} -> {result['p95']:<6.1f} {p95_change:>+7.0f}% "
+              f"{before['throughput']:>7.0f} -> {result['throughput']:<6.0f} {rps_change:>+7.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--notes', type=int, default=10000, help='synthetic notes to seed')
+    parser.add_argument('--database-url', default=None, help='throwaway database (default: temporary SQLite file)')
+    parser.add_argument('--concurrency', type=parse_sizes, default=parse_sizes('1,8'))
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint and concurrency level')
+    parser.add_argument('--endpoints', type=parse_names, default=ENDPOINTS,
+                        help=f"comma-separated subset of {','.join(ENDPOINTS + OPTIONAL_ENDPOINTS)}")
+    parser.add_argument('--llm-latency-ms', type=int, default=50, help='simulated model latency for translate')
+    parser.add_argument('--output', default=None, help='results JSON path (default: benchmarks/results/<commit>-<time>.json)')
+    parser.add_argument('--compare', default=None, help='earlier results JSON to compare against')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    unknown = set(args.endpoints) - set(ENDPOINTS + OPTIONAL_ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    deletes = args.requests * len(args.concurrency) if 'delete' in args.endpoints else 0
+    if deletes > args.notes // 2:
+        parser.error(f'--notes must be at least {deletes * 2} to run {deletes} deletes')
+
+    from stub_llm_server import StubLLMServer
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='notes-load-'), 'load.db')}"
+    print(f"🌱 Seeding {args.notes} notes into {database_url.split('@')[-1]}...")
+    seed_database(database_url, args.notes)
+
+    port = free_port()
+    results = []
+    with StubLLMServer(latency_ms=args.llm_latency_ms) as llm_server:
+        server = start_server(database_url, llm_server.url, port)
+        scenarios = Scenarios(f'http://127.0.0.1:{port}', args.notes)
+        try:
+            print(f"{'endpoint':<10} {'conc':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} "
+                  f"{'errors':>6} {'peak RSS MB':>12}")
+            for endpoint in args.endpoints:
+                request_fn = getattr(scenarios, endpoint)
+                if endpoint != 'delete':
+                    run_scenario(request_fn, 1, 5)  # warm up connections and caches
+                for concurrency in args.concurrency:
+                    stats = run_scenario(request_fn, concurrency, args.requests)
+                    stats.update(endpoint=endpoint, concurrency=concurrency, peakRssMb=peak_rss_mb(server.pid))
+                    results.append(stats)
+                    rss = f"{stats['peakRssMb']:.0f}" if stats['peakRssMb'] is not None else 'n/a'
+                    print(f"{endpoint:<10} {concurrency:>5} {stats['p50']:>8.1f} {stats['p95']:>8.1f} "
+                          f"{stats['p99']:>8.1f} {stats['throughput']:>8.0f} {stats['errors']:>6} {rss:>12}")
+                    if stats['firstError']:
+                        print(f"   ⚠️  {stats['firstError']}")
+        finally:
+            server.terminate()
+            server.wait()
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    children_rss_mb = children_rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    print(f"Server peak RSS: {children_rss_mb:.0f} MB")
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{commit or 'unknown'}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'commit': commit,
+                'timestamp': datetime.utcnow().isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'database': database_url.split(':')[0],
+                'notes': args.notes,
+                'requests': args.requests,
+                'llmLatencyMs': args.llm_latency_ms,
+                'serverPeakRssMb': round(children_rss_mb, 1),
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f"💾 Results saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Search latency vs. corpus size: LIKE '%q%' scan vs. the full-text index.
+
+Usage:
+    python benchmarks/bench_search.py --sizes 1000,10000,50000
+    python benchmarks/bench_search.py --database-url postgresql+pg8000://...
+"""
+
+import argparse
+
+from common import make_engine, parse_sizes, seed_notes, time_call
+
+from sqlalchemy.orm import sessionmaker
+
+from models import Note
+from src.search import ranked_search, setup_search_index
+
+QUERIES = ["python", "budget review", "kalomi", "deploy serv", "zepadu rukaqu", "dentist"]
+
+
+def like_search(db, query, limit=50):
+    return db.query(Note).filter(
+        Note.title.contains(query) | Note.content.contains(query)
+    ).order_by(Note.updated_at.desc()).limit(limit).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('1000,10000,50000'))
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url)
+    if not setup_search_index(engine):
+        print("❌ Full-text index unavailable on this database")
+        return
+    session = sessionmaker(bind=engine)()
+
+    print(f"{'notes':>8} {'LIKE p50 ms':>12} {'LIKE p95 ms':>12} {'FTS p50 ms':>12} {'FTS p95 ms':>12} {'speedup':>8}")
+    seeded = 0
+    try:
+        for size in sorted(args.sizes):
+            seed_notes(engine, size - seeded, start=seeded)
+            seeded = size
+
+            like = time_call(lambda: [like_search(session, q) for q in QUERIES], args.repeat)
+            fts = time_call(lambda: [ranked_search(session, Note, q) for q in QUERIES], args.repeat)
+            per_query = len(QUERIES)
+            print(
+                f"{size:>8} "
+                f"{like['p50'] / per_query:>12.2f} {like['p95'] / per_query:>12.2f} "
+                f"{fts['p50'] / per_query:>12.2f} {fts['p95'] / per_query:>12.2f} "
+                f"{like['p50'] / max(fts['p50'], 1e-9):>7.1f}x"
+            )
+    finally:
+        session.close()
+
+
+if __name__ == '__main__':
+    main()
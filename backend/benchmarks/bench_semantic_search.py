@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Semantic search vs. corpus size: time to embed the notes with the default
+hashing provider, to load the in-memory NumPy index, and per-query latency of
+the indexed top-k search against the pure-Python fallback.
+
+Usage:
+    python benchmarks/bench_semantic_search.py --sizes 1000,10000,100000
+    python benchmarks/bench_semantic_search.py --sizes 100000 --fallback-max 0
+"""
+
+import argparse
+import time
+
+from common import make_engine, parse_sizes, seed_notes, time_call
+
+from sqlalchemy.orm import sessionmaker
+
+from models import Note, NoteChange, NoteEmbedding
+from src.vector_index import NUMPY_AVAILABLE, VectorIndex, embed_pending, search_without_index
+
+QUERIES = ["python", "budget review meeting", "kalomi", "deploy the server", "dentist appointment", "travel hotel"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('1000,10000,100000'))
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--fallback-max', type=int, default=10000,
+                        help='largest corpus to time the pure-Python fallback on')
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("❌ numpy is not installed (pip install numpy)")
+        return
+
+    engine = make_engine(args.database_url)
+    session_factory = sessionmaker(bind=engine)
+    index = VectorIndex(session_factory, Note.__table__, NoteEmbedding.__table__, NoteChange.__table__)
+
+    print(f"{'notes':>8} {'embed s':>8} {'notes/s':>8} {'load ms':>8} {'index MB':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'fallback p50 ms':>16}")
+    seeded = 0
+    for size in sorted(args.sizes):
+        seed_notes(engine, size - seeded, start=seeded)
+        added, seeded = size - seeded, size
+
+        started = time.perf_counter()
+        embed_pending(session_factory, Note.__table__, NoteEmbedding.__table__)
+        embed_seconds = time.perf_counter() - started
+
+        index.reset()
+        started = time.perf_counter()
+        index.refresh()
+        load_ms = (time.perf_counter() - started) * 1000
+
+        indexed = time_call(lambda: [index.search(q, args.limit) for q in QUERIES], args.repeat)
+        per_query = len(QUERIES)
+        fallback = 'skipped'
+        if size <= args.fallback_max:
+            with session_factory() as db:
+                stats = time_call(
+                    lambda: [search_without_index(db, NoteEmbedding.__table__, q, args.limit) for q in QUERIES],
+                    max(1, args.repeat // 10)
+                )
+            fallback = f"{stats['p50'] / per_query:.1f}"
+        print(
+            f"{size:>8} {embed_seconds:>8.1f} {added / max(embed_seconds, 1e-9):>8.0f} {load_ms:>8.0f} "
+            f"{index.nbytes / 2 ** 20:>9.1f} "
+            f"{indexed['p50'] / per_query:>8.2f} {indexed['p95'] / per_query:>8.2f} {fallback:>16}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Serializing the full GET /notes list vs. corpus size, from query to JSON bytes:
+ORM objects + to_dict() + stdlib json (the original path), projected rows +
+note_row_to_dict() + stdlib json, and projected Core rows through the fast
+encoder (pre-encoded tags, orjson when installed).
+
+Usage:
+    python benchmarks/bench_serialization.py --sizes 1000,10000,100000
+"""
+
+import argparse
+import json
+
+from common import make_engine, parse_sizes, seed_notes, time_call
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from models import NOTE_FIELDS, Note, note_row_to_dict
+from src import serialization
+
+FIELDS = [name for name in NOTE_FIELDS if name != 'preview']
+ORDER = (Note.updated_at.desc(), Note.id.desc())
+
+
+def orm_to_dict(db):
+    notes = db.query(Note).order_by(*ORDER).all()
+    return json.dumps([note.to_dict() for note in notes]).encode('utf-8')
+
+
+def rows_to_dict(db):
+    rows = db.execute(select(*[NOTE_FIELDS[name] for name in FIELDS]).order_by(*ORDER)).all()
+    return json.dumps([note_row_to_dict(row, FIELDS) for row in rows]).encode('utf-8')
+
+
+def fast_encoder(db):
+    rows = db.execute(select(*[NOTE_FIELDS[name] for name in FIELDS]).order_by(*ORDER)).all()
+    return serialization.encode_note_rows(rows, FIELDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('1000,10000,100000'))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    encoder = 'orjson' if serialization.ORJSON_AVAILABLE else 'stdlib json'
+    print(f"Fast path encoder: {encoder}")
+    print(f"{'notes':>8} {'path':<28} {'total p50 ms':>13} {'encode p50 ms':>14} {'MB':>7}")
+    for size in args.sizes:
+        engine = make_engine()
+        seed_notes(engine, size)
+        db = sessionmaker(bind=engine)()
+        rows = db.execute(select(*[NOTE_FIELDS[name] for name in FIELDS]).order_by(*ORDER)).all()
+        notes = db.query(Note).order_by(*ORDER).all()
+
+        paths = [
+            ('ORM + to_dict + json', orm_to_dict,
+             lambda: json.dumps([note.to_dict() for note in notes]).encode('utf-8')),
+            ('rows + note_row_to_dict + json', rows_to_dict,
+             lambda: json.dumps([note_row_to_dict(row, FIELDS) for row in rows]).encode('utf-8')),
+            ('rows + fast encoder', fast_encoder,
+             lambda: serialization.encode_note_rows(rows, FIELDS)),
+        ]
+        for label, full, encode in paths:
+            body = full(db)
+            db.expire_all()
+            total = time_call(lambda: (full(db), db.expire_all()), repeat=args.repeat)
+            encoded = time_call(encode, repeat=args.repeat)
+            print(f"{size:>8} {label:<28} {total['p50']:>13.1f} {encoded['p50']:>14.1f} {len(body) / 1e6:>7.1f}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Time to first byte / first content token for /translate vs. /translate/stream,
+measured offline against stub_llm_server.py with simulated token latency.
+
+Usage:
+    python benchmarks/bench_streaming.py --requests 10 --latency-ms 200 --token-latency-ms 20
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+
+from common import BACKEND_DIR  # noqa: F401  (sets up sys.path)
+
+from werkzeug.serving import make_server
+
+from src import llm
+from stub_llm_server import StubLLMServer
+
+BODY = json.dumps({'title': 'Hello', 'content': 'Hello world. ' * 40, 'targetLang': 'es'})
+
+
+def measure(port, path):
+    """Return (ms to first content byte, ms to complete) for one request"""
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    started = time.perf_counter()
+    connection.request('POST', path, body=BODY, headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    first_content = None
+    while True:
+        line = response.fp.readline()
+        if not line:
+            break
+        if first_content is None and (line.startswith(b'event: content') or path == '/translate'):
+            first_content = time.perf_counter()
+    finished = time.perf_counter()
+    connection.close()
+    return (first_content - started) * 1000, (finished - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=10)
+    parser.add_argument('--latency-ms', type=int, default=200)
+    parser.add_argument('--token-latency-ms', type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ['LLM_CACHE_ENABLED'] = 'false'
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    from app import app
+
+    reply = json.dumps({'title': 'Hola', 'content': 'Hola mundo. ' * 40})
+    with StubLLMServer(latency_ms=args.latency_ms, token_latency_ms=args.token_latency_ms,
+                       reply=lambda messages: reply) as stub:
+        os.environ['LLM_ENDPOINT'] = stub.url
+        os.environ.setdefault('GITHUB_TOKEN', 'stub-token')
+        llm.set_response_cache(None)
+        llm.reset_llm_client()
+
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            print(f"{'endpoint':<20} {'first content ms':>17} {'complete ms':>12}")
+            for path in ('/translate', '/translate/stream'):
+                samples = [measure(server.server_port, path) for _ in range(args.requests)]
+                first = statistics.median(sample[0] for sample in samples)
+                total = statistics.median(sample[1] for sample in samples)
+                print(f"{path:<20} {first:>17.1f} {total:>12.1f}")
+        finally:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tag-filtered listing and tag counts vs. corpus size: filtering the JSON tags
+column (in Python, or with LIKE) vs. the normalized note_tags index.
+
+Usage:
+    python benchmarks/bench_tags.py --sizes 10000,100000
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+
+from common import make_engine, parse_sizes, seed_notes, time_call
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import sessionmaker
+
+from models import Note, NoteTag, Tag, rebuild_tag_index
+from src.tags import tag_counts, tag_filters
+
+PAGE_SIZE = 50
+RARE_TAG = 'rare'
+RARE_EVERY = 1000
+
+
+def page_query(db, condition):
+    return db.execute(
+        select(Note.id, Note.title, Note.tags).where(*condition)
+        .order_by(Note.updated_at.desc(), Note.id.desc()).limit(PAGE_SIZE)
+    ).all()
+
+
+def python_filter(db, tag):
+    """What clients had to do before: load every note and filter the decoded tags"""
+    rows = db.execute(select(Note.id, Note.title, Note.tags).order_by(Note.updated_at.desc())).all()
+    return [row for row in rows if tag in json.loads(row.tags)][:PAGE_SIZE]
+
+
+def like_filter(db, tag):
+    return page_query(db, [Note.tags.contains(f'"{tag}"')])
+
+
+def index_filter(db, tag):
+    return page_query(db, tag_filters(db, Note.id, Tag.__table__, NoteTag.__table__, [tag]))
+
+
+def python_counts(db):
+    counts = Counter()
+    for (tags,) in db.execute(select(Note.tags)):
+        counts.update(json.loads(tags))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('10000,100000'))
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    engine = make_engine()
+    session = sessionmaker(bind=engine)()
+    seeded = 0
+
+    print(f"{'notes':>8} {'tag':>6} {'python ms':>10} {'LIKE ms':>9} {'index ms':>9} "
+          f"{'counts py ms':>13} {'counts SQL ms':>14}")
+    try:
+        for size in sorted(args.sizes):
+            seed_notes(engine, size - seeded, start=seeded)
+            with engine.begin() as conn:
+                # A selective tag on every RARE_EVERY-th new note
+                conn.execute(
+                    update(Note.__table__)
+                    .where(Note.id > seeded, Note.id % RARE_EVERY == 0)
+                    .values(tags=func.replace(Note.tags, ']', f', "{RARE_TAG}"]'), updated_at=Note.updated_at)
+                )
+                started = time.perf_counter()
+                synced = rebuild_tag_index(conn, Note.id > seeded)
+                backfill = time.perf_counter() - started
+            seeded = size
+            print(f"{'':>8} backfilled {synced} notes at {synced / backfill:,.0f} notes/s")
+
+            counts_py = time_call(lambda: python_counts(session), max(1, args.repeat // 5))
+            counts_sql = time_call(lambda: tag_counts(session, Tag.__table__, NoteTag.__table__), args.repeat)
+            for tag in ('work', RARE_TAG):
+                assert [r.id for r in like_filter(session, tag)] == [r.id for r in index_filter(session, tag)]
+                python = time_call(lambda: python_filter(session, tag), max(1, args.repeat // 5))
+                like = time_call(lambda: like_filter(session, tag), args.repeat)
+                index = time_call(lambda: index_filter(session, tag), args.repeat)
+                print(
+                    f"{size:>8} {tag:>6} {python['p50']:>10.1f} {like['p50']:>9.2f} {index['p50']:>9.2f} "
+                    f"{counts_py['p50']:>13.1f} {counts_sql['p50']:>14.1f}"
+                )
+    finally:
+        session.close()
+
+
+if __name__ == '__main__':
+    main()
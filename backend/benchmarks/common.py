@@ -0,0 +1,99 @@
+"""
+Shared helpers for the benchmark scripts in this directory.
+Each benchmark seeds its own throwaway database so it never touches notes.db.
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+# Keep the app's default engine off the real notes.db while benchmarking
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import create_engine  # noqa: E402
+
+from models import Base, Note  # noqa: E402
+
+WORDS = (
+    "meeting project deadline budget review design sprint release customer "
+    "invoice travel flight hotel dinner recipe garden workout doctor dentist "
+    "birthday anniversary groceries coffee report quarterly roadmap hiring "
+    "interview onboarding security backup database migration deploy server "
+    "python javascript react flask postgres sqlite search index cache queue "
+    "lecture homework exam chapter summary idea draft outline research paper"
+).split()
+
+TAGS = ["work", "personal", "ideas", "todo", "travel", "study", "health", "finance"]
+
+_SYLLABLES = "ka lo mi ne ru sa ti vo ze pa qu ri do fe gu ha ji ko lu ma".split()
+
+# Realistic vocabulary: the common words above plus a long tail of rarer ones,
+# drawn with a Zipf-like distribution so that term frequencies resemble real text
+VOCABULARY = WORDS + [a + b + c for a in _SYLLABLES for b in _SYLLABLES for c in _SYLLABLES]
+_CUM_WEIGHTS = []
+_total = 0.0
+for _rank in range(len(VOCABULARY)):
+    _total += 1.0 / (_rank + 1)
+    _CUM_WEIGHTS.append(_total)
+
+
+def make_engine(database_url=None):
+    """Create an engine on `database_url` or a fresh temporary SQLite file"""
+    if database_url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix='notes-bench-'), 'bench.db')
+        database_url = f'sqlite:///{path}'
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def synthetic_note(rng, index, now):
+    title_words = rng.choices(VOCABULARY, cum_weights=_CUM_WEIGHTS, k=4)
+    content_words = rng.choices(VOCABULARY, cum_weights=_CUM_WEIGHTS, k=rng.randint(40, 200))
+    return {
+        'title': ' '.join(title_words).capitalize(),
+        'content': ' '.join(content_words),
+        'tags': '["' + '", "'.join(rng.sample(TAGS, rng.randint(1, 3))) + '"]',
+        'updated_at': now - timedelta(seconds=index),
+    }
+
+
+def seed_notes(engine, count, start=0, seed=42, batch_size=5000):
+    """Bulk insert `count` synthetic notes (executemany in batches)"""
+    rng = random.Random(seed + start)
+    now = datetime.utcnow()
+    insert = Note.__table__.insert()
+    with engine.begin() as conn:
+        for offset in range(start, start + count, batch_size):
+            rows = [
+                synthetic_note(rng, i, now)
+                for i in range(offset, min(offset + batch_size, start + count))
+            ]
+            conn.execute(insert, rows)
+
+
+def time_call(fn, repeat=20):
+    """Run fn `repeat` times and return latency stats in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'p50': statistics.median(samples),
+        'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'mean': statistics.fmean(samples),
+    }
+
+
+def parse_sizes(value):
+    return [int(size) for size in value.split(',') if size]
@@ -0,0 +1,26 @@
+import pytest
+from models import SessionLocal, get_engine, init_schema
+from src import llm
+from src.llm import reset_llm_client
+from stub_llm_server import StubLLMServer
+
+def pytest_configure(config):
+    """Create the test database schema once, as init_db.py does for a deployment"""
+    if SessionLocal is not None:
+        init_schema(get_engine())
+
+@pytest.fixture
+def stub_options():
+    """StubLLMServer arguments of the `stub` fixture; test modules override this to change replies or latency"""
+    return {}
+
+@pytest.fixture
+def stub(monkeypatch, stub_options):
+    """A stub LLM server the app's model client talks to, with the response cache off"""
+    with StubLLMServer(**stub_options) as server:
+        monkeypatch.setenv('GITHUB_TOKEN', 'stub-token')
+        monkeypatch.setenv('LLM_ENDPOINT', server.url)
+        monkeypatch.setattr(llm, '_response_cache', None)
+        reset_llm_client()
+        yield server
+        reset_llm_client()
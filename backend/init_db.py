@@ -1,33 +1,34 @@
 #!/usr/bin/env python3
 """
-Database initialization script for PostgreSQL
-Creates tables and initializes the database
+Database initialization script
+Creates tables and indexes and backfills derived data; run it after deploying
+a new version (the app no longer touches the schema when it starts)
 """
 
-import os
-from models import Base, engine
+from sqlalchemy import text
+
+from models import SessionLocal, get_engine, init_schema
 
 def init_database():
-    """Initialize the PostgreSQL database with required tables"""
-    
-    # Check if DATABASE_URL is set
-    database_url = os.getenv('DATABASE_URL')
-    if not database_url:
-        print("❌ DATABASE_URL environment variable not set!")
-        print("Please set DATABASE_URL to your PostgreSQL connection string")
-        return False
-    
+    """Initialize the database (DATABASE_URL, or the local SQLite file) with required tables"""
     try:
-        print("📋 Creating database tables...")
-        Base.metadata.create_all(engine)
+        engine = get_engine()
+        print(f"📋 Creating database tables on {engine.url.render_as_string(hide_password=True)}...")
+        migrated = init_schema(engine)
         print("✅ Database tables created successfully!")
+        print(f"✅ Tag index ready ({migrated['tags']} notes backfilled)")
+        print(f"✅ Change log ready ({migrated['changes']} notes backfilled)")
+        print(f"✅ Signatures ready ({migrated['signatures']} notes backfilled)")
+        if migrated['search']:
+            print("✅ Full-text search index ready!")
+        else:
+            print("⚠️  Full-text search unavailable, search will use LIKE scans")
         
         # Test database connection
-        from models import SessionLocal
         db = SessionLocal()
         try:
             # Test query
-            result = db.execute("SELECT 1").fetchone()
+            db.execute(text("SELECT 1")).fetchone()
             print("✅ Database connection test successful!")
         except Exception as e:
             print(f"⚠️  Database connection test failed: {e}")
@@ -41,7 +42,7 @@ def init_database():
         return False
 
 if __name__ == "__main__":
-    print("🚀 Initializing PostgreSQL database...")
+    print("🚀 Initializing database...")
     print("=" * 40)
     
     success = init_database()
@@ -51,4 +52,4 @@ if __name__ == "__main__":
         print("✅ Database initialization completed!")
     else:
         print("=" * 40)
-        print("❌ Database initialization failed!")
\ No newline at end of file
+        print("❌ Database initialization failed!")
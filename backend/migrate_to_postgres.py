@@ -2,97 +2,327 @@
 """
 Database migration script from SQLite to PostgreSQL
 Run this script to migrate existing SQLite data to PostgreSQL
+
+Rows are copied in id-ordered chunks (COPY on Postgres, multi-row INSERT
+elsewhere) with their original ids, optionally several chunks at a time.
+Every finished chunk is recorded in a checkpoint file, so an interrupted run
+picks up where it stopped. The run ends by resetting id sequences and
+comparing row counts and checksums of source and target.
+
+Usage:
+    DATABASE_URL=postgresql://... python migrate_to_postgres.py
+    python migrate_to_postgres.py --source sqlite:///notes.db --target postgresql://... --workers 4
+    python migrate_to_postgres.py --restart      # ignore the checkpoint and copy everything again
 """
 
-import os
+import argparse
+import hashlib
 import json
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from models import Note, Base
-from datetime import datetime
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from sqlalchemy import create_engine, delete, func, insert, inspect, select, text
+from models import Note, Base, rebuild_tag_index, rebuild_change_log
+from src.bulk import copy_rows
+from src.search import setup_search_index
+
+DEFAULT_SOURCE_URL = 'sqlite:///notes.db'
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_CHECKPOINT_PATH = '.migration_checkpoint.json'
+
+# Tables copied by the migrator, each keyed by an integer id column
+MIGRATED_TABLES = [Note.__table__]
+
+
+def normalize_url(url):
+    """Use the pg8000 driver for postgresql:// URLs, as models.get_database_url() does"""
+    if url.startswith('postgresql://'):
+        return url.replace('postgresql://', 'postgresql+pg8000://', 1)
+    return url
+
+
+class Checkpoint:
+    """Finished id ranges per table, persisted as JSON after every chunk"""
+
+    def __init__(self, path, source_url):
+        self.path = path
+        self.source_url = source_url
+        self.tables = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return self
+        with open(self.path) as f:
+            data = json.load(f)
+        if data.get('source') != self.source_url:
+            print(f"⚠️  Checkpoint {self.path} is for another source database, ignoring it")
+            return self
+        self.tables = {name: [tuple(r) for r in ranges] for name, ranges in data.get('tables', {}).items()}
+        return self
+
+    def is_done(self, table_name, first_id, last_id):
+        return any(lo <= first_id and last_id <= hi for lo, hi in self.tables.get(table_name, []))
+
+    def resume_after(self, table_name):
+        """Highest id below which every row has been migrated (the contiguous prefix)"""
+        last = None
+        for lo, hi in sorted(self.tables.get(table_name, [])):
+            if last is not None and lo > last + 1:
+                break
+            last = hi if last is None else max(last, hi)
+        return last
+
+    def mark_done(self, table_name, first_id, last_id):
+        with self._lock:
+            self.tables.setdefault(table_name, []).append((first_id, last_id))
+            if not self.path:
+                return
+            temporary = f"{self.path}.tmp"
+            with open(temporary, 'w') as f:
+                json.dump({'source': self.source_url, 'tables': self.tables}, f)
+            os.replace(temporary, self.path)
+
+    def clear(self):
+        self.tables = {}
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def chunk_ranges(engine, table, chunk_size):
+    """(first_id, last_id, rows) per chunk of chunk_size rows, streaming only the ids"""
+    ranges = []
+    first = last = None
+    count = 0
+    with engine.connect() as conn:
+        ids = conn.execute(select(table.c.id).order_by(table.c.id).execution_options(yield_per=10000))
+        for (row_id,) in ids:
+            if first is None:
+                first = row_id
+            last = row_id
+            count += 1
+            if count == chunk_size:
+                ranges.append((first, last, count))
+                first, count = None, 0
+    if first is not None:
+        ranges.append((first, last, count))
+    return ranges
+
+
+def source_columns(engine, table):
+    """Columns of the model table that exist in the source (older databases lack the newer ones)"""
+    existing = {column['name'] for column in inspect(engine).get_columns(table.name)}
+    return [column for column in table.columns if column.name in existing]
+
+
+def missing_column_values(table, columns):
+    """Values for the model columns a source table lacks: their scalar default, else NULL"""
+    present = {column.name for column in columns}
+    return {
+        column.name: column.default.arg if column.default is not None and column.default.is_scalar else None
+        for column in table.columns if column.name not in present
+    }
+
+
+def copy_chunk(source_engine, target_engine, table, first_id, last_id):
+    """
+    Copy one id range. Target rows in the range are deleted first, in the same
+    transaction, so re-running a chunk after a crash never duplicates rows.
+    """
+    in_range = table.c.id.between(first_id, last_id)
+    columns = source_columns(source_engine, table)
+    missing = missing_column_values(table, columns)
+    with source_engine.connect() as src:
+        rows = [
+            {**missing, **row._mapping}
+            for row in src.execute(select(*columns).where(in_range).order_by(table.c.id))
+        ]
+
+    with target_engine.begin() as dst:
+        dst.execute(delete(table).where(in_range))
+        if rows:
+            if dst.dialect.name == 'postgresql':
+                copy_rows(dst.connection.dbapi_connection, table.name, [c.name for c in table.columns], rows)
+            else:
+                dst.execute(insert(table), rows)
+    return len(rows)
+
+
+def reset_sequence(engine, table):
+    """Point a Postgres id sequence past the copied ids so new rows do not collide"""
+    if engine.dialect.name != 'postgresql':
+        return
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 1), "
+            f"(SELECT MAX(id) FROM {table.name}) IS NOT NULL)"
+        ))
+
+
+def table_checksum(engine, table, columns=None):
+    """(row count, sha256 over every row in id order), over `columns` (default: all of the model's)"""
+    digest = hashlib.sha256()
+    count = 0
+    with engine.connect() as conn:
+        rows = conn.execute(select(*(columns or table.columns)).order_by(table.c.id).execution_options(yield_per=10000))
+        for row in rows:
+            digest.update(json.dumps(list(row), default=str).encode('utf-8'))
+            count += 1
+    return count, digest.hexdigest()
 
-def migrate_sqlite_to_postgres():
+
+def migrate_table(source_engine, target_engine, table, chunk_size, workers, checkpoint):
+    ranges = chunk_ranges(source_engine, table, chunk_size)
+    total = sum(rows for _, _, rows in ranges)
+    pending = [(first, last, rows) for first, last, rows in ranges if not checkpoint.is_done(table.name, first, last)]
+    already = total - sum(rows for _, _, rows in pending)
+
+    print(f"📊 {table.name}: {total} rows in {len(ranges)} chunks")
+    if already:
+        print(f"⏩ Resuming after id {checkpoint.resume_after(table.name)} ({already} rows already migrated)")
+
+    lock = threading.Lock()
+    copied = 0
+    started = time.perf_counter()
+
+    def run(first, last):
+        nonlocal copied
+        rows = copy_chunk(source_engine, target_engine, table, first, last)
+        checkpoint.mark_done(table.name, first, last)
+        with lock:
+            copied += rows
+            elapsed = time.perf_counter() - started
+            done = already + copied
+            print(f"📦 {table.name} ids {first}-{last}: {done}/{total} rows "
+                  f"({100 * done / max(total, 1):.1f}%), {copied / max(elapsed, 1e-9):,.0f} rows/s")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(run, first, last) for first, last, _ in pending]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            # Drop queued chunks; the ones in flight finish and are checkpointed
+            for future in futures:
+                future.cancel()
+            raise
+
+    elapsed = time.perf_counter() - started
+    if copied:
+        print(f"✅ {table.name}: copied {copied} rows in {elapsed:.1f}s ({copied / max(elapsed, 1e-9):,.0f} rows/s)")
+    reset_sequence(target_engine, table)
+    return copied
+
+
+def verify_table(source_engine, target_engine, table):
+    # Columns the source lacks were filled with defaults, so only the others are compared
+    columns = source_columns(source_engine, table)
+    source_count, source_sum = table_checksum(source_engine, table, columns)
+    target_count, target_sum = table_checksum(target_engine, table, columns)
+    if (source_count, source_sum) == (target_count, target_sum):
+        print(f"✅ {table.name}: {target_count} rows, checksum {target_sum[:16]} matches")
+        return True
+    print(f"❌ {table.name}: source {source_count} rows ({source_sum[:16]}), "
+          f"target {target_count} rows ({target_sum[:16]})")
+    return False
+
+
+def migrate_sqlite_to_postgres(source_url=DEFAULT_SOURCE_URL, target_url=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                               workers=1, checkpoint_path=DEFAULT_CHECKPOINT_PATH, restart=False, overwrite=False):
     """Migrate data from SQLite to PostgreSQL"""
-    
-    # Check if DATABASE_URL is set
-    database_url = os.getenv('DATABASE_URL')
-    if not database_url:
+
+    target_url = target_url or os.getenv('DATABASE_URL')
+    if not target_url:
         print("❌ DATABASE_URL environment variable not set!")
         print("Please set DATABASE_URL to your PostgreSQL connection string")
         return False
-    
-    # SQLite connection (local database)
-    sqlite_url = 'sqlite:///notes.db'
-    sqlite_engine = create_engine(sqlite_url)
-    sqlite_session = sessionmaker(bind=sqlite_engine)()
-    
-    # PostgreSQL connection
-    postgres_engine = create_engine(database_url)
-    postgres_session = sessionmaker(bind=postgres_engine)()
-    
+
+    source_engine = create_engine(normalize_url(source_url))
+    # One pooled connection per parallel chunk (SQLite uses its own pool classes)
+    pool_options = {} if target_url.startswith('sqlite') else {'pool_size': max(1, workers), 'max_overflow': 0}
+    target_engine = create_engine(normalize_url(target_url), **pool_options)
+
+    checkpoint = Checkpoint(checkpoint_path, source_url)
+    if restart:
+        checkpoint.clear()
+    else:
+        checkpoint.load()
+
     try:
         # Create tables in PostgreSQL
-        print("📋 Creating tables in PostgreSQL...")
-        Base.metadata.create_all(postgres_engine)
-        
-        # Check if SQLite database exists and has data
-        try:
-            sqlite_notes = sqlite_session.query(Note).all()
-            print(f"📊 Found {len(sqlite_notes)} notes in SQLite database")
-            
-            if len(sqlite_notes) == 0:
-                print("ℹ️  No data to migrate from SQLite")
-                return True
-            
-            # Migrate each note
-            migrated_count = 0
-            for note in sqlite_notes:
-                try:
-                    # Create new note in PostgreSQL
-                    new_note = Note(
-                        title=note.title,
-                        content=note.content,
-                        tags=note.tags,
-                        event_date=note.event_date,
-                        event_time=note.event_time,
-                        updated_at=note.updated_at
-                    )
-                    postgres_session.add(new_note)
-                    migrated_count += 1
-                    
-                except Exception as e:
-                    print(f"⚠️  Error migrating note {note.id}: {e}")
-                    continue
-            
-            # Commit all changes
-            postgres_session.commit()
-            print(f"✅ Successfully migrated {migrated_count} notes to PostgreSQL")
-            
-        except Exception as e:
-            print(f"⚠️  SQLite database not found or empty: {e}")
-            print("ℹ️  Proceeding with empty PostgreSQL database")
-        
+        print("📋 Creating tables in target database...")
+        Base.metadata.create_all(target_engine)
+
+        if not overwrite:
+            for table in MIGRATED_TABLES:
+                with target_engine.connect() as conn:
+                    existing = conn.execute(select(func.count()).select_from(table)).scalar()
+                if existing and not checkpoint.tables.get(table.name):
+                    print(f"❌ Target table {table.name} already has {existing} rows and there is no checkpoint")
+                    print("Pass --overwrite to replace rows with matching ids")
+                    return False
+
+        for table in MIGRATED_TABLES:
+            migrate_table(source_engine, target_engine, table, chunk_size, workers, checkpoint)
+
+        # note_tags is derived from notes.tags, so it is rebuilt rather than copied
+        print("🏷️  Rebuilding tag index...")
+        with target_engine.begin() as conn:
+            rebuild_tag_index(conn)
+
+        # So is note_changes: clients of the old database resync from scratch
+        print("🔄 Rebuilding the change log...")
+        with target_engine.begin() as conn:
+            rebuild_change_log(conn)
+
+        print("🔎 Building full-text search index...")
+        setup_search_index(target_engine)
+
         # Verify migration
-        postgres_notes = postgres_session.query(Note).all()
-        print(f"📊 PostgreSQL database now contains {len(postgres_notes)} notes")
-        
-        return True
-        
+        print("🔍 Verifying row counts and checksums...")
+        verified = all(verify_table(source_engine, target_engine, table) for table in MIGRATED_TABLES)
+        if verified:
+            checkpoint.clear()
+        return verified
+
     except Exception as e:
         print(f"❌ Migration failed: {e}")
-        postgres_session.rollback()
+        print("Progress is saved; run the script again to resume")
         return False
-        
+
     finally:
-        sqlite_session.close()
-        postgres_session.close()
+        source_engine.dispose()
+        target_engine.dispose()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', default=DEFAULT_SOURCE_URL, help='source database URL (default: sqlite:///notes.db)')
+    parser.add_argument('--target', default=None, help='target database URL (default: $DATABASE_URL)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=1, help='chunks copied in parallel')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH, help='checkpoint file path')
+    parser.add_argument('--restart', action='store_true', help='ignore the checkpoint and start over')
+    parser.add_argument('--overwrite', action='store_true', help='allow writing into non-empty target tables')
+    return parser.parse_args()
 
 if __name__ == "__main__":
+    args = parse_args()
     print("🚀 Starting database migration from SQLite to PostgreSQL...")
     print("=" * 50)
-    
-    success = migrate_sqlite_to_postgres()
-    
+
+    success = migrate_sqlite_to_postgres(
+        source_url=args.source,
+        target_url=args.target,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        restart=args.restart,
+        overwrite=args.overwrite
+    )
+
     if success:
         print("=" * 50)
         print("✅ Migration completed successfully!")
@@ -100,4 +330,4 @@ if __name__ == "__main__":
     else:
         print("=" * 50)
         print("❌ Migration failed!")
-        print("Please check your DATABASE_URL and try again")
\ No newline at end of file
+        print("Please check your DATABASE_URL and try again")
@@ -1,12 +1,27 @@
 from datetime import datetime
 import json
 import os
+import threading
 
 # Try to import SQLAlchemy, fallback if not available
 try:
-    from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Time, create_engine
+    from sqlalchemy import (
+        BigInteger, Column, Integer, String, Text, Boolean, DateTime, Date, Time, ForeignKey, Index, LargeBinary,
+        create_engine, delete, event, func, inspect, text
+    )
+    from sqlalchemy.schema import CreateColumn
     from sqlalchemy.ext.declarative import declarative_base
-    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.orm import Session, sessionmaker
+    from sqlalchemy.orm.attributes import get_history
+    from src.search import setup_search_index
+    from src.tags import normalize_tags, parse_tags, sync_note_tags, rebuild_note_tags, needs_tag_backfill
+    from src.sync import record_changes, record_inserted, needs_change_backfill
+    from src.pool import get_engine_options, instrument_pool
+    from src.metrics import instrument_engine
+    from src.slow_queries import instrument_slow_queries
+    from src.events import parse_event_date, parse_event_time
+    from src.embeddings import sync_embeddings
+    from src.near_duplicates import delete_signatures, needs_signature_backfill, sign_unsigned_notes, sync_signatures
     SQLALCHEMY_AVAILABLE = True
 except ImportError:
     SQLALCHEMY_AVAILABLE = False
@@ -25,6 +40,17 @@ if SQLALCHEMY_AVAILABLE:
         event_date = Column(Date, nullable=True)  # Optional event date
         event_time = Column(Time, nullable=True)  # Optional event time
         updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+        # Optimistic locking: bumped by every write, checked by PATCH (see src/note_updates.py)
+        version = Column(Integer, nullable=False, default=1, server_default='1')
+
+        __table_args__ = (
+            # Backs keyset pagination on (updated_at, id) in GET /notes
+            Index('ix_notes_updated_at_id', updated_at.desc(), id.desc()),
+            # Backs date range queries in GET /events
+            Index('ix_notes_event_date_time', event_date, event_time),
+        )
+        # ORM updates and deletes also check and bump the version
+        __mapper_args__ = {'version_id_col': version}
         
         def to_dict(self):
             return {
@@ -34,7 +60,8 @@ if SQLALCHEMY_AVAILABLE:
                 'tags': json.loads(self.tags) if self.tags else [],
                 'eventDate': self.event_date.isoformat() if self.event_date else None,
                 'eventTime': self.event_time.isoformat() if self.event_time else None,
-                'updatedAt': self.updated_at.isoformat()
+                'updatedAt': self.updated_at.isoformat(),
+                'version': self.version
             }
         
         @classmethod
@@ -42,9 +69,244 @@ if SQLALCHEMY_AVAILABLE:
             note = cls()
             note.title = data.get('title', '')
             note.content = data.get('content', '')
-            note.tags = json.dumps(data.get('tags', []))
+            note.tags = json.dumps(normalize_tags(data.get('tags', [])))
+            return note
+        
+        @classmethod
+        def from_generated(cls, generated):
+            """Build a note from generate_structured_notes() output"""
+            note = cls()
+            note.title = generated['title']
+            note.content = generated['content']
+            note.tags = json.dumps(normalize_tags(generated['tags']))
+            # The model returns strings; store real DATE/TIME values (or NULL) for range queries
+            note.event_date = parse_event_date(generated.get('event_date'))
+            note.event_time = parse_event_time(generated.get('event_time'))
             return note
 
+    class Tag(Base):
+        __tablename__ = 'tags'
+        
+        id = Column(Integer, primary_key=True)
+        name = Column(String(100), nullable=False, unique=True)
+
+    class NoteTag(Base):
+        """Note ↔ tag links kept in step with notes.tags (see src/tags.py)"""
+        __tablename__ = 'note_tags'
+        
+        note_id = Column(Integer, ForeignKey('notes.id', ondelete='CASCADE'), primary_key=True)
+        tag_id = Column(Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True)
+
+        __table_args__ = (
+            # Backs tag filters: notes for a tag without touching the notes table
+            Index('ix_note_tags_tag_id_note_id', tag_id, note_id),
+        )
+
+    class NoteChange(Base):
+        """Latest change per note, in commit order; deletes leave a tombstone (see src/sync.py)"""
+        __tablename__ = 'note_changes'
+        
+        seq = Column(Integer, primary_key=True)  # monotonic change sequence, never reused
+        note_id = Column(Integer, nullable=False, unique=True)  # no FK: tombstones outlive their note
+        deleted = Column(Boolean, nullable=False, default=False)
+        changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+        __table_args__ = {'sqlite_autoincrement': True}
+
+    class NoteEmbedding(Base):
+        """Semantic search vector of a note's title and content (see src/embeddings.py)"""
+        __tablename__ = 'note_embeddings'
+        
+        note_id = Column(Integer, ForeignKey('notes.id', ondelete='CASCADE'), primary_key=True)
+        model = Column(String(100), nullable=False)  # provider model id; vectors of other models are ignored
+        text_hash = Column(String(40), nullable=False)  # sha1 of the embedded text
+        vector = Column(LargeBinary, nullable=False)  # little-endian float32, L2-normalized
+
+    class NoteSignature(Base):
+        """MinHash signature of a note's title and content (see src/near_duplicates.py)"""
+        __tablename__ = 'note_signatures'
+        
+        note_id = Column(Integer, ForeignKey('notes.id', ondelete='CASCADE'), primary_key=True)
+        text_hash = Column(String(40), nullable=False)  # sha1 of the signed text and signature scheme
+        signature = Column(LargeBinary, nullable=False)  # little-endian uint32s, empty for notes without words
+
+    class NoteBucket(Base):
+        """LSH band buckets of note signatures: notes sharing a bucket are near-duplicate candidates"""
+        __tablename__ = 'note_lsh_buckets'
+        
+        note_id = Column(Integer, ForeignKey('notes.id', ondelete='CASCADE'), primary_key=True)
+        band = Column(Integer, primary_key=True)
+        bucket = Column(BigInteger, nullable=False)
+
+        __table_args__ = (
+            # Candidate lookups by bucket, answered from the index alone
+            Index('ix_note_lsh_buckets_band_bucket', band, bucket, note_id),
+        )
+
+    @event.listens_for(Session, 'after_flush')
+    def sync_tags_after_flush(session, flush_context):
+        """Keep note_tags and note_changes in step with every ORM write of a note"""
+        changed = {
+            note.id: parse_tags(note.tags)
+            for note in list(session.new) + list(session.dirty)
+            if isinstance(note, Note) and (note in session.new or get_history(note, 'tags').has_changes())
+        }
+        written = [
+            note.id for note in list(session.new) + list(session.dirty)
+            if isinstance(note, Note) and (note in session.new or session.is_modified(note))
+        ]
+        deleted = [note.id for note in session.deleted if isinstance(note, Note)]
+        if not written and not deleted:
+            return
+        conn = session.connection()
+        index_written_notes(conn, written, changed)
+        index_deleted_notes(conn, deleted)
+
+    def index_written_notes(conn, note_ids, note_tags=None):
+        """Tag links ({note_id: [names]} for notes whose tags changed), change log entries, embeddings and signatures for written notes"""
+        sync_note_tags(conn, Tag.__table__, NoteTag.__table__, note_tags or {})
+        record_changes(conn, NoteChange.__table__, note_ids)
+        sync_embeddings(conn, Note.__table__, NoteEmbedding.__table__, note_ids)
+        sync_signatures(conn, Note.__table__, NoteSignature.__table__, NoteBucket.__table__, note_ids)
+
+    def index_deleted_notes(conn, note_ids):
+        """Drop the tag links, embeddings and signatures of deleted notes and leave tombstones in the change log"""
+        if not note_ids:
+            return
+        # Not left to ON DELETE CASCADE: SQLite does not enforce foreign keys by default
+        conn.execute(delete(NoteTag.__table__).where(NoteTag.note_id.in_(note_ids)))
+        conn.execute(delete(NoteEmbedding.__table__).where(NoteEmbedding.note_id.in_(note_ids)))
+        delete_signatures(conn, NoteSignature.__table__, NoteBucket.__table__, note_ids)
+        record_changes(conn, NoteChange.__table__, note_ids, deleted=True)
+
+    def rebuild_tag_index(conn, where=None):
+        """Re-sync note_tags from notes.tags, e.g. after bulk inserts that bypass the ORM"""
+        return rebuild_note_tags(conn, Note.__table__, Tag.__table__, NoteTag.__table__, where=where)
+
+    def index_inserted_notes(conn, where):
+        """Tag links, change log entries and signatures for notes bulk-inserted outside the ORM"""
+        rebuild_tag_index(conn, where)
+        record_inserted(conn, NoteChange.__table__, Note.__table__, where)
+        sign_unsigned_notes(conn, Note.__table__, NoteSignature.__table__, NoteBucket.__table__, where)
+
+    def migrate_tags(engine):
+        """Fill note_tags from the JSON tags column on databases created before it existed"""
+        with engine.begin() as conn:
+            if needs_tag_backfill(conn, Note.__table__, NoteTag.__table__):
+                return rebuild_tag_index(conn)
+        return 0
+
+    def rebuild_change_log(conn):
+        """Replace note_changes with one entry per note, oldest edit first (no tombstones)"""
+        conn.execute(delete(NoteChange.__table__))
+        return record_inserted(conn, NoteChange.__table__, Note.__table__, order_by=[Note.updated_at, Note.id])
+
+    def migrate_signatures(engine):
+        """Compute near-duplicate signatures for notes written before they existed"""
+        with engine.begin() as conn:
+            if needs_signature_backfill(conn, Note.__table__, NoteSignature.__table__):
+                return sign_unsigned_notes(conn, Note.__table__, NoteSignature.__table__, NoteBucket.__table__)
+        return 0
+
+    def migrate_changes(engine):
+        """Seed note_changes with every note, oldest edit first, on databases created before it existed"""
+        with engine.begin() as conn:
+            if needs_change_backfill(conn, Note.__table__, NoteChange.__table__):
+                return rebuild_change_log(conn)
+        return 0
+
+    class LLMCacheEntry(Base):
+        """Persistent tier of the LLM response cache (see src/llm_cache.py)"""
+        __tablename__ = 'llm_cache'
+        
+        key = Column(String(64), primary_key=True)  # sha256 of the request parameters
+        value = Column(Text, nullable=False)  # JSON-encoded parsed response
+        created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+        expires_at = Column(DateTime, nullable=False, index=True)
+
+    class Job(Base):
+        """Durable queue entry for background LLM work (see src/jobs.py and worker.py)"""
+        __tablename__ = 'jobs'
+        
+        id = Column(Integer, primary_key=True)
+        kind = Column(String(32), nullable=False)
+        status = Column(String(16), nullable=False, default='queued')  # queued, running, done, error
+        payload = Column(Text, nullable=False)  # JSON-encoded task input
+        result = Column(Text)  # JSON-encoded task output
+        error = Column(Text)
+        attempts = Column(Integer, nullable=False, default=0)
+        max_attempts = Column(Integer, nullable=False, default=3)
+        run_after = Column(DateTime, nullable=False, default=datetime.utcnow)  # retry backoff
+        locked_by = Column(String(64))  # worker id holding the lease
+        locked_at = Column(DateTime)
+        created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+        started_at = Column(DateTime)
+        finished_at = Column(DateTime)
+
+        __table_args__ = (
+            # Backs the worker's claim query (oldest runnable queued job first)
+            Index('ix_jobs_status_run_after', status, run_after, id),
+        )
+        
+        def to_dict(self):
+            return {
+                'id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'payload': json.loads(self.payload) if self.payload else None,
+                'result': json.loads(self.result) if self.result else None,
+                'error': self.error,
+                'attempts': self.attempts,
+                'createdAt': self.created_at.isoformat() if self.created_at else None,
+                'startedAt': self.started_at.isoformat() if self.started_at else None,
+                'finishedAt': self.finished_at.isoformat() if self.finished_at else None
+            }
+
+    PREVIEW_LENGTH = 100
+
+    # API field name -> column expression, so projections are pushed into the SELECT
+    NOTE_FIELDS = {
+        'id': Note.id,
+        'title': Note.title,
+        'content': Note.content,
+        'preview': func.substr(Note.content, 1, PREVIEW_LENGTH).label('preview'),
+        'tags': Note.tags,
+        'eventDate': Note.event_date,
+        'eventTime': Note.event_time,
+        'updatedAt': Note.updated_at,
+        'version': Note.version,
+    }
+
+    def note_row_to_dict(row, fields):
+        """Serialize a projected row (selected via NOTE_FIELDS) like Note.to_dict()"""
+        data = {}
+        for name, value in zip(fields, row):
+            if name == 'tags':
+                value = json.loads(value) if value else []
+            elif name in ('eventDate', 'eventTime', 'updatedAt'):
+                value = value.isoformat() if value else None
+            data[name] = value
+        return data
+
+    def ensure_columns(engine):
+        """Add columns added to the models after their tables already existed (they need a server default)"""
+        inspector = inspect(engine)
+        with engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                if not inspector.has_table(table.name):
+                    continue
+                existing = {column['name'] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name not in existing:
+                        ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                        conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+
+    def ensure_indexes(engine):
+        """Create indexes added to the models after their tables already existed"""
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+
     # Database setup - supports both local SQLite and production Postgres
     def get_database_url():
         """Get database URL from environment variable or default to SQLite"""
@@ -57,14 +319,51 @@ if SQLALCHEMY_AVAILABLE:
         else:
             return 'sqlite:///notes.db'
 
-    try:
-        engine = create_engine(get_database_url(), echo=False)
+    def init_schema(engine):
+        """
+        Create missing tables, columns and indexes, backfill the derived tables
+        and set up full-text search. Safe to repeat; run by init_db.py, not at import.
+        """
         Base.metadata.create_all(engine)
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    except Exception as e:
-        print(f"Database setup failed: {e}")
-        engine = None
-        SessionLocal = None
+        ensure_columns(engine)
+        ensure_indexes(engine)
+        return {
+            'tags': migrate_tags(engine),
+            'changes': migrate_changes(engine),
+            'signatures': migrate_signatures(engine),
+            'search': setup_search_index(engine),
+        }
+
+    # The engine is created on first use rather than at import, so processes
+    # that never touch the database (and cold starts until they do) skip it
+    _engine = None
+    _engine_lock = threading.Lock()
+
+    def get_engine():
+        """The application engine, created and instrumented on the first call"""
+        global _engine
+        if _engine is None:
+            with _engine_lock:
+                if _engine is None:
+                    database_url = get_database_url()
+                    try:
+                        engine = create_engine(database_url, echo=False, **get_engine_options(database_url))
+                    except Exception as e:
+                        print(f"Database setup failed: {e}")
+                        raise
+                    instrument_pool(engine)
+                    instrument_engine(engine)
+                    instrument_slow_queries(engine)
+                    _engine = engine
+        return _engine
+
+    class EngineSession(Session):
+        """Session bound to get_engine() unless given another bind"""
+
+        def __init__(self, bind=None, **kwargs):
+            super().__init__(bind=bind if bind is not None else get_engine(), **kwargs)
+
+    SessionLocal = sessionmaker(class_=EngineSession, autocommit=False, autoflush=False)
 else:
     # Fallback classes when SQLAlchemy is not available
     class Note:
@@ -76,6 +375,7 @@ else:
             self.event_date = None
             self.event_time = None
             self.updated_at = datetime.utcnow()
+            self.version = 1
         
         def to_dict(self):
             return {
@@ -85,7 +385,8 @@ else:
                 'tags': json.loads(self.tags) if self.tags else [],
                 'eventDate': self.event_date.isoformat() if self.event_date else None,
                 'eventTime': self.event_time.isoformat() if self.event_time else None,
-                'updatedAt': self.updated_at.isoformat()
+                'updatedAt': self.updated_at.isoformat(),
+                'version': self.version
             }
         
         @classmethod
@@ -95,6 +396,18 @@ else:
             note.content = data.get('content', '')
             note.tags = json.dumps(data.get('tags', []))
             return note
+        
+        @classmethod
+        def from_generated(cls, generated):
+            note = cls()
+            note.title = generated['title']
+            note.content = generated['content']
+            note.tags = json.dumps(generated['tags'])
+            note.event_date = generated.get('event_date')
+            note.event_time = generated.get('event_time')
+            return note
     
-    engine = None
+    def get_engine():
+        return None
+
     SessionLocal = None
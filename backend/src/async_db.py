@@ -0,0 +1,131 @@
+import asyncio
+import contextvars
+import functools
+import importlib.util
+import os
+import weakref
+from typing import Any, Callable, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+from src.pool import get_engine_options
+
+try:
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    SQLALCHEMY_ASYNCIO_AVAILABLE = True
+except ImportError:
+    AsyncSession = None
+    create_async_engine = None
+    SQLALCHEMY_ASYNCIO_AVAILABLE = False
+
+# Database access for the async routes of asgi.py.
+#
+# Route code is the same synchronous ORM code the Flask views run, passed to
+# AsyncDatabase.run(). With an async driver installed (aiosqlite for SQLite,
+# asyncpg for Postgres) it runs through AsyncSession.run_sync() on an async
+# engine: every statement is awaited on the event loop, and the session hooks
+# that keep tags, the change log and the other derived tables current still
+# fire. Without one it runs on a regular session in a worker thread, which
+# still keeps the event loop free.
+#
+# SQLite takes one writer at a time and makes the others poll until its busy
+# timeout, which fails writes under load; on SQLite, write() queues writers
+# on the event loop instead.
+#
+# Environment variables:
+#   ASYNC_DB_DRIVER  'auto' (default): use an async driver when installed;
+#                    'thread' always runs sessions in worker threads
+
+# Backend name -> (module that must be importable, SQLAlchemy driver name)
+ASYNC_DRIVERS = {
+    'sqlite': ('aiosqlite', 'sqlite+aiosqlite'),
+    'postgresql': ('asyncpg', 'postgresql+asyncpg'),
+}
+
+
+def async_database_url(database_url: str) -> Optional[str]:
+    """database_url with its async driver, or None when there is none to use"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        return None
+    if backend == 'sqlite' and url.database in (None, '', ':memory:'):
+        # A second engine would see a different in-memory database
+        return None
+    module, drivername = ASYNC_DRIVERS[backend]
+    if importlib.util.find_spec(module) is None:
+        return None
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def get_async_engine_options(database_url: str) -> dict:
+    """get_engine_options() with the pool classes an async engine accepts"""
+    options = get_engine_options(database_url)
+    poolclass = options.pop('poolclass', None)
+    if poolclass is not None:
+        options['poolclass'] = NullPool if issubclass(poolclass, NullPool) else AsyncAdaptedQueuePool
+    return options
+
+
+async def run_in_thread(fn: Callable[..., Any], *args) -> Any:
+    """asyncio.to_thread() without its Python 3.9 requirement: fn keeps the caller's context"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(None, functools.partial(context.run, fn, *args))
+
+
+class AsyncDatabase:
+    """Runs session work for async routes without blocking the event loop"""
+
+    def __init__(self, engine, session_factory):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.async_engine = None
+        mode = os.getenv('ASYNC_DB_DRIVER', 'auto').strip().lower()
+        if mode not in ('auto', 'thread'):
+            raise ValueError(f"ASYNC_DB_DRIVER must be 'auto' or 'thread', got {mode!r}")
+        url = self.engine.url.render_as_string(hide_password=False)
+        async_url = async_database_url(url) if mode == 'auto' and SQLALCHEMY_ASYNCIO_AVAILABLE else None
+        if async_url is not None:
+            self.async_engine = create_async_engine(async_url, **get_async_engine_options(url))
+        self._serialize_writes = self.async_engine is not None and self.engine.dialect.name == 'sqlite'
+        self._write_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def driver(self) -> str:
+        return self.async_engine.dialect.driver if self.async_engine is not None else 'thread'
+
+    def instrument(self, *instrumentations: Callable[[Any], None]):
+        """Apply engine instrumentation (metrics, slow query log) to the async engine too"""
+        if self.async_engine is not None:
+            for instrument in instrumentations:
+                instrument(self.async_engine.sync_engine)
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Call fn(session, *args) and return its result; fn commits if it writes"""
+        if self.async_engine is not None:
+            async with AsyncSession(self.async_engine, autoflush=False, expire_on_commit=False) as session:
+                return await session.run_sync(fn, *args)
+        return await run_in_thread(self._run_in_thread, fn, *args)
+
+    async def write(self, fn: Callable[..., Any], *args) -> Any:
+        """run() for work that writes"""
+        if not self._serialize_writes:
+            return await self.run(fn, *args)
+        loop = asyncio.get_running_loop()
+        lock = self._write_locks.get(loop)
+        if lock is None:
+            lock = self._write_locks[loop] = asyncio.Lock()
+        async with lock:
+            return await self.run(fn, *args)
+
+    def _run_in_thread(self, fn, *args):
+        with self.session_factory() as db:
+            return fn(db, *args)
+
+    async def dispose(self):
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
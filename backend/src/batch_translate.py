@@ -0,0 +1,131 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Tuple
+
+from src import llm
+
+# Batch translation of many notes into many languages.
+#
+# Short notes for the same target language are packed into one prompt as long
+# as the estimated input stays within PACK_TOKEN_BUDGET (translations come back
+# roughly as long as their input, and completions are capped at 2000 tokens).
+# Longer notes are translated on their own. Packs and single notes run
+# concurrently on a bounded thread pool, so at most BATCH_TRANSLATE_WORKERS
+# model calls are in flight per batch.
+
+PACK_TOKEN_BUDGET = int(os.getenv('BATCH_TRANSLATE_PACK_TOKENS', 800))
+PACK_MAX_ITEMS = int(os.getenv('BATCH_TRANSLATE_PACK_ITEMS', 10))
+MAX_WORKERS = int(os.getenv('BATCH_TRANSLATE_WORKERS', 4))
+
+# Per-note JSON framing in the packed prompt ({"id": .., "title": .., "content": ..})
+_ITEM_OVERHEAD_TOKENS = 12
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) without a tokenizer dependency"""
+    return len(text) // 4 + 1
+
+
+def item_tokens(item: Dict[str, Any]) -> int:
+    return estimate_tokens(item['text']) + estimate_tokens(item.get('title') or '') + _ITEM_OVERHEAD_TOKENS
+
+
+def plan_work(
+    items: List[Dict[str, Any]],
+    budget: int = PACK_TOKEN_BUDGET,
+    max_items: int = PACK_MAX_ITEMS
+) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Split items (each with id, text, title, targetLang) into work units:
+    ('pack', [items...]) sharing one prompt, or ('single', [item]).
+    """
+    units: List[Tuple[str, List[Dict[str, Any]]]] = []
+    packs: Dict[str, List[Dict[str, Any]]] = {}
+    pack_tokens: Dict[str, int] = {}
+
+    for item in items:
+        tokens = item_tokens(item)
+        if tokens > budget:
+            units.append(('single', [item]))
+            continue
+
+        language = item['targetLang']
+        current = packs.setdefault(language, [])
+        if current and (pack_tokens[language] + tokens > budget or len(current) >= max_items):
+            units.append(('pack', current))
+            current = packs[language] = []
+            pack_tokens[language] = 0
+        current.append(item)
+        pack_tokens[language] = pack_tokens.get(language, 0) + tokens
+
+    units.extend(('pack', pack) for pack in packs.values() if pack)
+    return units
+
+
+def _result(item: Dict[str, Any], translated: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        'noteId': item['id'],
+        'targetLang': item['targetLang'],
+        'status': 'done',
+        'title': translated['title'],
+        'content': translated['content'],
+    }
+
+
+def _error(item: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+    return {
+        'noteId': item['id'],
+        'targetLang': item['targetLang'],
+        'status': 'error',
+        'error': str(error),
+    }
+
+
+def _translate_single(item: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        translated = llm.translate_text(
+            text=item['text'],
+            target_language=item['targetLang'],
+            title=item.get('title'),
+            cache_scope=item.get('cache_scope')
+        )
+        return _result(item, translated)
+    except Exception as e:
+        return _error(item, e)
+
+
+def _run_unit(kind: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if kind == 'single' or len(items) == 1:
+        return [_translate_single(item) for item in items]
+
+    try:
+        translated = llm.translate_batch(items, items[0]['targetLang'])
+    except Exception:
+        translated = {}
+
+    results = []
+    for item in items:
+        if item['id'] in translated:
+            results.append(_result(item, translated[item['id']]))
+        else:
+            # The model dropped or mangled this note; translate it on its own
+            results.append(_translate_single(item))
+    return results
+
+
+def run_batch(items: List[Dict[str, Any]], max_workers: int = MAX_WORKERS) -> Iterator[Dict[str, Any]]:
+    """Translate items concurrently, yielding per-item results as they finish"""
+    units = plan_work(items)
+    if not units:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(units))))
+    try:
+        pending = {executor.submit(_run_unit, kind, unit_items) for kind, unit_items in units}
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield from future.result()
+    finally:
+        # Stop queued work if the client goes away mid-stream
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,171 @@
+import io
+import json
+import os
+from datetime import date, datetime, time
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import func, insert, select
+
+from src.tags import normalize_tags
+
+# Streaming bulk export/import of notes as NDJSON (one JSON note per line).
+#
+# Export walks the table in id order through a server-side cursor
+# (yield_per), so memory stays flat however many notes there are. Import parses
+# the request body line by line and inserts in batches: COPY ... FROM STDIN on
+# Postgres, a single executemany INSERT elsewhere. Each batch commits on its
+# own, so an interrupted import keeps what it already wrote.
+#
+# Environment variables:
+#   EXPORT_BATCH_SIZE   rows fetched per round trip while exporting (default 1000)
+#   IMPORT_BATCH_SIZE   rows written per INSERT/COPY while importing (default 1000)
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 1000))
+
+# Invalid lines reported back in the import summary (the rest are only counted)
+MAX_REPORTED_ERRORS = 20
+
+IMPORT_COLUMNS = ('title', 'content', 'tags', 'event_date', 'event_time', 'updated_at')
+
+
+def export_ndjson(session_factory, columns: Dict[str, Any], order_by, serialize: Callable,
+                  batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """
+    Yield one NDJSON line per row of select(columns) ordered by order_by.
+    serialize(row, names) turns a row into a dict; the session is held only
+    while the generator runs.
+    """
+    names = list(columns)
+    db = session_factory()
+    try:
+        result = db.execute(
+            select(*columns.values()).order_by(order_by).execution_options(yield_per=batch_size)
+        )
+        for partition in result.partitions():
+            yield ''.join(json.dumps(serialize(row, names), ensure_ascii=False) + '\n' for row in partition)
+    finally:
+        db.close()
+
+
+def parse_note_line(line: str) -> Dict[str, Any]:
+    """Turn one NDJSON note (the GET /notes/<id> shape) into column values; raises ValueError"""
+    data = json.loads(line)
+    if not isinstance(data, dict):
+        raise ValueError('expected a JSON object')
+
+    title = data.get('title')
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError('title is required')
+    if len(title) > 200:
+        raise ValueError('title is longer than 200 characters')
+    content = data.get('content', '')
+    if not isinstance(content, str):
+        raise ValueError('content must be a string')
+    tags = data.get('tags') or []
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise ValueError('tags must be a list of strings')
+    tags = normalize_tags(tags)
+
+    return {
+        'title': title,
+        'content': content,
+        'tags': json.dumps(tags),
+        'event_date': date.fromisoformat(data['eventDate']) if data.get('eventDate') else None,
+        'event_time': time.fromisoformat(data['eventTime']) if data.get('eventTime') else None,
+        'updated_at': _parse_timestamp(data.get('updatedAt')),
+    }
+
+
+def _parse_timestamp(value: Optional[str]) -> datetime:
+    if not value:
+        return datetime.utcnow()
+    # Stored timestamps are naive UTC
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    return parsed
+
+
+def copy_rows(dbapi_connection, table_name: str, columns: Sequence[str], rows: Iterable[Dict[str, Any]]):
+    """COPY rows (dicts keyed by column) into a Postgres table over a DBAPI connection"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(_copy_field(row[column]) for column in columns) + '\n')
+    buffer.seek(0)
+
+    statement = f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):
+            cursor.copy_expert(statement, buffer)  # psycopg2
+        else:
+            cursor.execute(statement, stream=buffer)  # pg8000
+    finally:
+        cursor.close()
+
+
+def _copy_field(value: Any) -> str:
+    """CSV field for COPY: unquoted empty is NULL, everything else is quoted"""
+    if value is None:
+        return ''
+    if isinstance(value, (date, time, datetime)):
+        value = value.isoformat()
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def insert_batch(db, table, rows: List[Dict[str, Any]], after_insert: Optional[Callable] = None):
+    """
+    Insert rows and commit. after_insert(connection, where) runs in the same
+    transaction with a clause matching the new rows (COPY returns no ids).
+    """
+    if not rows:
+        return
+    previous_max_id = (db.execute(select(func.max(table.c.id))).scalar() or 0) if after_insert else None
+    if db.get_bind().dialect.name == 'postgresql':
+        copy_rows(db.connection().connection, table.name, IMPORT_COLUMNS, rows)
+    else:
+        db.execute(insert(table), rows)
+    if after_insert:
+        after_insert(db.connection(), table.c.id > previous_max_id)
+    db.commit()
+
+
+def import_ndjson(db, table, lines: Iterable, batch_size: int = IMPORT_BATCH_SIZE,
+                  after_insert: Optional[Callable] = None) -> Dict[str, Any]:
+    """
+    Insert the notes in an NDJSON stream in batches.
+    Invalid lines are skipped and reported; returns the import summary.
+    """
+    started = perf_counter()
+    imported = failed = 0
+    errors: List[Dict[str, Any]] = []
+    batch: List[Dict[str, Any]] = []
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            batch.append(parse_note_line(line.decode('utf-8') if isinstance(line, bytes) else line))
+        except (ValueError, TypeError, KeyError) as e:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'line': number, 'error': str(e)})
+            continue
+        if len(batch) >= batch_size:
+            insert_batch(db, table, batch, after_insert)
+            imported += len(batch)
+            batch = []
+
+    insert_batch(db, table, batch, after_insert)
+    imported += len(batch)
+
+    seconds = perf_counter() - started
+    return {
+        'imported': imported,
+        'failed': failed,
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'rowsPerSecond': round(imported / seconds) if seconds > 0 else imported,
+    }
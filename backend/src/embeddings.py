@@ -0,0 +1,232 @@
+import hashlib
+import math
+import os
+import re
+import sys
+import threading
+import zlib
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, insert, select
+
+# Note embeddings for semantic search (see src/vector_index.py).
+#
+# Providers turn text into vectors:
+#   hashing  the default: a deterministic feature-hashing vectorizer over words,
+#            word prefixes and word pairs with sublinear term weights. It needs no
+#            network, model download or corpus statistics, so stored vectors never
+#            go stale when other notes change, and it is cheap enough to run inline
+#            on every note write.
+#   openai   the embeddings API of the LLM endpoint (LLM_ENDPOINT/GITHUB_TOKEN).
+#            Too slow to call inside a write transaction, so written notes only
+#            have their stale vector dropped and are embedded in batches when the
+#            search index next refreshes.
+#
+# Vectors are L2-normalized and stored as little-endian float32 blobs in
+# note_embeddings with the provider's model id and a hash of the text they were
+# computed from, so a note is re-embedded only when its title or content change.
+#
+# Environment variables:
+#   EMBEDDING_PROVIDER    'hashing' (default) or 'openai'
+#   EMBEDDING_DIMENSIONS  vector size of the hashing provider (default 256)
+#   EMBEDDING_MODEL       model of the openai provider (default openai/text-embedding-3-small)
+
+DEFAULT_DIMENSIONS = 256
+DEFAULT_OPENAI_MODEL = 'openai/text-embedding-3-small'
+EMBED_BATCH_SIZE = 500
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Frequent words that would otherwise dominate vectors built without corpus statistics
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i if in into is it its me my no not of on or our so "
+    "that the their them then there these they this to was we were what when which who will with you your"
+    .split()
+)
+
+PREFIX_LENGTH = 5
+PREFIX_WEIGHT = 0.5
+PAIR_WEIGHT = 0.5
+
+
+def note_text(title: str, content: str) -> str:
+    """The text a note is embedded from; the title is repeated to weigh it above the body"""
+    return f'{title}\n{title}\n{content or ""}'
+
+
+def text_hash(title: str, content: str) -> str:
+    return hashlib.sha1(note_text(title, content).encode()).hexdigest()
+
+
+def normalize(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm else list(vector)
+
+
+def encode_vector(vector: Sequence[float]) -> bytes:
+    """float32 little-endian blob"""
+    values = array('f', vector)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tobytes()
+
+
+def decode_vector(blob: bytes) -> array:
+    values = array('f')
+    values.frombytes(blob)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+class HashingEmbedder:
+    """Deterministic offline vectorizer using the hashing trick"""
+
+    inline = True
+
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS):
+        self.dimensions = dimensions
+        self.model_id = f'hashing-{dimensions}-v1'
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed_one(text) for text in texts]
+
+    def _embed_one(self, text: str) -> List[float]:
+        weights: Dict[str, float] = {}
+        previous = None
+        for token in _TOKEN_RE.findall(text.lower()):
+            if token in STOPWORDS:
+                previous = None
+                continue
+            weights[token] = weights.get(token, 0.0) + 1.0
+            if len(token) > PREFIX_LENGTH:
+                # Shared prefix, so 'meeting' and 'meetings' have a feature in common
+                prefix = '>' + token[:PREFIX_LENGTH]
+                weights[prefix] = weights.get(prefix, 0.0) + PREFIX_WEIGHT
+            if previous is not None:
+                pair = f'{previous} {token}'
+                weights[pair] = weights.get(pair, 0.0) + PAIR_WEIGHT
+            previous = token
+
+        vector = [0.0] * self.dimensions
+        for feature, weight in weights.items():
+            digest = zlib.crc32(feature.encode())
+            # Sublinear term frequency; a hash bit picks the sign so collisions tend to cancel out
+            value = 1.0 + math.log(weight) if weight >= 1.0 else weight
+            vector[digest % self.dimensions] += value if digest & 0x80000000 else -value
+        return normalize(vector)
+
+
+class OpenAIEmbedder:
+    """Embeddings API of the configured LLM endpoint"""
+
+    inline = False
+
+    def __init__(self, model: str = DEFAULT_OPENAI_MODEL):
+        self.model = model
+        self.model_id = f'openai:{model}'
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        from src.llm import get_llm_client
+
+        response = get_llm_client().client.embeddings.create(model=self.model, input=texts)
+        return [normalize(item.embedding) for item in sorted(response.data, key=lambda item: item.index)]
+
+
+PROVIDERS = {'hashing', 'openai'}
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """Process-wide embedding provider chosen by EMBEDDING_PROVIDER"""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            provider = os.getenv('EMBEDDING_PROVIDER', 'hashing').strip().lower()
+            if provider == 'hashing':
+                _embedder = HashingEmbedder(int(os.getenv('EMBEDDING_DIMENSIONS', DEFAULT_DIMENSIONS)))
+            elif provider == 'openai':
+                _embedder = OpenAIEmbedder(os.getenv('EMBEDDING_MODEL', DEFAULT_OPENAI_MODEL))
+            else:
+                raise ValueError(f"EMBEDDING_PROVIDER must be one of {', '.join(sorted(PROVIDERS))}, got {provider!r}")
+        return _embedder
+
+
+def set_embedder(embedder) -> None:
+    global _embedder
+    with _embedder_lock:
+        _embedder = embedder
+
+
+def _store(conn, embedding_table, embedder, rows) -> int:
+    """Embed (id, title, content) rows and insert their vectors"""
+    if not rows:
+        return 0
+    vectors = embedder.embed([note_text(row.title, row.content) for row in rows])
+    conn.execute(insert(embedding_table), [
+        {
+            'note_id': row.id,
+            'model': embedder.model_id,
+            'text_hash': text_hash(row.title, row.content),
+            'vector': encode_vector(vector),
+        }
+        for row, vector in zip(rows, vectors)
+    ])
+    return len(rows)
+
+
+def sync_embeddings(conn, note_table, embedding_table, note_ids: List[int], embedder=None) -> int:
+    """
+    Bring the embeddings of written notes up to date: vectors whose text or
+    model changed are replaced (inline providers) or dropped, to be embedded
+    at the next index refresh. Returns the number of stale notes.
+    """
+    if not note_ids:
+        return 0
+    embedder = embedder or get_embedder()
+    rows = conn.execute(
+        select(note_table.c.id, note_table.c.title, note_table.c.content,
+               embedding_table.c.model, embedding_table.c.text_hash)
+        .select_from(note_table.outerjoin(embedding_table, embedding_table.c.note_id == note_table.c.id))
+        .where(note_table.c.id.in_(note_ids))
+    ).all()
+    stale = [
+        row for row in rows
+        if row.model != embedder.model_id or row.text_hash != text_hash(row.title, row.content)
+    ]
+    if not stale:
+        return 0
+    conn.execute(delete(embedding_table).where(embedding_table.c.note_id.in_([row.id for row in stale])))
+    if embedder.inline:
+        _store(conn, embedding_table, embedder, stale)
+    return len(stale)
+
+
+def embed_missing(conn, note_table, embedding_table, embedder=None, note_ids: Optional[List[int]] = None,
+                  after_id: int = 0, batch_size: int = EMBED_BATCH_SIZE) -> List[int]:
+    """
+    Embed up to batch_size notes (optionally only note_ids) with id > after_id
+    that have no vector yet. Returns the ids embedded; call again from the
+    last one until it comes back empty.
+    """
+    embedder = embedder or get_embedder()
+    query = (
+        select(note_table.c.id, note_table.c.title, note_table.c.content)
+        .select_from(note_table.outerjoin(embedding_table, embedding_table.c.note_id == note_table.c.id))
+        .where(embedding_table.c.note_id.is_(None), note_table.c.id > after_id)
+        .order_by(note_table.c.id)
+        .limit(batch_size)
+    )
+    if note_ids is not None:
+        query = query.where(note_table.c.id.in_(note_ids))
+    rows = conn.execute(query).all()
+    _store(conn, embedding_table, embedder, rows)
+    return [row.id for row in rows]
+
+
+def drop_other_models(conn, embedding_table, model_id: str) -> int:
+    """Delete vectors left by a previously configured provider"""
+    return conn.execute(delete(embedding_table).where(embedding_table.c.model != model_id)).rowcount
@@ -0,0 +1,107 @@
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+# Event calendar over notes.event_date / notes.event_time.
+#
+# Dates and times extracted by the model arrive as strings; they are parsed
+# once, when the note is written, so the columns hold real DATE/TIME values
+# and a range filter on event_date is an index range scan on
+# ix_notes_event_date_time. Values the parsers cannot read are stored as NULL
+# rather than failing the note.
+
+DEFAULT_WINDOW_DAYS = 30
+DEFAULT_EVENT_LIMIT = 200
+MAX_EVENT_LIMIT = 1000
+
+DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%B %d, %Y', '%b %d, %Y', '%d %B %Y', '%d %b %Y')
+TIME_FORMATS = ('%H:%M', '%H:%M:%S', '%H.%M', '%I:%M %p', '%I:%M%p', '%I %p', '%I%p')
+
+
+def parse_event_date(value: Any) -> Optional[date]:
+    """A date from model output ('2024-01-15', 'January 15, 2024', an ISO datetime), else None"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return None
+    text = value.strip()
+    try:
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_event_time(value: Any) -> Optional[time]:
+    """A time from model output ('14:30', '14:30:00', '2:30 PM'), else None"""
+    if isinstance(value, time):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return None
+    text = re.sub(r'\s+', ' ', value.strip().upper().replace('.M.', 'M'))
+    try:
+        return time.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).time()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_event_range(start: Optional[str], end: Optional[str], today: Optional[date] = None) -> Tuple[date, date]:
+    """
+    Inclusive (from, to) dates for GET /events. from defaults to today and to
+    to DEFAULT_WINDOW_DAYS after from. Raises ValueError.
+    """
+    try:
+        first = date.fromisoformat(start) if start else (today or date.today())
+        last = date.fromisoformat(end) if end else first + timedelta(days=DEFAULT_WINDOW_DAYS)
+    except ValueError:
+        raise ValueError('from and to must be ISO 8601 dates (YYYY-MM-DD)')
+    if last < first:
+        raise ValueError('to must not be before from')
+    return first, last
+
+
+def parse_event_limit(value: Optional[str]) -> int:
+    if value is None or value == '':
+        return DEFAULT_EVENT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, MAX_EVENT_LIMIT)
+
+
+def events_between(db, note_table, first: date, last: date, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+    """Compact event records dated first..last, soonest first, and whether more follow"""
+    rows = db.execute(
+        select(note_table.c.id, note_table.c.title, note_table.c.event_date, note_table.c.event_time)
+        .where(note_table.c.event_date >= first, note_table.c.event_date <= last)
+        .order_by(note_table.c.event_date, note_table.c.event_time, note_table.c.id)
+        .limit(limit + 1)
+    ).all()
+    events = [
+        {
+            'id': row.id,
+            'title': row.title,
+            'eventDate': row.event_date.isoformat(),
+            'eventTime': row.event_time.isoformat() if row.event_time else None,
+        }
+        for row in rows[:limit]
+    ]
+    return events, len(rows) > limit
@@ -0,0 +1,69 @@
+import hashlib
+from typing import Any, Optional
+
+from flask import Response, current_app, request
+
+# Conditional GETs for note reads.
+#
+# Each cacheable view derives a strong ETag from cheap version data (for a
+# collection the newest updated_at and the row count, for one note its
+# updated_at) plus the request's query string, since fields/tag/cursor change
+# the representation. The ETag is checked against If-None-Match before any
+# row is serialized, so an unchanged view costs one small query and a 304.
+#
+# A single note's ETag leads with its id and version ("<id>.<version>-<hash>"),
+# so an If-Match on a write can be checked by the UPDATE itself (see
+# src/note_updates.py) instead of by reading the row first; the id keeps an
+# ETag copied from another note at the same version from passing.
+#
+# Responses carry Cache-Control: no-cache: browsers keep the body but must
+# revalidate every time, and shared caches (the Vercel edge) never serve a
+# list that predates the client's own write.
+
+CACHE_CONTROL = 'no-cache'
+
+
+def make_etag(*parts: Any) -> str:
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def version_etag(row_id: int, version: int, *parts: Any) -> str:
+    return f"{row_id}.{version}-{make_etag(*parts)[:16]}"
+
+
+def if_match_version(row_id: int) -> Optional[int]:
+    """
+    Version of row_id named by the request's If-Match (None when absent or "*").
+    Raises ValueError when it names several ETags, one that is not a version
+    ETag, or the version ETag of another row.
+    """
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+    tags = if_match.as_set(include_weak=True)
+    if len(tags) != 1:
+        raise ValueError('If-Match must name exactly one ETag')
+    prefix, _, _ = tags.pop().partition('-')
+    tag_id, _, version = prefix.partition('.')
+    try:
+        tag_id, version = int(tag_id), int(version)
+    except ValueError:
+        raise ValueError('If-Match does not name a current ETag')
+    if tag_id != row_id:
+        raise ValueError('If-Match names the ETag of another note')
+    return version
+
+
+def is_not_modified(etag: str) -> bool:
+    """True when the request's If-None-Match already names etag (weak comparison, as RFC 9110 requires)"""
+    return request.if_none_match.contains_weak(etag)
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def not_modified(etag: str) -> Response:
+    return with_etag(current_app.response_class(status=304), etag)
@@ -0,0 +1,183 @@
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Durable job queue on the application database (the jobs table).
+#
+# The web process enqueues a row and returns; worker.py claims queued rows and
+# runs them on a bounded thread pool, so model latency never holds a request
+# thread or a pooled connection, and the worker's concurrency caps outbound
+# model calls. There is no broker: claims are a guarded UPDATE (status must
+# still be 'queued'), with SELECT ... FOR UPDATE SKIP LOCKED on Postgres so
+# several workers do not contend for the same row. A claim is a lease; jobs
+# whose worker died mid-run are put back after JOB_LEASE_SECONDS. Outcomes are
+# recorded only while the lease is still held: a worker that overran its lease
+# and lost the job to another one has its result dropped.
+#
+# Environment variables:
+#   JOB_MAX_ATTEMPTS     tries per job before it is marked as an error (default 3)
+#   JOB_LEASE_SECONDS    how long a running job may go without finishing before
+#                        another worker may take it (default 300)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+ERROR = 'error'
+FINISHED_STATUSES = (DONE, ERROR)
+
+# Job kind -> required payload fields
+JOB_KINDS = {
+    'generate_note': ('input',),
+    'translate_note': ('noteId', 'targetLang'),
+}
+
+MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', 300))
+RETRY_BASE_DELAY_SECONDS = 2
+RETRY_MAX_DELAY_SECONDS = 60
+
+
+class JobFailed(Exception):
+    """Raised by job handlers for failures that retrying cannot fix"""
+
+
+class SaveOnComplete:
+    """
+    Handler result whose writes belong with the job's completion: save(db) runs
+    in the transaction that marks the job done and returns the result to store
+    """
+
+    def __init__(self, save: Callable[[Any], Any]):
+        self.save = save
+
+
+def validate_job(kind: Any, payload: Any) -> Optional[str]:
+    """Error message for an invalid job request, or None"""
+    if kind not in JOB_KINDS:
+        return f"kind must be one of: {', '.join(sorted(JOB_KINDS))}"
+    if not isinstance(payload, dict):
+        return 'payload must be an object'
+    missing = [field for field in JOB_KINDS[kind] if not payload.get(field)]
+    if missing:
+        return f"payload is missing: {', '.join(missing)}"
+    return None
+
+
+def enqueue(db, model, kind: str, payload: Dict[str, Any], max_attempts: int = MAX_ATTEMPTS):
+    job = model(
+        kind=kind,
+        status=QUEUED,
+        payload=json.dumps(payload, ensure_ascii=False),
+        attempts=0,
+        max_attempts=max_attempts,
+        run_after=datetime.utcnow()
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_next(db, model, worker_id: str, kinds: Optional[Iterable[str]] = None, now: Optional[datetime] = None):
+    """
+    Lease the oldest runnable queued job to worker_id and return it, or None.
+    Only jobs of the given kinds are considered when kinds is set.
+    """
+    now = now or datetime.utcnow()
+    for _ in range(3):
+        candidates = db.query(model.id).filter(model.status == QUEUED, model.run_after <= now)
+        if kinds is not None:
+            candidates = candidates.filter(model.kind.in_(list(kinds)))
+        row = candidates.order_by(model.run_after, model.id).limit(1).with_for_update(skip_locked=True).first()
+        if row is None:
+            db.commit()
+            return None
+
+        claimed = db.query(model).filter(model.id == row.id, model.status == QUEUED).update({
+            model.status: RUNNING,
+            model.locked_by: worker_id,
+            model.locked_at: now,
+            model.started_at: now,
+            model.attempts: model.attempts + 1,
+        }, synchronize_session=False)
+        db.commit()
+        if claimed:
+            return db.get(model, row.id)
+        # Another worker took it between the SELECT and the UPDATE; try the next one
+    return None
+
+
+def _leased(db, model, job_id: int, worker_id: str):
+    return db.query(model).filter(model.id == job_id, model.status == RUNNING, model.locked_by == worker_id)
+
+
+def complete(db, model, job_id: int, worker_id: str, result: Any) -> bool:
+    """
+    Mark a job leased to worker_id done with its result (a SaveOnComplete is
+    saved in the same transaction). Returns False, writing nothing, when the
+    lease was lost.
+    """
+    # The guarded UPDATE comes first so it holds the row while the result is saved
+    if not _leased(db, model, job_id, worker_id).update({
+        model.status: DONE,
+        model.error: None,
+        model.locked_by: None,
+        model.finished_at: datetime.utcnow(),
+    }, synchronize_session=False):
+        db.rollback()
+        return False
+    if isinstance(result, SaveOnComplete):
+        result = result.save(db)
+    db.query(model).filter(model.id == job_id).update({
+        model.result: json.dumps(result, ensure_ascii=False),
+    }, synchronize_session=False)
+    db.commit()
+    return True
+
+
+def retry_delay(attempts: int) -> float:
+    return min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** (attempts - 1))
+
+
+def fail(db, model, job_id: int, worker_id: str, error: str, retry: bool = True,
+         now: Optional[datetime] = None) -> bool:
+    """
+    Record a failed attempt of a job leased to worker_id; requeue with backoff
+    while attempts remain. Returns False, writing nothing, when the lease was lost.
+    """
+    now = now or datetime.utcnow()
+    job = _leased(db, model, job_id, worker_id).first()
+    if job is None:
+        db.rollback()
+        return False
+    if retry and job.attempts < job.max_attempts:
+        outcome = {model.status: QUEUED, model.run_after: now + timedelta(seconds=retry_delay(job.attempts))}
+    else:
+        outcome = {model.status: ERROR, model.finished_at: now}
+    updated = _leased(db, model, job_id, worker_id).update({
+        model.error: error,
+        model.locked_by: None,
+        **outcome,
+    }, synchronize_session=False)
+    db.commit()
+    return bool(updated)
+
+
+def requeue_stale(db, model, lease_seconds: int = LEASE_SECONDS, now: Optional[datetime] = None) -> int:
+    """Put back running jobs whose lease expired (their worker died); returns the count"""
+    now = now or datetime.utcnow()
+    stale = (model.status == RUNNING, model.locked_at < now - timedelta(seconds=lease_seconds))
+    expired = db.query(model).filter(*stale, model.attempts >= model.max_attempts).update({
+        model.status: ERROR,
+        model.error: 'Worker lease expired',
+        model.locked_by: None,
+        model.finished_at: now,
+    }, synchronize_session=False)
+    requeued = db.query(model).filter(*stale).update({
+        model.status: QUEUED,
+        model.locked_by: None,
+        model.run_after: now,
+    }, synchronize_session=False)
+    db.commit()
+    return expired + requeued
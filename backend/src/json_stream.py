@@ -0,0 +1,167 @@
+from typing import List, Optional, Tuple
+
+# Incremental scanner for a JSON object that arrives in arbitrary chunks, as
+# when the model streams {"title": "...", "content": "...", ...}.
+#
+# It only decodes top-level string values, which is all the streaming routes
+# need: each feed() returns (key, delta, complete) tuples so callers can emit
+# the title once it is complete and forward content as it is generated.
+# Non-string values (tags arrays, nulls) are skipped; parse the full buffer with
+# json.loads once the stream ends to get them.
+
+class _EndOfString:
+    pass
+
+
+_END_OF_STRING = _EndOfString()
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+# Scanner states
+_START = 'start'            # before the opening brace (skips ```json fences etc.)
+_SEEK_KEY = 'seek_key'      # inside the object, expecting a key or '}'
+_KEY = 'key'                # inside a key string
+_SEEK_COLON = 'seek_colon'
+_SEEK_VALUE = 'seek_value'
+_STRING_VALUE = 'string_value'
+_OTHER_VALUE = 'other_value'  # number, literal, array or nested object
+_DONE = 'done'
+
+
+class JSONFieldStreamer:
+    def __init__(self):
+        self.state = _START
+        self.key = ''
+        self.value = ''
+        self.values = {}
+        self._escape: Optional[str] = None  # '' after a backslash, then \u hex digits
+        self._high_surrogate: Optional[int] = None
+        self._depth = 0
+        self._other_in_string = False
+        self._other_escape = False
+
+    @property
+    def done(self) -> bool:
+        return self.state == _DONE
+
+    def feed(self, chunk: str) -> List[Tuple[str, str, bool]]:
+        events: List[Tuple[str, str, bool]] = []
+        delta: List[str] = []
+
+        for char in chunk:
+            state = self.state
+
+            if state == _START:
+                if char == '{':
+                    self.state = _SEEK_KEY
+
+            elif state == _SEEK_KEY:
+                if char == '"':
+                    self.key = ''
+                    self.state = _KEY
+                elif char == '}':
+                    self.state = _DONE
+
+            elif state == _KEY:
+                decoded = self._string_char(char)
+                if decoded is None:
+                    continue
+                if decoded is _END_OF_STRING:
+                    self.state = _SEEK_COLON
+                else:
+                    self.key += decoded
+
+            elif state == _SEEK_COLON:
+                if char == ':':
+                    self.state = _SEEK_VALUE
+
+            elif state == _SEEK_VALUE:
+                if char == '"':
+                    self.value = ''
+                    self.state = _STRING_VALUE
+                elif not char.isspace():
+                    self.state = _OTHER_VALUE
+                    self._depth = 0
+                    self._other_in_string = False
+                    self._other_escape = False
+                    self._other_char(char)
+
+            elif state == _STRING_VALUE:
+                decoded = self._string_char(char)
+                if decoded is None:
+                    continue
+                if decoded is _END_OF_STRING:
+                    events.append((self.key, ''.join(delta), True))
+                    delta = []
+                    self.values[self.key] = self.value
+                    self.state = _SEEK_KEY
+                else:
+                    self.value += decoded
+                    delta.append(decoded)
+
+            elif state == _OTHER_VALUE:
+                self._other_char(char)
+
+        if self.state == _STRING_VALUE and delta:
+            events.append((self.key, ''.join(delta), False))
+        return events
+
+    def _other_char(self, char: str):
+        """Skip a non-string value, tracking nesting and strings inside it"""
+        if self._other_in_string:
+            if self._other_escape:
+                self._other_escape = False
+            elif char == '\\':
+                self._other_escape = True
+            elif char == '"':
+                self._other_in_string = False
+            return
+        if char == '"':
+            self._other_in_string = True
+        elif char in '[{':
+            self._depth += 1
+        elif char in ']}':
+            if self._depth == 0:
+                # The closing brace of the top-level object
+                self.state = _DONE
+            else:
+                self._depth -= 1
+        elif char == ',' and self._depth == 0:
+            self.state = _SEEK_KEY
+
+    def _string_char(self, char: str):
+        """
+        Decode one character of a JSON string body.
+        Returns the decoded text, None if more input is needed, or
+        _END_OF_STRING at the closing quote.
+        """
+        if self._escape is not None:
+            if self._escape == '':
+                if char == 'u':
+                    self._escape = 'u'
+                    return None
+                self._escape = None
+                return _ESCAPES.get(char, char)
+            self._escape += char
+            if len(self._escape) < 5:
+                return None
+            escape, self._escape = self._escape, None
+            try:
+                code = int(escape[1:], 16)
+            except ValueError:
+                # Invalid \u escape: keep the text rather than failing the stream
+                return '\\' + escape
+            if 0xD800 <= code <= 0xDBFF:
+                self._high_surrogate = code
+                return None
+            if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+                code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+            self._high_surrogate = None
+            return chr(code)
+
+        if char == '\\':
+            self._escape = ''
+            return None
+        if char == '"':
+            return _END_OF_STRING
+        return char
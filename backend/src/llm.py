@@ -1,8 +1,46 @@
 import os
+import asyncio
 import json
-from openai import OpenAI
-from typing import Dict, List, Optional, Any
+import random
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterator, List, Optional, Any, Tuple
 from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from src.llm_cache import make_cache_key
+from src.json_stream import JSONFieldStreamer
+from src.metrics import record_llm_call
+
+# The OpenAI SDK (with httpx and pydantic) is the slowest import of the app, so
+# it is imported when the first client is created instead of with this module
+if TYPE_CHECKING:
+    import httpx
+
+DEFAULT_ENDPOINT = "https://models.github.ai/inference"
+DEFAULT_MODEL = "openai/gpt-4.1-mini"
+
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 8.0
+MAX_RETRY_AFTER_SECONDS = 30.0
+
+# Bump when a prompt template changes so cached responses from the old prompt are not reused
+TRANSLATE_PROMPT_VERSION = 1
+GENERATE_PROMPT_VERSION = 1
+
+TRANSLATE_TEMPERATURE = 0.3
+GENERATE_TEMPERATURE = 0.7
+
+# Optional LLMCache shared by translate_text/generate_structured_notes
+_response_cache = None
+
+def set_response_cache(cache) -> None:
+    global _response_cache
+    _response_cache = cache
+
+def get_response_cache():
+    return _response_cache
 
 @dataclass
 class LLMResponse:
@@ -10,20 +48,57 @@ class LLMResponse:
     usage: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
+def _http_client_options() -> Dict[str, Any]:
+    """Timeouts and connection limits for the HTTP client behind the OpenAI SDK"""
+    import httpx
+
+    return {
+        'timeout': httpx.Timeout(
+            float(os.getenv('LLM_TIMEOUT_SECONDS', 60)),
+            connect=float(os.getenv('LLM_CONNECT_TIMEOUT_SECONDS', 5))
+        ),
+        'limits': httpx.Limits(
+            max_connections=int(os.getenv('LLM_MAX_CONNECTIONS', 20)),
+            max_keepalive_connections=int(os.getenv('LLM_MAX_KEEPALIVE_CONNECTIONS', 10)),
+            keepalive_expiry=float(os.getenv('LLM_KEEPALIVE_EXPIRY_SECONDS', 60))
+        ),
+    }
+
+def _to_llm_response(response) -> LLMResponse:
+    return LLMResponse(
+        content=response.choices[0].message.content,
+        usage={
+            'prompt_tokens': response.usage.prompt_tokens,
+            'completion_tokens': response.usage.completion_tokens,
+            'total_tokens': response.usage.total_tokens
+        }
+    )
+
 class LLMClient:
-    def __init__(self):
+    def __init__(self, http_client: Optional['httpx.Client'] = None):
+        import httpx
+        from openai import OpenAI
+
         self.api_key = os.getenv('GITHUB_TOKEN')
-        self.endpoint = "https://models.github.ai/inference"
-        self.model = "openai/gpt-4.1-mini"
+        self.endpoint = os.getenv('LLM_ENDPOINT', DEFAULT_ENDPOINT)
+        self.model = DEFAULT_MODEL
         
         if not self.api_key:
             raise ValueError("GITHUB_TOKEN environment variable is required")
         
+        # One keep-alive connection pool per client; retries are handled in
+        # call_llm_model so the SDK's own retry loop is disabled
+        self.http_client = http_client or httpx.Client(**_http_client_options())
         self.client = OpenAI(
             base_url=self.endpoint,
             api_key=self.api_key,
+            max_retries=0,
+            http_client=self.http_client,
         )
     
+    def close(self) -> None:
+        self.http_client.close()
+    
     def call_llm_model(
         self, 
         messages: List[Dict[str, str]], 
@@ -33,42 +108,280 @@ class LLMClient:
     ) -> LLMResponse:
         """
         Call GitHub Models inference endpoint using OpenAI client
+        Rate limits, timeouts, connection errors and 5xx responses are retried
+        up to max_retries times with exponential backoff and full jitter;
+        a 429's Retry-After header takes precedence over the backoff.
         """
+        attempt = 0
+        started = time.perf_counter()
+        while True:
+            try:
+                response = self.client.chat.completions.create(
+                    messages=messages,
+                    temperature=temperature,
+                    top_p=top_p,
+                    model=self.model,
+                    max_tokens=2000
+                )
+                
+                result = _to_llm_response(response)
+                record_llm_call(self.model, time.perf_counter() - started, usage=result.usage)
+                return result
+                
+            except Exception as e:
+                if attempt >= max_retries or not _is_retryable(e):
+                    record_llm_call(self.model, time.perf_counter() - started, error=True)
+                    return LLMResponse(
+                        content="",
+                        error=f"API call failed: {str(e)}"
+                    )
+                _sleep(_retry_delay(e, attempt))
+                attempt += 1
+
+    def stream_llm_model(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 1.0,
+        top_p: float = 1.0,
+        max_retries: int = 3
+    ) -> Iterator[str]:
+        """
+        Stream completion text deltas from the inference endpoint.
+        Opening the stream is retried like call_llm_model; a failure after
+        tokens have been yielded is raised to the caller.
+        """
+        attempt = 0
+        started = time.perf_counter()
+        while True:
+            try:
+                stream = self.client.chat.completions.create(
+                    messages=messages,
+                    temperature=temperature,
+                    top_p=top_p,
+                    model=self.model,
+                    max_tokens=2000,
+                    stream=True
+                )
+                break
+            except Exception as e:
+                if attempt >= max_retries or not _is_retryable(e):
+                    record_llm_call(self.model, time.perf_counter() - started, mode='stream', error=True)
+                    raise Exception(f"API call failed: {str(e)}")
+                _sleep(_retry_delay(e, attempt))
+                attempt += 1
+        
+        failed = False
         try:
-            response = self.client.chat.completions.create(
-                messages=messages,
-                temperature=temperature,
-                top_p=top_p,
-                model=self.model,
-                max_tokens=2000
-            )
-            
-            return LLMResponse(
-                content=response.choices[0].message.content,
-                usage={
-                    'prompt_tokens': response.usage.prompt_tokens,
-                    'completion_tokens': response.usage.completion_tokens,
-                    'total_tokens': response.usage.total_tokens
-                }
-            )
-            
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
         except Exception as e:
-            return LLMResponse(
-                content="",
-                error=f"API call failed: {str(e)}"
-            )
+            failed = True
+            raise Exception(f"API call failed: {str(e)}")
+        finally:
+            # Also runs when the consumer stops early (client disconnected)
+            stream.response.close()
+            record_llm_call(self.model, time.perf_counter() - started, mode='stream', error=failed)
 
-def translate_text(
-    text: str, 
-    target_language: str, 
-    title: Optional[str] = None
-) -> Dict[str, str]:
+class AsyncLLMClient:
     """
-    Translate text using GitHub Models
-    Returns: {title: str, content: str}
+    LLMClient for the ASGI app (asgi.py): AsyncOpenAI over an httpx.AsyncClient,
+    so a request waiting on the model holds no thread. Same retries and metrics.
     """
-    client = LLMClient()
+    def __init__(self, http_client: Optional['httpx.AsyncClient'] = None):
+        import httpx
+        from openai import AsyncOpenAI
+
+        self.api_key = os.getenv('GITHUB_TOKEN')
+        self.endpoint = os.getenv('LLM_ENDPOINT', DEFAULT_ENDPOINT)
+        self.model = DEFAULT_MODEL
+        
+        if not self.api_key:
+            raise ValueError("GITHUB_TOKEN environment variable is required")
+        
+        self.http_client = http_client or httpx.AsyncClient(**_http_client_options())
+        self.client = AsyncOpenAI(
+            base_url=self.endpoint,
+            api_key=self.api_key,
+            max_retries=0,
+            http_client=self.http_client,
+        )
+    
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
     
+    async def call_llm_model(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 1.0,
+        top_p: float = 1.0,
+        max_retries: int = 3
+    ) -> LLMResponse:
+        """Async LLMClient.call_llm_model"""
+        attempt = 0
+        started = time.perf_counter()
+        while True:
+            try:
+                response = await self.client.chat.completions.create(
+                    messages=messages,
+                    temperature=temperature,
+                    top_p=top_p,
+                    model=self.model,
+                    max_tokens=2000
+                )
+                result = _to_llm_response(response)
+                record_llm_call(self.model, time.perf_counter() - started, usage=result.usage)
+                return result
+                
+            except Exception as e:
+                if attempt >= max_retries or not _is_retryable(e):
+                    record_llm_call(self.model, time.perf_counter() - started, error=True)
+                    return LLMResponse(
+                        content="",
+                        error=f"API call failed: {str(e)}"
+                    )
+                await _async_sleep(_retry_delay(e, attempt))
+                attempt += 1
+    
+    async def stream_llm_model(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 1.0,
+        top_p: float = 1.0,
+        max_retries: int = 3
+    ) -> AsyncIterator[str]:
+        """Async LLMClient.stream_llm_model"""
+        attempt = 0
+        started = time.perf_counter()
+        while True:
+            try:
+                stream = await self.client.chat.completions.create(
+                    messages=messages,
+                    temperature=temperature,
+                    top_p=top_p,
+                    model=self.model,
+                    max_tokens=2000,
+                    stream=True
+                )
+                break
+            except Exception as e:
+                if attempt >= max_retries or not _is_retryable(e):
+                    record_llm_call(self.model, time.perf_counter() - started, mode='stream', error=True)
+                    raise Exception(f"API call failed: {str(e)}")
+                await _async_sleep(_retry_delay(e, attempt))
+                attempt += 1
+        
+        failed = False
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            failed = True
+            raise Exception(f"API call failed: {str(e)}")
+        finally:
+            await stream.response.aclose()
+            record_llm_call(self.model, time.perf_counter() - started, mode='stream', error=failed)
+
+def _is_retryable(error: Exception) -> bool:
+    from openai import APIConnectionError, APIStatusError, InternalServerError, RateLimitError
+
+    if isinstance(error, (APIConnectionError, RateLimitError, InternalServerError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in (408, 409) or error.status_code >= 500
+    return False
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, 'response', None)
+    value = response.headers.get('retry-after') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    from openai import RateLimitError
+
+    if isinstance(error, RateLimitError):
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_AFTER_SECONDS)
+    return random.uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * (2 ** attempt)))
+
+# Indirection so tests can skip real sleeping
+_sleep = time.sleep
+_async_sleep = asyncio.sleep
+
+_shared_client: Optional[LLMClient] = None
+_shared_client_lock = threading.Lock()
+
+def get_llm_client() -> LLMClient:
+    """
+    Process-wide LLMClient, created on first use. Reusing it keeps HTTP
+    connections (and their TLS sessions) alive between requests.
+    """
+    global _shared_client
+    client = _shared_client
+    if client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = LLMClient()
+            client = _shared_client
+    return client
+
+# An httpx.AsyncClient belongs to the event loop it was first used on
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncLLMClient]" = weakref.WeakKeyDictionary()
+
+def get_async_llm_client() -> AsyncLLMClient:
+    """AsyncLLMClient shared by everything running on the current event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncLLMClient()
+    return client
+
+async def close_async_llm_client() -> None:
+    """Close the current event loop's client (ASGI lifespan shutdown)"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+def reset_llm_client() -> None:
+    """Drop the shared clients, e.g. after GITHUB_TOKEN or LLM_ENDPOINT changes"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is not None:
+            _shared_client.close()
+        _shared_client = None
+    # Async clients are closed by their loop's shutdown; just stop handing them out
+    _async_clients.clear()
+
+def _translation_cache_key(
+    text: str,
+    target_language: str,
+    title: Optional[str],
+    cache_scope: Optional[str]
+) -> str:
+    return make_cache_key(
+        task='translate',
+        model=DEFAULT_MODEL,
+        prompt_version=TRANSLATE_PROMPT_VERSION,
+        text=text,
+        title=title,
+        target_language=target_language,
+        temperature=TRANSLATE_TEMPERATURE,
+        scope=cache_scope
+    )
+
+def _translation_messages(text: str, target_language: str, title: Optional[str]) -> List[Dict[str, str]]:
     system_prompt = f"""You are a professional translator. Translate the following text to {target_language}.
     
     Rules:
@@ -83,39 +396,203 @@ def translate_text(
     
     user_prompt = f"Title: {title or 'None'}\nContent: {text}"
     
-    messages = [
+    return [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt}
     ]
-    
-    response = client.call_llm_model(messages, temperature=0.3)
-    
-    if response.error:
-        raise Exception(f"Translation failed: {response.error}")
-    
+
+def _parse_translation(content: str, title: Optional[str]) -> Optional[Dict[str, str]]:
+    """Parsed translation, or None when the model did not return JSON"""
     try:
-        result = json.loads(response.content)
+        result = json.loads(content)
         return {
             "title": result.get("title", ""),
             "content": result.get("content", "")
         }
     except json.JSONDecodeError:
+        return None
+
+def translate_text(
+    text: str, 
+    target_language: str, 
+    title: Optional[str] = None,
+    cache_scope: Optional[str] = None
+) -> Dict[str, str]:
+    """
+    Translate text using GitHub Models
+    cache_scope is folded into the cache key (e.g. a note's id and updated_at)
+    Returns: {title: str, content: str}
+    """
+    cache = _response_cache
+    cache_key = None
+    if cache is not None:
+        cache_key = _translation_cache_key(text, target_language, title, cache_scope)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+    
+    client = get_llm_client()
+    messages = _translation_messages(text, target_language, title)
+    response = client.call_llm_model(messages, temperature=TRANSLATE_TEMPERATURE)
+    
+    if response.error:
+        raise Exception(f"Translation failed: {response.error}")
+    
+    translated = _parse_translation(response.content, title)
+    if translated is None:
         # Fallback if JSON parsing fails
         return {
             "title": title or "Translated Note",
             "content": response.content
         }
+    if cache_key is not None:
+        cache.set(cache_key, translated)
+    return translated
 
-def generate_structured_notes(
-    user_input: str, 
-    language: str = "en"
-) -> Dict[str, Any]:
+def _stream_note_fields(
+    messages: List[Dict[str, str]],
+    temperature: float,
+    raw_parts: List[str]
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
     """
-    Generate structured notes from natural language input
-    Returns: {title, content, tags, event_date, event_time}
+    Stream a JSON note from the model as ('title', {title}) once the title is
+    complete, then ('content', {delta}) events. Raw text is collected in raw_parts.
+    """
+    streamer = JSONFieldStreamer()
+    for text in get_llm_client().stream_llm_model(messages, temperature=temperature):
+        raw_parts.append(text)
+        for key, delta, complete in streamer.feed(text):
+            if key == 'title' and complete:
+                yield 'title', {'title': streamer.values['title']}
+            elif key == 'content' and delta:
+                yield 'content', {'delta': delta}
+
+def _replay_cached(result: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    yield 'title', {'title': result.get('title', '')}
+    yield 'content', {'delta': result.get('content', '')}
+    yield 'done', dict(result)
+
+def stream_translate_text(
+    text: str,
+    target_language: str,
+    title: Optional[str] = None,
+    cache_scope: Optional[str] = None
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Streaming variant of translate_text.
+    Yields (event, data): 'title', then 'content' deltas, then 'done' with the
+    same {title, content} translate_text would return.
+    """
+    cache = _response_cache
+    cache_key = None
+    if cache is not None:
+        cache_key = _translation_cache_key(text, target_language, title, cache_scope)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            yield from _replay_cached(cached)
+            return
+    
+    raw_parts: List[str] = []
+    messages = _translation_messages(text, target_language, title)
+    yield from _stream_note_fields(messages, TRANSLATE_TEMPERATURE, raw_parts)
+    
+    content = ''.join(raw_parts)
+    translated = _parse_translation(content, title)
+    if translated is None:
+        translated = {"title": title or "Translated Note", "content": content}
+    elif cache_key is not None:
+        cache.set(cache_key, translated)
+    yield 'done', translated
+
+def _batch_translation_messages(items: List[Dict[str, Any]], target_language: str) -> List[Dict[str, str]]:
+    system_prompt = f"""You are a professional translator. Translate every note in the JSON array below to {target_language}.
+    
+    Rules:
+    1. Preserve the original meaning and style
+    2. Translate each title concisely (≤5 words); if a title is empty, generate a concise title (≤5 words) in {target_language}
+    3. Return ONLY a JSON object with an "items" array holding one {{"id", "title", "content"}} object per input note
+    4. Keep every id exactly as given
+    5. Do not include any other text or explanations
+    
+    Example response format:
+    {{"items": [{{"id": 1, "title": "Translated Title", "content": "Translated content here..."}}]}}"""
+    
+    notes = [
+        {"id": item['id'], "title": item.get('title') or '', "content": item['text']}
+        for item in items
+    ]
+    
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": json.dumps(notes, ensure_ascii=False)}
+    ]
+
+def translate_batch(
+    items: List[Dict[str, Any]],
+    target_language: str
+) -> Dict[Any, Dict[str, str]]:
+    """
+    Translate several short notes with a single model call.
+    items: [{id, text, title, cache_scope}]
+    Returns {id: {title, content}} for every item translated (or cached); ids
+    missing from the result were dropped by the model and should be retried
+    with translate_text.
     """
-    client = LLMClient()
+    cache = _response_cache
+    results: Dict[Any, Dict[str, str]] = {}
+    pending = []
+    for item in items:
+        cache_key = None
+        if cache is not None:
+            cache_key = _translation_cache_key(item['text'], target_language, item.get('title'), item.get('cache_scope'))
+            cached = cache.get(cache_key)
+            if cached is not None:
+                results[item['id']] = dict(cached)
+                continue
+        pending.append((item, cache_key))
     
+    if not pending:
+        return results
+    
+    client = get_llm_client()
+    messages = _batch_translation_messages([item for item, _ in pending], target_language)
+    response = client.call_llm_model(messages, temperature=TRANSLATE_TEMPERATURE)
+    
+    if response.error:
+        raise Exception(f"Translation failed: {response.error}")
+    
+    try:
+        translated_items = json.loads(response.content).get("items", [])
+    except (json.JSONDecodeError, AttributeError):
+        return results
+    
+    by_id = {str(entry.get("id")): entry for entry in translated_items if isinstance(entry, dict)}
+    for item, cache_key in pending:
+        entry = by_id.get(str(item['id']))
+        if entry is None:
+            continue
+        translated = {
+            "title": entry.get("title", ""),
+            "content": entry.get("content", "")
+        }
+        results[item['id']] = translated
+        if cache_key is not None:
+            cache.set(cache_key, translated)
+    return results
+
+def _generation_cache_key(user_input: str, language: str) -> str:
+    return make_cache_key(
+        task='generate',
+        model=DEFAULT_MODEL,
+        prompt_version=GENERATE_PROMPT_VERSION,
+        text=user_input,
+        target_language=language,
+        temperature=GENERATE_TEMPERATURE,
+        # Inputs like "tomorrow at 2 PM" resolve differently on another day
+        day=date.today().isoformat()
+    )
+
+def _generation_messages(user_input: str) -> List[Dict[str, str]]:
     system_prompt = f"""You are a helpful assistant that creates structured notes from natural language descriptions.
     
     Rules:
@@ -133,18 +610,15 @@ def generate_structured_notes(
     Example response:
     {{"title": "Meeting Notes", "content": "Detailed content...", "tags": ["work", "meeting"], "event_date": "2024-01-15", "event_time": "14:30"}}"""
     
-    messages = [
+    return [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": f"Create a note from: {user_input}"}
     ]
-    
-    response = client.call_llm_model(messages, temperature=0.7)
-    
-    if response.error:
-        raise Exception(f"Note generation failed: {response.error}")
-    
+
+def _parse_generated(content: str, user_input: str) -> Optional[Dict[str, Any]]:
+    """Parsed note fields, or None when the model did not return JSON"""
     try:
-        result = json.loads(response.content)
+        result = json.loads(content)
         return {
             "title": result.get("title", "Generated Note"),
             "content": result.get("content", user_input),
@@ -153,11 +627,208 @@ def generate_structured_notes(
             "event_time": result.get("event_time")
         }
     except json.JSONDecodeError:
+        return None
+
+def _generation_fallback(user_input: str) -> Dict[str, Any]:
+    return {
+        "title": "Generated Note",
+        "content": user_input,
+        "tags": ["generated"],
+        "event_date": None,
+        "event_time": None
+    }
+
+def generate_structured_notes(
+    user_input: str, 
+    language: str = "en"
+) -> Dict[str, Any]:
+    """
+    Generate structured notes from natural language input
+    Returns: {title, content, tags, event_date, event_time}
+    """
+    cache = _response_cache
+    cache_key = None
+    if cache is not None:
+        cache_key = _generation_cache_key(user_input, language)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+    
+    client = get_llm_client()
+    messages = _generation_messages(user_input)
+    response = client.call_llm_model(messages, temperature=GENERATE_TEMPERATURE)
+    
+    if response.error:
+        raise Exception(f"Note generation failed: {response.error}")
+    
+    generated = _parse_generated(response.content, user_input)
+    if generated is None:
         # Fallback if JSON parsing fails
+        return _generation_fallback(user_input)
+    if cache_key is not None:
+        cache.set(cache_key, generated)
+    return generated
+
+def stream_structured_notes(
+    user_input: str,
+    language: str = "en"
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Streaming variant of generate_structured_notes.
+    Yields (event, data): 'title', then 'content' deltas, then 'done' with the
+    full {title, content, tags, event_date, event_time}.
+    """
+    cache = _response_cache
+    cache_key = None
+    if cache is not None:
+        cache_key = _generation_cache_key(user_input, language)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            yield from _replay_cached(cached)
+            return
+    
+    raw_parts: List[str] = []
+    yield from _stream_note_fields(_generation_messages(user_input), GENERATE_TEMPERATURE, raw_parts)
+    
+    generated = _parse_generated(''.join(raw_parts), user_input)
+    if generated is None:
+        generated = _generation_fallback(user_input)
+    elif cache_key is not None:
+        cache.set(cache_key, generated)
+    yield 'done', generated
+
+# Async variants for the ASGI app (asgi.py). The response cache may read and
+# write its database tier, so it is consulted in a worker thread.
+
+async def _in_thread(fn, *args):
+    """asyncio.to_thread() without its Python 3.9 requirement"""
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+async def translate_text_async(
+    text: str,
+    target_language: str,
+    title: Optional[str] = None,
+    cache_scope: Optional[str] = None
+) -> Dict[str, str]:
+    """Async translate_text"""
+    cache = _response_cache
+    cache_key = None
+    if cache is not None:
+        cache_key = _translation_cache_key(text, target_language, title, cache_scope)
+        cached = await _in_thread(cache.get, cache_key)
+        if cached is not None:
+            return dict(cached)
+    
+    messages = _translation_messages(text, target_language, title)
+    response = await get_async_llm_client().call_llm_model(messages, temperature=TRANSLATE_TEMPERATURE)
+    
+    if response.error:
+        raise Exception(f"Translation failed: {response.error}")
+    
+    translated = _parse_translation(response.content, title)
+    if translated is None:
         return {
-            "title": "Generated Note",
-            "content": user_input,
-            "tags": ["generated"],
-            "event_date": None,
-            "event_time": None
-        }
\ No newline at end of file
+            "title": title or "Translated Note",
+            "content": response.content
+        }
+    if cache_key is not None:
+        await _in_thread(cache.set, cache_key, translated)
+    return translated
+
+async def _stream_note_fields_async(
+    messages: List[Dict[str, str]],
+    temperature: float,
+    raw_parts: List[str]
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Async _stream_note_fields"""
+    streamer = JSONFieldStreamer()
+    async for text in get_async_llm_client().stream_llm_model(messages, temperature=temperature):
+        raw_parts.append(text)
+        for key, delta, complete in streamer.feed(text):
+            if key == 'title' and complete:
+                yield 'title', {'title': streamer.values['title']}
+            elif key == 'content' and delta:
+                yield 'content', {'delta': delta}
+
+async def stream_translate_text_async(
+    text: str,
+    target_language: str,
+    title: Optional[str] = None,
+    cache_scope: Optional[str] = None
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Async stream_translate_text"""
+    cache = _response_cache
+    cache_key = None
+    if cache is not None:
+        cache_key = _translation_cache_key(text, target_language, title, cache_scope)
+        cached = await _in_thread(cache.get, cache_key)
+        if cached is not None:
+            for event in _replay_cached(cached):
+                yield event
+            return
+    
+    raw_parts: List[str] = []
+    messages = _translation_messages(text, target_language, title)
+    async for event in _stream_note_fields_async(messages, TRANSLATE_TEMPERATURE, raw_parts):
+        yield event
+    
+    content = ''.join(raw_parts)
+    translated = _parse_translation(content, title)
+    if translated is None:
+        translated = {"title": title or "Translated Note", "content": content}
+    elif cache_key is not None:
+        await _in_thread(cache.set, cache_key, translated)
+    yield 'done', translated
+
+async def generate_structured_notes_async(
+    user_input: str,
+    language: str = "en"
+) -> Dict[str, Any]:
+    """Async generate_structured_notes"""
+    cache = _response_cache
+    cache_key = None
+    if cache is not None:
+        cache_key = _generation_cache_key(user_input, language)
+        cached = await _in_thread(cache.get, cache_key)
+        if cached is not None:
+            return dict(cached)
+    
+    messages = _generation_messages(user_input)
+    response = await get_async_llm_client().call_llm_model(messages, temperature=GENERATE_TEMPERATURE)
+    
+    if response.error:
+        raise Exception(f"Note generation failed: {response.error}")
+    
+    generated = _parse_generated(response.content, user_input)
+    if generated is None:
+        return _generation_fallback(user_input)
+    if cache_key is not None:
+        await _in_thread(cache.set, cache_key, generated)
+    return generated
+
+async def stream_structured_notes_async(
+    user_input: str,
+    language: str = "en"
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Async stream_structured_notes"""
+    cache = _response_cache
+    cache_key = None
+    if cache is not None:
+        cache_key = _generation_cache_key(user_input, language)
+        cached = await _in_thread(cache.get, cache_key)
+        if cached is not None:
+            for event in _replay_cached(cached):
+                yield event
+            return
+    
+    raw_parts: List[str] = []
+    async for event in _stream_note_fields_async(_generation_messages(user_input), GENERATE_TEMPERATURE, raw_parts):
+        yield event
+    
+    generated = _parse_generated(''.join(raw_parts), user_input)
+    if generated is None:
+        generated = _generation_fallback(user_input)
+    elif cache_key is not None:
+        await _in_thread(cache.set, cache_key, generated)
+    yield 'done', generated
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+# Two-tier cache for parsed LLM responses.
+#
+# Keys are content addressed: a sha256 over every parameter that can change the
+# model's answer (model, prompt template version, input text, target language,
+# temperature, ...), so a changed input can never be served a stale answer.
+# The in-process LRU tier answers repeated requests on a warm instance; the
+# database tier (llm_cache table) survives restarts and is shared by every
+# instance that talks to the same database.
+#
+# Environment variables:
+#   LLM_CACHE_ENABLED          set to "false" to bypass the cache (default true)
+#   LLM_CACHE_TTL_SECONDS      entry lifetime in both tiers (default 7 days)
+#   LLM_CACHE_MEMORY_ENTRIES   in-process LRU capacity (default 512)
+#   LLM_CACHE_DB_ENTRIES       rows kept in llm_cache before the oldest are evicted (default 10000)
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MEMORY_ENTRIES = 512
+DEFAULT_DB_ENTRIES = 10000
+
+# Expired/overflowing database rows are pruned once every this many writes
+PRUNE_EVERY_WRITES = 100
+
+
+def make_cache_key(**parts: Any) -> str:
+    """Stable sha256 over keyword parts (order independent)"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        entry_model: Any = None,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        db_entries: int = DEFAULT_DB_ENTRIES,
+        clock: Callable[[], float] = time.time
+    ):
+        self.session_factory = session_factory
+        self.entry_model = entry_model
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.db_entries = db_entries
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._writes = 0
+        self.counters = {
+            'memoryHits': 0,
+            'dbHits': 0,
+            'misses': 0,
+            'writes': 0,
+            'memoryEvictions': 0,
+            'dbEvictions': 0,
+            'errors': 0,
+        }
+
+    @classmethod
+    def from_env(cls, session_factory=None, entry_model=None) -> "LLMCache":
+        return cls(
+            session_factory=session_factory,
+            entry_model=entry_model,
+            ttl_seconds=int(os.getenv('LLM_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)),
+            memory_entries=int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', DEFAULT_MEMORY_ENTRIES)),
+            db_entries=int(os.getenv('LLM_CACHE_DB_ENTRIES', DEFAULT_DB_ENTRIES)),
+        )
+
+    @property
+    def has_db_tier(self) -> bool:
+        return self.session_factory is not None and self.entry_model is not None
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] += amount
+
+    def get(self, key: str) -> Optional[Any]:
+        now = self.clock()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.counters['memoryHits'] += 1
+                    return value
+                del self._memory[key]
+
+        if self.has_db_tier:
+            value = self._db_get(key, now)
+            if value is not None:
+                self._count('dbHits')
+                self._memory_set(key, value, now)
+                return value
+
+        self._count('misses')
+        return None
+
+    def set(self, key: str, value: Any):
+        now = self.clock()
+        self._memory_set(key, value, now)
+        self._count('writes')
+        if self.has_db_tier:
+            self._db_set(key, value, now)
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.counters)
+            stats['memoryEntries'] = len(self._memory)
+        lookups = stats['memoryHits'] + stats['dbHits'] + stats['misses']
+        stats['hitRate'] = round((stats['memoryHits'] + stats['dbHits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _memory_set(self, key: str, value: Any, now: float):
+        with self._lock:
+            self._memory[key] = (now + self.ttl_seconds, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+                self.counters['memoryEvictions'] += 1
+
+    def _db_get(self, key: str, now: float) -> Optional[Any]:
+        db = self.session_factory()
+        try:
+            entry = db.get(self.entry_model, key)
+            if entry is None or entry.expires_at <= datetime.utcfromtimestamp(now):
+                return None
+            return json.loads(entry.value)
+        except Exception as e:
+            # A broken cache must never break translation
+            print(f"LLM cache read failed: {e}")
+            self._count('errors')
+            return None
+        finally:
+            db.close()
+
+    def _db_set(self, key: str, value: Any, now: float):
+        created_at = datetime.utcfromtimestamp(now)
+        db = self.session_factory()
+        try:
+            db.merge(self.entry_model(
+                key=key,
+                value=json.dumps(value, ensure_ascii=False),
+                created_at=created_at,
+                expires_at=created_at + timedelta(seconds=self.ttl_seconds)
+            ))
+            db.commit()
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % PRUNE_EVERY_WRITES == 0
+            if prune:
+                self.prune(db, now)
+        except Exception as e:
+            db.rollback()
+            print(f"LLM cache write failed: {e}")
+            self._count('errors')
+        finally:
+            db.close()
+
+    def prune(self, db, now: Optional[float] = None) -> int:
+        """Delete expired rows, then the oldest rows beyond db_entries"""
+        model = self.entry_model
+        now_dt = datetime.utcfromtimestamp(self.clock() if now is None else now)
+        removed = db.query(model).filter(model.expires_at <= now_dt).delete(synchronize_session=False)
+
+        excess = db.query(model).count() - self.db_entries
+        if excess > 0:
+            oldest = db.query(model.key).order_by(model.created_at.asc()).limit(excess).subquery()
+            removed += db.query(model).filter(model.key.in_(db.query(oldest.c.key))).delete(
+                synchronize_session=False
+            )
+        db.commit()
+        self._count('dbEvictions', removed)
+        return removed
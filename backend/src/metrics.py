@@ -0,0 +1,263 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, Response, request
+from sqlalchemy import event
+
+# Request timing and Prometheus metrics.
+#
+# Each request gets a RequestTimer in a context variable; SQLAlchemy cursor
+# events and LLM calls made on the request's thread add their time to it.
+# Responses carry a Server-Timing header (db, llm and total app time, plus the
+# query count), and when the response is closed — after a streamed body has
+# been sent — the request's latency, DB time and query count are recorded in
+# per-route histograms. GET /metrics renders everything in the Prometheus text
+# format. Counters are per process: scrape each worker.
+#
+# Environment variables:
+#   METRICS_ENABLED        set to false to turn timing and /metrics off (default true)
+#   SERVER_TIMING_ENABLED  set to false to keep timings out of response headers (default true)
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() != 'false'
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'true').lower() != 'false'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter per label combination"""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, *label_values: str):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {_format_number(value)}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label combination"""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], List] = {}  # labels -> [bucket counts, sum, count]
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values: str) -> int:
+        with self._lock:
+            series = self._series.get(label_values)
+            return series[2] if series else 0
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for label_values, (bucket_counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labels, label_values, f'le="{_format_number(bound)}"')
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                labels = _format_labels(self.labels, label_values, 'le="+Inf"')
+                lines.append(f'{self.name}_bucket{labels} {count}')
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f'{self.name}_sum{labels} {_format_number(total)}')
+                lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+request_duration = Histogram(
+    'http_request_duration_seconds', 'Time from request start until the response body was sent',
+    ('method', 'route', 'status'))
+request_db_time = Histogram(
+    'http_request_db_seconds', 'Database time spent by one request', ('method', 'route'), QUERY_BUCKETS)
+request_db_queries = Histogram(
+    'http_request_db_queries', 'Queries executed by one request', ('method', 'route'), QUERY_COUNT_BUCKETS)
+query_duration = Histogram(
+    'db_query_duration_seconds', 'Duration of each database statement, in and outside requests', (), QUERY_BUCKETS)
+llm_duration = Histogram(
+    'llm_request_duration_seconds', 'Latency of model calls (streams: until the last token)',
+    ('model', 'mode', 'outcome'), LLM_BUCKETS)
+llm_tokens = Counter('llm_tokens_total', 'Tokens reported in model responses', ('model', 'type'))
+
+REGISTRY = [request_duration, request_db_time, request_db_queries, query_duration, llm_duration, llm_tokens]
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics():
+    for metric in REGISTRY:
+        metric.reset()
+
+
+class RequestTimer:
+    """Time spent by one request, filled in by DB and LLM instrumentation"""
+
+    __slots__ = ('started', 'db_seconds', 'db_queries', 'llm_seconds', 'llm_calls')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.db_queries = 0
+        self.llm_seconds = 0.0
+        self.llm_calls = 0
+
+    def server_timing(self) -> str:
+        total = (time.perf_counter() - self.started) * 1000
+        parts = [f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"']
+        if self.llm_calls:
+            parts.append(f'llm;dur={self.llm_seconds * 1000:.1f};desc="{self.llm_calls} calls"')
+        parts.append(f'app;dur={total:.1f}')
+        return ', '.join(parts)
+
+
+_current_timer: ContextVar[Optional[RequestTimer]] = ContextVar('request_timer', default=None)
+
+
+def current_timer() -> Optional[RequestTimer]:
+    return _current_timer.get()
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement on the engine and charge it to the current request"""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        query_duration.observe(elapsed)
+        timer = _current_timer.get()
+        if timer is not None:
+            timer.db_seconds += elapsed
+            timer.db_queries += 1
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None and context.connection.info.get('query_started'):
+            context.connection.info['query_started'].pop()
+
+
+def record_llm_call(model: str, seconds: float, mode: str = 'complete', usage: Optional[Dict] = None,
+                    error: bool = False) -> None:
+    """Record one model call; usage is LLMResponse.usage"""
+    llm_duration.observe(seconds, model, mode, 'error' if error else 'ok')
+    if usage:
+        llm_tokens.inc(usage.get('prompt_tokens') or 0, model, 'prompt')
+        llm_tokens.inc(usage.get('completion_tokens') or 0, model, 'completion')
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.llm_seconds += seconds
+        timer.llm_calls += 1
+
+
+def start_request_timer() -> RequestTimer:
+    """Start timing the request running in the current context"""
+    timer = RequestTimer()
+    _current_timer.set(timer)
+    return timer
+
+
+def record_request(timer: RequestTimer, method: str, route: str, status) -> None:
+    """Record a finished request in the per-route histograms"""
+    request_duration.observe(time.perf_counter() - timer.started, method, route, str(status))
+    request_db_time.observe(timer.db_seconds, method, route)
+    request_db_queries.observe(timer.db_queries, method, route)
+
+
+def _start_timer():
+    start_request_timer()
+
+
+def _finish_request(response: Response) -> Response:
+    timer = _current_timer.get()
+    if timer is None:
+        return response
+    if SERVER_TIMING_ENABLED:
+        response.headers['Server-Timing'] = timer.server_timing()
+
+    method = request.method
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    # Runs once the body has been sent, so streamed responses are timed in full
+    response.call_on_close(lambda: record_request(timer, method, route, response.status_code))
+    return response
+
+
+def metrics_response() -> Response:
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+
+def init_metrics(app: Flask):
+    if METRICS_ENABLED:
+        app.before_request(_start_timer)
+        app.after_request(_finish_request)
+        app.add_url_rule('/metrics', 'metrics', metrics_response)
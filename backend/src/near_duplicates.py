@@ -0,0 +1,305 @@
+import hashlib
+import random
+import re
+import sys
+import zlib
+from array import array
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, delete, func, insert, select
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Near-duplicate notes with MinHash and locality-sensitive hashing.
+#
+# Each note's title and content are cut into word 3-shingles; the MinHash
+# signature (NUM_PERM minimums of random linear hashes) estimates the Jaccard
+# similarity of two notes' shingle sets as the share of equal positions. The
+# signature is split into BANDS bands of ROWS values and each band is hashed to
+# a bucket, stored in note_lsh_buckets with an index on (band, bucket): notes
+# that share any bucket are candidates, found by index lookups instead of
+# comparing every pair, and candidates are then checked against the threshold
+# with their signatures. With 16 bands of 8 rows a pair is a candidate with
+# probability ~0.95 at 0.8 similarity, ~0.6 at 0.7 and ~0.06 at 0.5: this finds
+# near-copies, not loosely related notes (that is semantic search's job).
+#
+# Signatures are computed when a note is written (in index_written_notes) and
+# for bulk imports; NumPy speeds them up when installed.
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+SIGNATURE_VERSION = 1  # bump when the shingling or hash functions change
+
+DEFAULT_SIMILAR_THRESHOLD = 0.7
+DEFAULT_DUPLICATE_THRESHOLD = 0.8
+BACKFILL_BATCH_SIZE = 1000
+
+_PRIME = (1 << 31) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+if NUMPY_AVAILABLE:
+    _A = np.array([a for a, _ in _PERMUTATIONS], dtype=np.uint64)
+    _B = np.array([b for _, b in _PERMUTATIONS], dtype=np.uint64)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _note_text(title: str, content: str) -> str:
+    return f'{title}\n{content or ""}'
+
+
+def signature_hash(title: str, content: str) -> str:
+    """Identifies the text (and signature scheme) a stored signature was computed from"""
+    return hashlib.sha1(f'{SIGNATURE_VERSION}\n{_note_text(title, content)}'.encode()).hexdigest()
+
+
+def shingle_hashes(text: str) -> List[int]:
+    """Hashes of the distinct word n-grams of text (the words themselves for very short texts)"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = {' '.join(tokens)} if tokens else set()
+    else:
+        shingles = {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    return [zlib.crc32(shingle.encode()) % _PRIME for shingle in shingles]
+
+
+def minhash(hashes: Sequence[int]) -> Optional[List[int]]:
+    """MinHash signature of a shingle hash set, or None when it is empty"""
+    if not hashes:
+        return None
+    if NUMPY_AVAILABLE:
+        values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        signature = np.full(NUM_PERM, _PRIME, dtype=np.uint64)
+        # Chunked so a very long note does not build a huge (shingles x NUM_PERM) matrix
+        for start in range(0, len(values), 4096):
+            chunk = values[start:start + 4096, None]
+            np.minimum(signature, ((chunk * _A + _B) % _PRIME).min(axis=0), out=signature)
+        return signature.tolist()
+    return [min((a * x + b) % _PRIME for x in hashes) for a, b in _PERMUTATIONS]
+
+
+def encode_signature(signature: Optional[List[int]]) -> bytes:
+    """uint32 little-endian blob; empty for notes without text"""
+    if signature is None:
+        return b''
+    values = array('I', signature)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tobytes()
+
+
+def decode_signature(blob: bytes) -> array:
+    values = array('I')
+    values.frombytes(blob)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def band_buckets(signature: List[int]) -> List[int]:
+    """One signed 64-bit bucket per band"""
+    blob = encode_signature(signature)
+    width = ROWS * 4
+    return [
+        int.from_bytes(hashlib.blake2b(blob[i * width:(i + 1) * width], digest_size=8).digest(), 'little', signed=True)
+        for i in range(BANDS)
+    ]
+
+
+def similarity(first: bytes, second: bytes) -> float:
+    """Estimated Jaccard similarity of two encoded signatures"""
+    if not first or not second:
+        return 0.0
+    if NUMPY_AVAILABLE:
+        return float(np.count_nonzero(np.frombuffer(first, dtype='<u4') == np.frombuffer(second, dtype='<u4'))) / NUM_PERM
+    return sum(a == b for a, b in zip(decode_signature(first), decode_signature(second))) / NUM_PERM
+
+
+def parse_threshold(value: Optional[str], default: float) -> float:
+    if value is None or value == '':
+        return default
+    try:
+        threshold = float(value)
+    except ValueError:
+        raise ValueError('threshold must be a number')
+    if not 0 < threshold <= 1:
+        raise ValueError('threshold must be greater than 0 and at most 1')
+    return threshold
+
+
+def _store(conn, signature_table, bucket_table, rows) -> int:
+    """Compute and insert signatures and buckets for (id, title, content) rows"""
+    if not rows:
+        return 0
+    signatures, buckets = [], []
+    for row in rows:
+        signature = minhash(shingle_hashes(_note_text(row.title, row.content)))
+        signatures.append({
+            'note_id': row.id,
+            'text_hash': signature_hash(row.title, row.content),
+            'signature': encode_signature(signature),
+        })
+        if signature is not None:
+            buckets.extend(
+                {'note_id': row.id, 'band': band, 'bucket': bucket}
+                for band, bucket in enumerate(band_buckets(signature))
+            )
+    conn.execute(insert(signature_table), signatures)
+    if buckets:
+        conn.execute(insert(bucket_table), buckets)
+    return len(rows)
+
+
+def sync_signatures(conn, note_table, signature_table, bucket_table, note_ids: List[int]) -> int:
+    """Recompute the signatures of written notes whose text changed; returns how many"""
+    if not note_ids:
+        return 0
+    rows = conn.execute(
+        select(note_table.c.id, note_table.c.title, note_table.c.content, signature_table.c.text_hash)
+        .select_from(note_table.outerjoin(signature_table, signature_table.c.note_id == note_table.c.id))
+        .where(note_table.c.id.in_(note_ids))
+    ).all()
+    stale = [row for row in rows if row.text_hash != signature_hash(row.title, row.content)]
+    if not stale:
+        return 0
+    delete_signatures(conn, signature_table, bucket_table, [row.id for row in stale])
+    return _store(conn, signature_table, bucket_table, stale)
+
+
+def delete_signatures(conn, signature_table, bucket_table, note_ids: List[int]):
+    conn.execute(delete(bucket_table).where(bucket_table.c.note_id.in_(note_ids)))
+    conn.execute(delete(signature_table).where(signature_table.c.note_id.in_(note_ids)))
+
+
+def sign_unsigned_notes(conn, note_table, signature_table, bucket_table, where=None,
+                        batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Compute signatures for notes matching where (all by default) that have none, in keyset batches"""
+    query = (
+        select(note_table.c.id, note_table.c.title, note_table.c.content)
+        .select_from(note_table.outerjoin(signature_table, signature_table.c.note_id == note_table.c.id))
+        .where(signature_table.c.note_id.is_(None))
+        .order_by(note_table.c.id)
+    )
+    if where is not None:
+        query = query.where(where)
+    signed, last_id = 0, None
+    while True:
+        page = query if last_id is None else query.where(note_table.c.id > last_id)
+        rows = conn.execute(page.limit(batch_size)).all()
+        if not rows:
+            return signed
+        signed += _store(conn, signature_table, bucket_table, rows)
+        last_id = rows[-1].id
+
+
+def needs_signature_backfill(conn, note_table, signature_table) -> bool:
+    """True when some note has no signature (a database from before near-duplicate detection)"""
+    return conn.execute(
+        select(note_table.c.id)
+        .select_from(note_table.outerjoin(signature_table, signature_table.c.note_id == note_table.c.id))
+        .where(signature_table.c.note_id.is_(None))
+        .limit(1)
+    ).first() is not None
+
+
+def similar_notes(conn, signature_table, bucket_table, note_id: int,
+                  threshold: float = DEFAULT_SIMILAR_THRESHOLD, limit: int = 20) -> List[Tuple[int, float]]:
+    """(note id, estimated similarity) of notes sharing an LSH bucket with note_id, most similar first"""
+    own = conn.execute(select(signature_table.c.signature).where(signature_table.c.note_id == note_id)).scalar()
+    if not own:
+        return []
+    mine = bucket_table.alias('mine')
+    candidates = (
+        select(bucket_table.c.note_id)
+        .join(mine, and_(mine.c.band == bucket_table.c.band, mine.c.bucket == bucket_table.c.bucket))
+        .where(mine.c.note_id == note_id, bucket_table.c.note_id != note_id)
+    )
+    rows = conn.execute(
+        select(signature_table.c.note_id, signature_table.c.signature)
+        .where(signature_table.c.note_id.in_(candidates))
+    )
+    scored = [(row.note_id, similarity(own, row.signature)) for row in rows]
+    scored = [(candidate, score) for candidate, score in scored if score >= threshold]
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[:limit]
+
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, item: int) -> int:
+        root = self.parent.setdefault(item, item)
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while item != root:
+            item, self.parent[item] = self.parent[item], root
+        return root
+
+    def union(self, first: int, second: int):
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            self.parent[max(first, second)] = min(first, second)
+
+
+def duplicate_clusters(conn, signature_table, bucket_table,
+                       threshold: float = DEFAULT_DUPLICATE_THRESHOLD) -> List[Dict]:
+    """
+    Groups of notes whose estimated similarity reaches threshold, largest
+    first: [{'ids': [...], 'minSimilarity': s}]. Only buckets holding more
+    than one note are read; each candidate is compared with the first note
+    of its bucket, so the work grows with the number of candidates, not pairs.
+    """
+    shared = (
+        select(bucket_table.c.band, bucket_table.c.bucket)
+        .group_by(bucket_table.c.band, bucket_table.c.bucket)
+        .having(func.count() > 1)
+        .subquery()
+    )
+    rows = conn.execute(
+        select(bucket_table.c.band, bucket_table.c.bucket, bucket_table.c.note_id)
+        .join(shared, and_(shared.c.band == bucket_table.c.band, shared.c.bucket == bucket_table.c.bucket))
+        .order_by(bucket_table.c.band, bucket_table.c.bucket, bucket_table.c.note_id)
+    )
+    pairs = set()
+    for _, members in groupby(rows, key=lambda row: (row.band, row.bucket)):
+        first, *others = [row.note_id for row in members]
+        pairs.update((first, other) for other in others)
+    if not pairs:
+        return []
+
+    involved = sorted({note_id for pair in pairs for note_id in pair})
+    signatures = {}
+    for start in range(0, len(involved), BACKFILL_BATCH_SIZE):
+        chunk = involved[start:start + BACKFILL_BATCH_SIZE]
+        signatures.update(conn.execute(
+            select(signature_table.c.note_id, signature_table.c.signature)
+            .where(signature_table.c.note_id.in_(chunk))
+        ).all())
+
+    clusters = _DisjointSet()
+    scores: Dict[int, float] = {}
+    for first, second in pairs:
+        score = similarity(signatures.get(first, b''), signatures.get(second, b''))
+        if score >= threshold:
+            clusters.union(first, second)
+            scores[first] = min(scores.get(first, 1.0), score)
+            scores[second] = min(scores.get(second, 1.0), score)
+
+    groups: Dict[int, List[int]] = {}
+    for note_id in scores:
+        groups.setdefault(clusters.find(note_id), []).append(note_id)
+    report = [
+        {'ids': sorted(ids), 'minSimilarity': round(min(scores[note_id] for note_id in ids), 4)}
+        for ids in groups.values()
+    ]
+    report.sort(key=lambda group: (-len(group['ids']), group['ids'][0]))
+    return report
@@ -0,0 +1,191 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, or_, select, tuple_, update
+
+from src.note_updates import parse_note_patch, parse_version
+from src.tags import parse_tags
+
+# Many note writes in one request and one transaction.
+#
+# Operations are validated first, then the notes they touch are read (and
+# row-locked on Postgres) in one query. The writes are set-based:
+#   creates  one INSERT ... RETURNING id over all new rows
+#   updates  one UPDATE ... WHERE id IN (...) per distinct set of new values
+#            (retagging 5,000 notes the same way is a single statement)
+#   deletes  one DELETE ... WHERE id IN (...)
+# Operations that cannot apply (missing note, stale version, invalid input)
+# are reported and skipped; with atomic=true any of them rolls back the lot.
+
+MAX_BATCH_OPERATIONS = 1000
+
+CREATE, UPDATE, DELETE = 'create', 'update', 'delete'
+OPERATIONS = (CREATE, UPDATE, DELETE)
+
+# Every create carries the same columns: the INSERT is one executemany, whose
+# parameters are taken from the first row
+CREATE_DEFAULTS = {'content': '', 'tags': '[]', 'event_date': None, 'event_time': None}
+
+
+class BatchRaced(Exception):
+    """Another writer changed a note between the batch reading and updating it"""
+
+
+def parse_operations(data: Any) -> List[Dict[str, Any]]:
+    """The operations list of a batch body; raises ValueError for a malformed body"""
+    if not isinstance(data, dict) or not isinstance(data.get('operations'), list):
+        raise ValueError('expected {"operations": [...]}')
+    operations = data['operations']
+    if not operations:
+        raise ValueError('operations must not be empty')
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise ValueError(f'at most {MAX_BATCH_OPERATIONS} operations per batch')
+    return operations
+
+
+def _validate(operation: Any) -> Tuple[str, Optional[int], Dict[str, Any], Optional[int]]:
+    """(op, note id, column values, expected version); raises ValueError"""
+    if not isinstance(operation, dict) or operation.get('op') not in OPERATIONS:
+        raise ValueError(f"op must be one of {', '.join(OPERATIONS)}")
+    op = operation['op']
+    note_id = None
+    if op != CREATE:
+        note_id = operation.get('id')
+        if isinstance(note_id, bool) or not isinstance(note_id, int):
+            raise ValueError('id must be an integer')
+    values: Dict[str, Any] = {}
+    if op != DELETE:
+        values = parse_note_patch(operation.get('note'))
+    if op == CREATE:
+        if 'title' not in values:
+            raise ValueError('title is required')
+        values = {**CREATE_DEFAULTS, **values}
+    if op == UPDATE and not values:
+        raise ValueError('No fields to update')
+    return op, note_id, values, parse_version(operation.get('version'))
+
+
+def run_batch(conn, note_table, operations: List[Any], serialize: Callable, atomic: bool = False,
+              after_write: Optional[Callable] = None) -> List[Dict[str, Any]]:
+    """
+    Apply the operations on conn (the caller commits or rolls back) and return
+    one result per operation. serialize(row) turns a notes row into the API
+    note shape; after_write(conn, written_ids, note_tags, deleted_ids) runs
+    once the writes are done, with the tags of new and retagged notes.
+    Raises BatchRaced when a concurrent write slipped in.
+    """
+    results: List[Dict[str, Any]] = [{} for _ in operations]
+    parsed: Dict[int, Tuple[str, Optional[int], Dict[str, Any], Optional[int]]] = {}
+    for index, operation in enumerate(operations):
+        op = operation.get('op') if isinstance(operation, dict) else None
+        try:
+            parsed[index] = _validate(operation)
+        except ValueError as e:
+            results[index] = {'op': op, 'status': 'invalid', 'error': str(e)}
+
+    # A note may appear in one operation only: their order would otherwise matter
+    seen: Dict[int, int] = {}
+    for index, (op, note_id, _, _) in list(parsed.items()):
+        if note_id is None:
+            continue
+        if note_id in seen:
+            for duplicate in (seen[note_id], index):
+                parsed.pop(duplicate, None)
+                results[duplicate] = {'op': operations[duplicate]['op'], 'id': note_id, 'status': 'invalid',
+                                      'error': 'note appears in more than one operation'}
+        else:
+            seen[note_id] = index
+
+    existing = {}
+    if seen:
+        existing = {
+            row.id: row for row in conn.execute(
+                select(note_table).where(note_table.c.id.in_(list(seen))).with_for_update()
+            )
+        }
+
+    creates, deletes = [], []
+    updates = defaultdict(list)  # frozen values -> [(index, id, version)]
+    for index, (op, note_id, values, version) in parsed.items():
+        if op == CREATE:
+            creates.append((index, values))
+            continue
+        current = existing.get(note_id)
+        if current is None:
+            results[index] = {'op': op, 'id': note_id, 'status': 'not_found'}
+        elif version is not None and version != current.version:
+            results[index] = {'op': op, 'id': note_id, 'status': 'conflict', 'note': serialize(current)}
+        elif op == DELETE:
+            deletes.append((index, note_id))
+        else:
+            updates[tuple(sorted(values.items()))].append((index, note_id, version))
+
+    failed = sum(1 for result in results if result)
+    if atomic and failed:
+        for index in parsed:
+            results[index] = results[index] or {'op': parsed[index][0], 'id': parsed[index][1],
+                                                'status': 'rolled_back'}
+        return results
+
+    note_tags: Dict[int, List[str]] = {}
+    created_ids = _insert(conn, note_table, [values for _, values in creates])
+    for (index, values), note_id in zip(creates, created_ids):
+        results[index] = {'op': CREATE, 'id': note_id, 'status': 'created'}
+        note_tags[note_id] = parse_tags(values['tags'])
+
+    now = datetime.utcnow()
+    for frozen, targets in updates.items():
+        values = dict(frozen)
+        unversioned = [note_id for _, note_id, version in targets if version is None]
+        versioned = [(note_id, version) for _, note_id, version in targets if version is not None]
+        matches = []
+        if unversioned:
+            matches.append(note_table.c.id.in_(unversioned))
+        if versioned:
+            matches.append(tuple_(note_table.c.id, note_table.c.version).in_(versioned))
+        updated = conn.execute(
+            update(note_table).where(or_(*matches))
+            .values(**values, version=note_table.c.version + 1, updated_at=now)
+        ).rowcount
+        if updated != len(targets):
+            raise BatchRaced('Notes changed while the batch was running; retry it')
+        for index, note_id, _ in targets:
+            results[index] = {'op': UPDATE, 'id': note_id, 'status': 'updated'}
+            if 'tags' in values:
+                note_tags[note_id] = parse_tags(values['tags'])
+
+    if deletes:
+        conn.execute(delete(note_table).where(note_table.c.id.in_([note_id for _, note_id in deletes])))
+        for index, note_id in deletes:
+            results[index] = {'op': DELETE, 'id': note_id, 'status': 'deleted'}
+
+    written = [result['id'] for result in results if result.get('status') in ('created', 'updated')]
+    if after_write:
+        after_write(conn, written, note_tags, [note_id for _, note_id in deletes])
+
+    # Return the written notes as they are now, in one read
+    if written:
+        rows = {row.id: row for row in conn.execute(select(note_table).where(note_table.c.id.in_(written)))}
+        for result in results:
+            if result.get('status') in ('created', 'updated'):
+                result['note'] = serialize(rows[result['id']])
+
+    return results
+
+
+def _insert(conn, note_table, rows: List[Dict[str, Any]]) -> List[int]:
+    """Insert rows in one statement and return their ids in input order"""
+    if not rows:
+        return []
+    if conn.dialect.insert_executemany_returning_sort_by_parameter_order:
+        statement = insert(note_table).returning(note_table.c.id, sort_by_parameter_order=True)
+        return [row.id for row in conn.execute(statement, rows)]
+    return [conn.execute(insert(note_table).values(**row)).inserted_primary_key[0] for row in rows]
+
+
+def count_statuses(results: List[Dict[str, Any]]) -> Dict[str, int]:
+    counts: Dict[str, int] = defaultdict(int)
+    for result in results:
+        counts[result['status']] += 1
+    return dict(counts)
@@ -0,0 +1,117 @@
+import json
+from datetime import date, datetime, time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, update
+
+from src.tags import normalize_tags
+
+# Partial note updates with optimistic locking.
+#
+# A PATCH becomes one UPDATE that sets only the supplied columns, bumps
+# version and, when the client names the version it edited, adds
+# `AND version = :expected`. Zero rows updated then means the note was
+# changed (or deleted) since the client read it; the caller looks the row up
+# only on that failure path to tell a 404 from a conflict.
+
+# API field -> column for the fields a PATCH may set
+PATCHABLE_FIELDS = {
+    'title': 'title',
+    'content': 'content',
+    'tags': 'tags',
+    'eventDate': 'event_date',
+    'eventTime': 'event_time',
+}
+
+# Echoed back by clients that send the whole note; ignored
+READ_ONLY_FIELDS = {'id', 'updatedAt', 'version', 'preview'}
+
+MAX_TITLE_LENGTH = 200
+
+
+class NoteConflict(Exception):
+    """The note's version is not the one the client expected"""
+
+    def __init__(self, current: Dict[str, Any]):
+        super().__init__('Note was changed by another request')
+        self.current = current
+
+
+def parse_note_patch(data: Any) -> Dict[str, Any]:
+    """Column values for the fields present in a PATCH body; raises ValueError"""
+    if not isinstance(data, dict):
+        raise ValueError('expected a JSON object')
+    unknown = set(data) - PATCHABLE_FIELDS.keys() - READ_ONLY_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    values: Dict[str, Any] = {}
+    if 'title' in data:
+        title = data['title']
+        if not isinstance(title, str) or not title.strip():
+            raise ValueError('title must be a non-empty string')
+        if len(title) > MAX_TITLE_LENGTH:
+            raise ValueError(f'title is longer than {MAX_TITLE_LENGTH} characters')
+        values['title'] = title
+    if 'content' in data:
+        if not isinstance(data['content'], str):
+            raise ValueError('content must be a string')
+        values['content'] = data['content']
+    if 'tags' in data:
+        tags = data['tags']
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            raise ValueError('tags must be a list of strings')
+        values['tags'] = json.dumps(normalize_tags(tags))
+    if 'eventDate' in data:
+        values['event_date'] = _parse_optional(data['eventDate'], date.fromisoformat, 'eventDate')
+    if 'eventTime' in data:
+        values['event_time'] = _parse_optional(data['eventTime'], time.fromisoformat, 'eventTime')
+    return values
+
+
+def _parse_optional(value: Any, parse, name: str):
+    if value is None or value == '':
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f'{name} must be an ISO 8601 string or null')
+    try:
+        return parse(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO 8601 string or null')
+
+
+def parse_version(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError('version must be a positive integer')
+    return value
+
+
+def patch_note(conn, note_table, note_id: int, values: Dict[str, Any],
+               expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Apply values to one note in a single UPDATE, bumping its version, and
+    return the updated row's columns. Returns None when the note does not
+    exist; raises NoteConflict when expected_version is stale.
+    """
+    statement = (
+        update(note_table)
+        .where(note_table.c.id == note_id)
+        .values(**values, version=note_table.c.version + 1, updated_at=datetime.utcnow())
+    )
+    if expected_version is not None:
+        statement = statement.where(note_table.c.version == expected_version)
+
+    if conn.dialect.update_returning:
+        row = conn.execute(statement.returning(*note_table.c)).first()
+    else:
+        updated = conn.execute(statement).rowcount
+        row = conn.execute(select(note_table).where(note_table.c.id == note_id)).first() if updated else None
+    if row is not None:
+        return dict(row._mapping)
+
+    current = conn.execute(select(note_table).where(note_table.c.id == note_id)).first()
+    if current is None:
+        return None
+    raise NoteConflict(dict(current._mapping))
@@ -0,0 +1,61 @@
+import base64
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+
+# Keyset (cursor) pagination over notes ordered by (updated_at DESC, id DESC).
+# The cursor is the sort key of the last row on the previous page, so each page
+# is an index range scan on ix_notes_updated_at_id no matter how deep it is.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(updated_at: datetime, note_id: int) -> str:
+    raw = f"{updated_at.isoformat()}|{note_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        updated_at, note_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(updated_at), int(note_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def parse_limit(value: Optional[str]) -> int:
+    if value is None or value == '':
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_fields(value: Optional[str], allowed: Dict[str, object]) -> List[str]:
+    """Parse `fields=id,title,...`; no value means every field except derived ones"""
+    if not value:
+        return [name for name in allowed if name != 'preview']
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(fields))
+
+
+def keyset_page(query, model, cursor: Optional[str], limit: int):
+    """
+    Order `query` by (updated_at, id) descending, start after `cursor` and
+    fetch one row more than `limit` so the caller can tell if a next page exists.
+    """
+    if cursor:
+        updated_at, note_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.updated_at, model.id) < tuple_(updated_at, note_id))
+    return query.order_by(model.updated_at.desc(), model.id.desc()).limit(limit + 1)
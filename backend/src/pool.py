@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool, QueuePool
+
+# Connection pool configuration for the notes engine.
+#
+# Environment variables:
+#   DB_POOL_MODE       'queue' (default) keeps connections open between requests;
+#                      'null' opens one per checkout, for use behind an external
+#                      pooler such as PgBouncer or Supabase's pooler
+#   DB_POOL_SIZE       persistent connections per process (default 5, 1 on Vercel)
+#   DB_MAX_OVERFLOW    extra connections allowed under burst (default 10, 1 on Vercel)
+#   DB_POOL_TIMEOUT    seconds to wait for a free connection (default 30)
+#   DB_POOL_RECYCLE    seconds before a connection is replaced (default 1800)
+#   DB_POOL_PRE_PING   test connections on checkout (default true)
+#
+# A Vercel function instance serves one request at a time, so a large pool there
+# only multiplies idle connections across instances.
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ''):
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class PoolMetrics:
+    """Thread-safe counters for connection pool activity"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.waits = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self, pool=None) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'waitMsTotal': round(self.wait_seconds_total * 1000, 3),
+                'waitMsMax': round(self.wait_seconds_max * 1000, 3),
+                'waitMsAvg': round(self.wait_seconds_total * 1000 / self.waits, 3) if self.waits else 0.0,
+            }
+        if pool is not None:
+            stats['poolClass'] = type(pool).__name__
+            stats['checkedOut'] = self.checkouts - self.checkins
+            if isinstance(pool, QueuePool):
+                stats['size'] = pool.size()
+                stats['checkedIn'] = pool.checkedin()
+                stats['checkedOut'] = pool.checkedout()
+                stats['overflow'] = max(pool.overflow(), 0)
+        return stats
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - started)
+
+
+class TimedNullPool(NullPool):
+    """NullPool that records connection setup time as checkout wait"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - started)
+
+
+def get_engine_options(database_url: str) -> Dict[str, Any]:
+    """Keyword arguments for create_engine() built from the DB_POOL_* settings"""
+    if database_url in ('sqlite://', 'sqlite:///:memory:'):
+        # In-memory SQLite lives inside its single connection; keep the default pool
+        return {}
+
+    serverless = bool(os.getenv('VERCEL'))
+    mode = os.getenv('DB_POOL_MODE', 'queue').strip().lower()
+    if mode not in ('queue', 'null'):
+        raise ValueError(f"DB_POOL_MODE must be 'queue' or 'null', got {mode!r}")
+
+    options: Dict[str, Any] = {
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+    }
+    if mode == 'null':
+        options['poolclass'] = TimedNullPool
+        return options
+
+    options.update({
+        'poolclass': TimedQueuePool,
+        'pool_size': _env_int('DB_POOL_SIZE', 1 if serverless else 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 1 if serverless else 10),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+    })
+    return options
+
+
+def instrument_pool(engine) -> None:
+    """Count connects/checkouts/checkins/invalidations on the engine's pool"""
+    event.listen(engine, 'connect', lambda *args: pool_metrics.increment('connects'))
+    event.listen(engine, 'checkout', lambda *args: pool_metrics.increment('checkouts'))
+    event.listen(engine, 'checkin', lambda *args: pool_metrics.increment('checkins'))
+    event.listen(engine, 'invalidate', lambda *args: pool_metrics.increment('invalidations'))
@@ -0,0 +1,166 @@
+import re
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+
+# Full-text search over notes.
+#
+# SQLite uses an external-content FTS5 table kept in sync by triggers, so the
+# index is maintained on every insert/update/delete without any application code.
+# Postgres uses a generated tsvector column with a GIN index.  Both rank results
+# with title matches weighted above content matches.  Any other dialect (or a
+# SQLite build without FTS5) falls back to the original LIKE scan.
+
+FTS_TABLE = 'notes_fts'
+
+# Title hits count ten times as much as content hits in bm25 ranking.
+# Ranking runs inside the FTS table before joining notes, so only the
+# top `limit` rows ever have their content read.
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+SQLITE_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, content,
+        content='notes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, content ON notes BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+]
+
+# 'simple' configuration: notes are multilingual (see translate), so no stemming
+POSTGRES_SCHEMA = [
+    """ALTER TABLE notes ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_notes_search_vector ON notes USING GIN (search_vector)",
+]
+
+# Engine URL -> whether the full-text index is available on it
+_indexed_engines: Dict[str, bool] = {}
+
+
+def setup_search_index(engine) -> bool:
+    """
+    Create the full-text index for the notes table if it does not exist yet.
+    Safe to call on every startup. Returns True when ranked search is available.
+    """
+    dialect = engine.dialect.name
+    enabled = False
+    try:
+        with engine.begin() as conn:
+            if dialect == 'sqlite':
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {'name': FTS_TABLE}
+                ).first()
+                if not exists:
+                    conn.execute(text(SQLITE_SCHEMA[0]))
+                for statement in SQLITE_SCHEMA[1:]:
+                    conn.execute(text(statement))
+                if not exists:
+                    # Persist the column weights as the table's default rank function
+                    conn.execute(text(
+                        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) "
+                        f"VALUES ('rank', 'bm25({TITLE_WEIGHT}, {CONTENT_WEIGHT})')"
+                    ))
+                    # Index notes written before the FTS table existed
+                    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+                enabled = True
+            elif dialect == 'postgresql':
+                for statement in POSTGRES_SCHEMA:
+                    conn.execute(text(statement))
+                enabled = True
+    except Exception as e:
+        print(f"Full-text index setup failed, falling back to LIKE search: {e}")
+        enabled = False
+
+    _indexed_engines[str(engine.url)] = enabled
+    return enabled
+
+
+def rebuild_search_index(engine) -> None:
+    """Rebuild the SQLite FTS index from the notes table (Postgres maintains it itself)"""
+    if engine.dialect.name == 'sqlite':
+        with engine.begin() as conn:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def tokenize(query: str) -> List[str]:
+    return _TOKEN_RE.findall(query.lower())
+
+
+def build_match_query(query: str, dialect: str) -> str:
+    """
+    Turn free text typed into the search box into an index query.
+    Every term must match; the last term matches as a prefix so results
+    update while the user is still typing.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return ''
+    if dialect == 'postgresql':
+        terms = tokens[:-1] + [tokens[-1] + ':*']
+        return ' & '.join(terms)
+    terms = [f'"{token}"' for token in tokens[:-1]] + [f'"{tokens[-1]}"*']
+    return ' '.join(terms)
+
+
+def _note_columns(model) -> str:
+    return ', '.join(f'notes.{column.name}' for column in model.__table__.columns)
+
+
+def ranked_search(db, model, query: str, limit: int = 50) -> List[Any]:
+    """
+    Search notes by title and content, best matches first.
+    `model` is the mapped Note class.
+    """
+    bind = db.get_bind()
+    dialect = bind.dialect.name
+
+    if not _indexed_engines.get(str(bind.url)):
+        return db.query(model).filter(
+            model.title.contains(query) | model.content.contains(query)
+        ).order_by(model.updated_at.desc()).limit(limit).all()
+
+    match_query = build_match_query(query, dialect)
+    if not match_query:
+        return []
+
+    if dialect == 'postgresql':
+        statement = text(f"""
+            SELECT {_note_columns(model)}
+            FROM notes, to_tsquery('simple', :query) AS query
+            WHERE notes.search_vector @@ query
+            ORDER BY ts_rank(notes.search_vector, query) DESC, notes.updated_at DESC
+            LIMIT :limit
+        """)
+    else:
+        statement = text(f"""
+            SELECT {_note_columns(model)}
+            FROM (
+                SELECT rowid, rank FROM {FTS_TABLE}
+                WHERE {FTS_TABLE} MATCH :query
+                ORDER BY rank
+                LIMIT :limit
+            ) AS hits
+            JOIN notes ON notes.id = hits.rowid
+            ORDER BY hits.rank, notes.updated_at DESC
+        """)
+
+    return db.query(model).from_statement(
+        statement.bindparams(query=match_query, limit=limit)
+    ).all()
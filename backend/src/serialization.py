@@ -0,0 +1,120 @@
+import json
+import os
+from datetime import date, datetime, time
+from typing import Any, Iterator, List, Sequence
+
+from flask.json.provider import DefaultJSONProvider
+
+# Fast JSON for note responses.
+#
+# Note lists are selected as plain rows (no ORM objects) and encoded straight to
+# bytes: notes.tags already holds the JSON array text, so it is spliced into
+# the output instead of being decoded and re-encoded, and dates/times are left
+# to the encoder. orjson is used when installed (several times faster than the
+# stdlib encoder); without it the same bytes come from json.dumps.
+#
+# Unbounded lists are streamed instead: rows are fetched yield_per at a time
+# and each batch is encoded and sent before the next is read, so memory per
+# request stays flat however many notes there are.
+#
+# Environment variables:
+#   STREAM_BATCH_SIZE   rows fetched and encoded per chunk of a streamed list (default 1000)
+
+STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 1000))
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _default(value: Any) -> Any:
+    # ISO 8601 like Note.to_dict(), not Flask's HTTP dates
+    if isinstance(value, (date, time, datetime)):
+        return value.isoformat()
+    return DefaultJSONProvider.default(value)
+
+
+if ORJSON_AVAILABLE:
+    # jsonify() keeps Flask's sorted keys
+    SORTED_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson when available (jsonify, request.get_json)"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if ORJSON_AVAILABLE and not kwargs:
+            return orjson.dumps(obj, default=_default, option=SORTED_OPTIONS).decode()
+        kwargs.setdefault('default', _default)
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if ORJSON_AVAILABLE and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if not ORJSON_AVAILABLE or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=SORTED_OPTIONS) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def _encoded_tags(value: Any) -> bytes:
+    # Tags are normalized JSON arrays on write; anything else is legacy data
+    if value and value.startswith('['):
+        return value.encode('utf-8')
+    try:
+        tags = json.loads(value) if value else []
+    except ValueError:
+        tags = []
+    return dumps(tags if isinstance(tags, list) else [])
+
+
+def encode_note_rows(rows: Sequence[Sequence[Any]], fields: List[str]) -> bytes:
+    """JSON array of projected note rows (selected via NOTE_FIELDS), shaped like note_row_to_dict()"""
+    return b'[' + _encode_note_items(rows, fields) + b']'
+
+
+def _encode_note_items(rows: Sequence[Sequence[Any]], fields: List[str]) -> bytes:
+    """The comma-separated JSON objects of encode_note_rows(), without the brackets"""
+    if 'tags' not in fields:
+        return dumps([dict(zip(fields, row)) for row in rows])[1:-1]
+
+    tags_at = fields.index('tags')
+    others = [(index, name) for index, name in enumerate(fields) if name != 'tags']
+    prefix = b',"tags":' if others else b'"tags":'
+    parts = []
+    for row in rows:
+        head = dumps({name: row[index] for index, name in others})
+        parts.append(head[:-1] + prefix + _encoded_tags(row[tags_at]) + b'}')
+    return b','.join(parts)
+
+
+def stream_note_rows(session_factory, statement, fields: List[str],
+                     batch_size: int = STREAM_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Yield the JSON array of encode_note_rows() for statement's rows one batch
+    at a time; the session is held only while the generator runs.
+    """
+    db = session_factory()
+    try:
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        yield b'['
+        separator = b''
+        for partition in result.partitions():
+            yield separator + _encode_note_items(partition, fields)
+            separator = b','
+        yield b']'
+    finally:
+        db.close()
@@ -0,0 +1,217 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+
+# Opt-in slow-query log.
+#
+# Statements slower than the threshold are recorded with their parameters
+# redacted to type names, the route that ran them and the query plan: the
+# statement is re-run under EXPLAIN (Postgres) or EXPLAIN QUERY PLAN (SQLite)
+# on the same connection, once per distinct statement (plans are cached), so a
+# hot slow query does not pay for EXPLAIN on every execution. Plans containing
+# a sequential scan of a table are flagged with fullScan.
+#
+# Records are appended as JSON lines to a rotating file and the most recent
+# ones are served by GET /debug/slow-queries.
+#
+# Environment variables:
+#   SLOW_QUERY_LOG_ENABLED     set to true to turn the log on (default false)
+#   SLOW_QUERY_THRESHOLD_MS    statements at least this slow are logged (default 100)
+#   SLOW_QUERY_LOG_FILE        JSON-lines file, rotated by size; empty keeps records
+#                              in memory only, as on read-only filesystems (default slow_queries.log)
+#   SLOW_QUERY_LOG_MAX_BYTES   size at which the file is rotated (default 5 MB)
+#   SLOW_QUERY_LOG_BACKUPS     rotated files kept (default 3)
+#   SLOW_QUERY_EXPLAIN         set to false to skip capturing plans (default true)
+
+SLOW_QUERY_LOG_ENABLED = os.getenv('SLOW_QUERY_LOG_ENABLED', 'false').lower() == 'true'
+
+RECENT_RECORDS = 100
+PLAN_CACHE_SIZE = 256
+MAX_STATEMENT_LENGTH = 4000
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')
+TABLE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)\b(?! USING| VIRTUAL)')
+SUBQUERY = re.compile(r'^(?:MATERIALIZE|CO-ROUTINE) (\w+)')
+
+
+def redact(parameters: Any) -> Any:
+    """Parameter type names in place of values"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def has_full_scan(plan: List[str]) -> bool:
+    """Whether a plan reads a whole table (Postgres Seq Scan, SQLite SCAN without an index)"""
+    # SQLite also says SCAN for walking a materialized CTE or subquery; those are not tables
+    subqueries = {match.group(1) for match in map(SUBQUERY.match, plan) if match}
+    for line in plan:
+        if 'Seq Scan' in line:
+            return True
+        match = TABLE_SCAN.match(line)
+        if match and match.group(1) not in subqueries:
+            return True
+    return False
+
+
+def explain(cursor, dialect_name: str, statement: str, parameters: Any) -> List[str]:
+    """Plan lines for statement, run on a fresh DBAPI cursor of the same connection"""
+    connection = cursor.connection
+    if dialect_name == 'sqlite':
+        explain_cursor = connection.cursor()
+        try:
+            explain_cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+            return [row[-1] for row in explain_cursor.fetchall()]
+        finally:
+            explain_cursor.close()
+    if dialect_name == 'postgresql':
+        # A failed EXPLAIN would abort the caller's transaction; isolate it
+        explain_cursor = connection.cursor()
+        try:
+            explain_cursor.execute('SAVEPOINT slow_query_explain')
+            try:
+                explain_cursor.execute(f'EXPLAIN {statement}', parameters)
+                plan = [row[0] for row in explain_cursor.fetchall()]
+            except Exception:
+                explain_cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+                raise
+            explain_cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+            return plan
+        finally:
+            explain_cursor.close()
+    raise ValueError(f'EXPLAIN is not supported for {dialect_name}')
+
+
+def _current_route() -> Optional[str]:
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return None
+    if not has_request_context():
+        return None
+    rule = request.url_rule.rule if request.url_rule is not None else request.path
+    return f'{request.method} {rule}'
+
+
+class SlowQueryLog:
+    """Records statements slower than a threshold, with their plans"""
+
+    def __init__(self, threshold_ms: float = 100, log_file: Optional[str] = None,
+                 max_bytes: int = 5 * 1024 * 1024, backups: int = 3, capture_plans: bool = True):
+        self.threshold_seconds = threshold_ms / 1000
+        self.capture_plans = capture_plans
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=RECENT_RECORDS)
+        self._plans: OrderedDict = OrderedDict()
+        self.logger = logging.getLogger(f'notes.slow_queries.{id(self)}')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        if log_file:
+            try:
+                handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backups)
+            except OSError as e:
+                print(f"⚠️  Slow-query log file unavailable, keeping records in memory: {e}")
+            else:
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                self.logger.addHandler(handler)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            threshold_ms=float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 100)),
+            log_file=os.getenv('SLOW_QUERY_LOG_FILE', 'slow_queries.log'),
+            max_bytes=int(os.getenv('SLOW_QUERY_LOG_MAX_BYTES', 5 * 1024 * 1024)),
+            backups=int(os.getenv('SLOW_QUERY_LOG_BACKUPS', 3)),
+            capture_plans=os.getenv('SLOW_QUERY_EXPLAIN', 'true').lower() != 'false',
+        )
+
+    def install(self, engine) -> None:
+        event.listen(engine, 'before_cursor_execute', self._before)
+        event.listen(engine, 'after_cursor_execute', self._after)
+        event.listen(engine, 'handle_error', self._failed)
+
+    def uninstall(self, engine) -> None:
+        event.remove(engine, 'before_cursor_execute', self._before)
+        event.remove(engine, 'after_cursor_execute', self._after)
+        event.remove(engine, 'handle_error', self._failed)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_started', []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['slow_query_started'].pop()
+        elapsed = time.perf_counter() - started
+        if elapsed >= self.threshold_seconds:
+            self.record(cursor, conn.dialect.name, statement, parameters, executemany, elapsed)
+
+    def _failed(self, context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None and context.connection.info.get('slow_query_started'):
+            context.connection.info['slow_query_started'].pop()
+
+    def record(self, cursor, dialect_name: str, statement: str, parameters: Any,
+               executemany: bool, seconds: float) -> Dict[str, Any]:
+        text = ' '.join(statement.split())
+        entry: Dict[str, Any] = {
+            'time': datetime.utcnow().isoformat(),
+            'durationMs': round(seconds * 1000, 2),
+            'route': _current_route(),
+            'statement': text[:MAX_STATEMENT_LENGTH],
+            'parameters': redact(parameters[0] if executemany and parameters else parameters),
+        }
+        if executemany:
+            entry['executemany'] = len(parameters)
+        if self.capture_plans and text.split(' ', 1)[0].upper() in EXPLAINABLE:
+            plan = self._plan(cursor, dialect_name, statement, parameters[0] if executemany else parameters)
+            entry.update(plan)
+
+        with self._lock:
+            self._recent.append(entry)
+        self.logger.info(json.dumps(entry, default=str))
+        return entry
+
+    def _plan(self, cursor, dialect_name: str, statement: str, parameters: Any) -> Dict[str, Any]:
+        with self._lock:
+            cached = self._plans.get(statement)
+            if cached is not None:
+                self._plans.move_to_end(statement)
+                return cached
+        try:
+            lines = explain(cursor, dialect_name, statement, parameters)
+            plan = {'plan': lines, 'fullScan': has_full_scan(lines)}
+        except Exception as e:
+            plan = {'planError': str(e).splitlines()[0] if str(e) else type(e).__name__}
+        with self._lock:
+            self._plans[statement] = plan
+            if len(self._plans) > PLAN_CACHE_SIZE:
+                self._plans.popitem(last=False)
+        return plan
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Most recent records, newest first"""
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._plans.clear()
+
+
+slow_query_log = SlowQueryLog.from_env() if SLOW_QUERY_LOG_ENABLED else None
+
+
+def instrument_slow_queries(engine) -> None:
+    """Install the slow-query log on the engine when SLOW_QUERY_LOG_ENABLED is set"""
+    if slow_query_log is not None:
+        slow_query_log.install(engine)
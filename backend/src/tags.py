@@ -0,0 +1,150 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, exists, false, func, insert, select
+
+# Normalized tag index: a tags table (unique names) and a note_tags link table
+# keyed by (note_id, tag_id) with a (tag_id, note_id) index.
+#
+# notes.tags keeps the JSON array the API returns, so serializing a note needs
+# no join; note_tags is what tag filters and tag counts query. Writes keep the
+# two in step: ORM flushes through an after_flush hook (models.py), bulk
+# inserts by re-syncing the rows they added.
+
+MAX_TAG_LENGTH = 100
+
+# Notes re-synced per round trip by rebuild_note_tags()
+REBUILD_BATCH_SIZE = 1000
+
+# Tags on at most this many notes are selective enough to drive a filtered
+# listing from note_tags; roughly sqrt(page size × notes) for 100k notes
+SELECTIVE_TAG_LINKS = 2000
+
+
+def normalize_tags(tags: Optional[Iterable[Any]]) -> List[str]:
+    """Trimmed, non-empty, de-duplicated tag names in their original order"""
+    names: List[str] = []
+    for tag in tags or []:
+        if not isinstance(tag, str):
+            continue
+        name = tag.strip()[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def parse_tags(value: Optional[str]) -> List[str]:
+    """Tag names from a notes.tags JSON string (tolerates bad legacy values)"""
+    try:
+        return normalize_tags(json.loads(value)) if value else []
+    except (TypeError, ValueError):
+        return []
+
+
+def _insert_ignoring_duplicates(conn, table, rows: List[Dict[str, Any]]):
+    dialect = conn.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        conn.execute(insert(table), rows)
+        return
+    conn.execute(dialect_insert(table).on_conflict_do_nothing(), rows)
+
+
+def sync_note_tags(conn, tag_table, link_table, note_tags: Dict[int, List[str]]):
+    """Replace the tag links of the given notes ({note_id: [names]})"""
+    if not note_tags:
+        return
+    conn.execute(delete(link_table).where(link_table.c.note_id.in_(list(note_tags))))
+
+    names = {name for tag_names in note_tags.values() for name in tag_names}
+    if not names:
+        return
+    tag_ids = dict(conn.execute(select(tag_table.c.name, tag_table.c.id).where(tag_table.c.name.in_(names))).all())
+    missing = names - tag_ids.keys()
+    if missing:
+        # Another writer may add the same tag concurrently; the unique name wins
+        _insert_ignoring_duplicates(conn, tag_table, [{'name': name} for name in sorted(missing)])
+        tag_ids.update(conn.execute(
+            select(tag_table.c.name, tag_table.c.id).where(tag_table.c.name.in_(missing))
+        ).all())
+
+    links = [
+        {'note_id': note_id, 'tag_id': tag_ids[name]}
+        for note_id, tag_names in note_tags.items()
+        for name in tag_names
+    ]
+    conn.execute(insert(link_table), links)
+
+
+def rebuild_note_tags(conn, note_table, tag_table, link_table, where=None,
+                      batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """Re-sync links from notes.tags for the notes matching where (all by default)"""
+    query = select(note_table.c.id, note_table.c.tags).order_by(note_table.c.id)
+    if where is not None:
+        query = query.where(where)
+
+    synced = 0
+    last_id = None
+    while True:
+        # Keyset batches: the statement finishes before its links are written
+        page = query if last_id is None else query.where(note_table.c.id > last_id)
+        rows = conn.execute(page.limit(batch_size)).all()
+        if not rows:
+            return synced
+        sync_note_tags(conn, tag_table, link_table, {row.id: parse_tags(row.tags) for row in rows})
+        synced += len(rows)
+        last_id = rows[-1].id
+
+
+def needs_tag_backfill(conn, note_table, link_table) -> bool:
+    """True when notes carry tags but note_tags is empty (a database from before the tag index)"""
+    if conn.execute(select(link_table.c.note_id).limit(1)).first() is not None:
+        return False
+    tagged = note_table.c.tags.isnot(None) & (note_table.c.tags != '') & (note_table.c.tags != '[]')
+    return conn.execute(select(note_table.c.id).where(tagged).limit(1)).first() is not None
+
+
+def tag_filters(db, note_id_column, tag_table, link_table, names: List[str],
+                selective_links: int = SELECTIVE_TAG_LINKS) -> list:
+    """
+    WHERE clauses matching notes that carry every one of names.
+
+    The rarest tag drives the query (IN over its note ids) when at most
+    selective_links notes carry it; other tags become correlated EXISTS probes
+    on the (note_id, tag_id) key, which let an ordered, limited listing stop
+    after one page even for tags on most notes.
+    """
+    tag_ids = dict(db.execute(select(tag_table.c.name, tag_table.c.id).where(tag_table.c.name.in_(names))).all())
+    if len(tag_ids) < len(names):
+        return [false()]
+
+    def bounded_count(tag_id):
+        links = select(link_table.c.note_id).where(link_table.c.tag_id == tag_id).limit(selective_links + 1)
+        return db.execute(select(func.count()).select_from(links.subquery())).scalar()
+
+    counts = {name: bounded_count(tag_ids[name]) for name in names}
+    rarest = min(names, key=counts.get)
+
+    clauses = []
+    for name in names:
+        tag_id = tag_ids[name]
+        if name == rarest and counts[name] <= selective_links:
+            clauses.append(note_id_column.in_(select(link_table.c.note_id).where(link_table.c.tag_id == tag_id)))
+        else:
+            clauses.append(exists().where(link_table.c.note_id == note_id_column, link_table.c.tag_id == tag_id))
+    return clauses
+
+
+def tag_counts(db, tag_table, link_table) -> List[Dict[str, Any]]:
+    """[{name, count}] for every tag in use, most used first"""
+    count = func.count(link_table.c.note_id)
+    rows = db.execute(
+        select(tag_table.c.name, count)
+        .join(link_table, link_table.c.tag_id == tag_table.c.id)
+        .group_by(tag_table.c.id, tag_table.c.name)
+        .order_by(count.desc(), tag_table.c.name)
+    ).all()
+    return [{'name': name, 'count': total} for name, total in rows]
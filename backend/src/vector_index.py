@@ -0,0 +1,218 @@
+import heapq
+import threading
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from src.embeddings import decode_vector, drop_other_models, embed_missing, get_embedder
+from src.sync import current_seq
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Semantic search over note embeddings (see src/embeddings.py).
+#
+# VectorIndex keeps every note's vector in one float32 matrix in memory. It is
+# loaded on the first query and then kept current from the changes feed: each
+# query compares the latest change sequence with the one the index was built
+# at and applies only the notes changed since (re-reading their vectors, or
+# clearing the rows of deleted notes), so other processes' writes show up too.
+# Queries are one matrix-vector product per block of rows with a partial sort
+# for the top k, which keeps 100k notes well under 50 ms.
+#
+# Without NumPy, search_without_index() scores the stored vectors row by row;
+# fine for a few thousand notes.
+
+SCAN_BLOCK_ROWS = 65536
+# Rebuild from scratch instead of patching when this share of the notes changed
+FULL_RELOAD_FRACTION = 0.25
+
+
+class VectorIndex:
+    """In-memory matrix of note embeddings with cosine top-k queries"""
+
+    def __init__(self, session_factory, note_table, embedding_table, change_table):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError('VectorIndex requires numpy')
+        self.session_factory = session_factory
+        self.note_table = note_table
+        self.embedding_table = embedding_table
+        self.change_table = change_table
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything; the next query reloads"""
+        self._seq: Optional[int] = None
+        self._model_id: Optional[str] = None
+        self._matrix = None      # (capacity, dimensions) float32
+        self._ids = None         # (capacity,) int64 note ids, -1 for free rows
+        self._size = 0           # rows in use at the front of the matrix
+        self._rows = {}          # note id -> row
+        self._free: List[int] = []
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def nbytes(self) -> int:
+        return self._matrix.nbytes if self._matrix is not None else 0
+
+    def refresh(self):
+        """Bring the index up to date with the database"""
+        embedder = get_embedder()
+        with self._lock:
+            with self.session_factory() as db:
+                seq = current_seq(db, self.change_table)
+            if self._seq is None or self._model_id != embedder.model_id:
+                self._load_all(embedder, seq)
+            elif seq != self._seq:
+                self._apply_changes(embedder, seq)
+
+    def _embed_missing(self, embedder, note_ids=None):
+        embed_pending(self.session_factory, self.note_table, self.embedding_table, embedder, note_ids)
+
+    def _load_all(self, embedder, seq):
+        with self.session_factory() as db, db.begin():
+            drop_other_models(db.connection(), self.embedding_table, embedder.model_id)
+        self._embed_missing(embedder)
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(self.embedding_table.c.note_id, self.embedding_table.c.vector)
+                .where(self.embedding_table.c.model == embedder.model_id)
+                .order_by(self.embedding_table.c.note_id)
+            ).all()
+        self.reset()
+        if rows:
+            # One buffer for all blobs: no per-row arrays
+            matrix = np.frombuffer(b''.join(row.vector for row in rows), dtype='<f4')
+            self._matrix = matrix.reshape(len(rows), -1).astype(np.float32)
+            self._ids = np.fromiter((row.note_id for row in rows), dtype=np.int64, count=len(rows))
+            self._size = len(rows)
+            self._rows = {int(note_id): row for row, note_id in enumerate(self._ids)}
+        self._seq = seq
+        self._model_id = embedder.model_id
+
+    def _apply_changes(self, embedder, seq):
+        with self.session_factory() as db:
+            changes = db.execute(
+                select(self.change_table.c.note_id, self.change_table.c.deleted)
+                .where(self.change_table.c.seq > self._seq)
+            ).all()
+            total = db.execute(select(func.count()).select_from(self.note_table)).scalar()
+        if len(changes) > max(total, 1) * FULL_RELOAD_FRACTION:
+            return self._load_all(embedder, seq)
+
+        changed = [change.note_id for change in changes if not change.deleted]
+        for change in changes:
+            if change.deleted:
+                self._remove(change.note_id)
+        if changed:
+            # Vectors of non-inline providers were dropped on write; embed them now
+            self._embed_missing(embedder, note_ids=changed)
+            with self.session_factory() as db:
+                rows = db.execute(
+                    select(self.embedding_table.c.note_id, self.embedding_table.c.vector)
+                    .where(self.embedding_table.c.note_id.in_(changed),
+                           self.embedding_table.c.model == embedder.model_id)
+                ).all()
+            for row in rows:
+                self._put(row.note_id, np.frombuffer(row.vector, dtype='<f4'))
+        self._seq = seq
+
+    def _put(self, note_id: int, vector):
+        row = self._rows.get(note_id)
+        if row is None:
+            if self._matrix is None:
+                self._matrix = np.zeros((16, len(vector)), dtype=np.float32)
+                self._ids = np.full(16, -1, dtype=np.int64)
+            if self._free:
+                row = self._free.pop()
+            else:
+                if self._size == len(self._matrix):
+                    # Grow geometrically so appends stay amortized O(1)
+                    capacity = len(self._matrix) * 2
+                    self._matrix = np.resize(self._matrix, (capacity, self._matrix.shape[1]))
+                    self._matrix[self._size:] = 0
+                    self._ids = np.concatenate([self._ids, np.full(capacity - len(self._ids), -1, dtype=np.int64)])
+                row = self._size
+                self._size += 1
+            self._rows[note_id] = row
+            self._ids[row] = note_id
+        self._matrix[row] = vector
+
+    def _remove(self, note_id: int):
+        row = self._rows.pop(note_id, None)
+        if row is not None:
+            self._matrix[row] = 0
+            self._ids[row] = -1
+            self._free.append(row)
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """(note id, cosine similarity) of the notes closest to query, best first"""
+        self.refresh()
+        embedder = get_embedder()
+        vector = np.asarray(embedder.embed([query])[0], dtype=np.float32)
+        with self._lock:
+            matrix, ids, size = self._matrix, self._ids, self._size
+            if size == 0 or not vector.any():
+                return []
+            best_scores, best_rows = [], []
+            for start in range(0, size, SCAN_BLOCK_ROWS):
+                scores = matrix[start:start + SCAN_BLOCK_ROWS][:size - start] @ vector
+                k = min(limit, len(scores))
+                top = np.argpartition(scores, len(scores) - k)[len(scores) - k:]
+                # Keep every row tying with the k-th best, so ties are broken by id below
+                top = np.flatnonzero(scores >= scores[top].min())
+                best_scores.append(scores[top])
+                best_rows.append(top + start)
+            scores = np.concatenate(best_scores)
+            rows = np.concatenate(best_rows)
+            # Best score first, equal scores by note id (as search_without_index ranks them)
+            order = np.lexsort((ids[rows], -scores))
+            results = []
+            for index in order:
+                note_id, score = int(ids[rows[index]]), float(scores[index])
+                if note_id < 0:
+                    continue
+                if score <= min_score or len(results) == limit:
+                    break
+                results.append((note_id, round(score, 4)))
+            return results
+
+
+def embed_pending(session_factory, note_table, embedding_table, embedder=None, note_ids=None) -> int:
+    """Embed notes without a vector in short transactions of one batch each"""
+    embedder = embedder or get_embedder()
+    after_id, total = 0, 0
+    while True:
+        with session_factory() as db, db.begin():
+            embedded = embed_missing(db.connection(), note_table, embedding_table,
+                                     embedder, note_ids=note_ids, after_id=after_id)
+        if not embedded:
+            return total
+        after_id, total = embedded[-1], total + len(embedded)
+
+
+def search_without_index(db, embedding_table, query: str, limit: int = 10,
+                         min_score: float = 0.0) -> List[Tuple[int, float]]:
+    """Score every stored vector in Python; the fallback when NumPy is missing"""
+    embedder = get_embedder()
+    vector = embedder.embed([query])[0]
+    if not any(vector):
+        return []
+    rows = db.execute(
+        select(embedding_table.c.note_id, embedding_table.c.vector)
+        .where(embedding_table.c.model == embedder.model_id)
+    )
+    scored = (
+        (sum(a * b for a, b in zip(decode_vector(row.vector), vector)), row.note_id)
+        for row in rows
+    )
+    # Best score first, equal scores by note id (as VectorIndex.search ranks them)
+    best = heapq.nlargest(limit, scored, key=lambda item: (item[0], -item[1]))
+    return [(note_id, round(score, 4)) for score, note_id in best if score > min_score]
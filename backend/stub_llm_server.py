@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the GitHub Models chat completions endpoint.
+Lets the app, tests and benchmarks exercise the LLM code paths offline.
+
+Usage:
+    python stub_llm_server.py --port 8089 --latency-ms 50
+    LLM_ENDPOINT=http://127.0.0.1:8089 GITHUB_TOKEN=stub python app.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    # socketserver's default backlog of 5 drops connections when many calls arrive at once
+    request_queue_size = 1024
+
+
+class StubLLMServer:
+    """
+    Threaded HTTP/1.1 server answering POST /chat/completions.
+
+    latency_ms      simulated model latency per request (time to first token)
+    token_latency_ms  delay between streamed chunks when the request has stream=true
+    chunk_size      characters per streamed chunk
+    fail_with_429   number of upcoming requests to reject with 429 + Retry-After
+    reply           callable(messages) -> completion text; defaults to a JSON
+                    note echoing the last user message
+    """
+
+    def __init__(self, port=0, latency_ms=0, reply=None, retry_after='0', token_latency_ms=0, chunk_size=8):
+        self.latency_ms = latency_ms
+        self.token_latency_ms = token_latency_ms
+        self.chunk_size = chunk_size
+        self.reply = reply or self.default_reply
+        self.retry_after = retry_after
+        self.fail_with_429 = 0
+        self.requests = 0
+        self.connections = set()
+        self._lock = threading.Lock()
+        self.httpd = _StubHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @staticmethod
+    def default_reply(messages):
+        user = messages[-1]['content'] if messages else ''
+        return json.dumps({
+            'title': 'Stub Note',
+            'content': user,
+            'tags': ['stub'],
+            'event_date': None,
+            'event_time': None,
+        })
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _write_chunk(self, data):
+                self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+                self.wfile.flush()
+
+            def _send_stream(self, request, content):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for start in range(0, len(content), stub.chunk_size):
+                    if start and stub.token_latency_ms:
+                        time.sleep(stub.token_latency_ms / 1000)
+                    event = {
+                        'id': f'stub-{stub.requests}',
+                        'object': 'chat.completion.chunk',
+                        'created': int(time.time()),
+                        'model': request.get('model', 'stub'),
+                        'choices': [{
+                            'index': 0,
+                            'finish_reason': None,
+                            'delta': {'content': content[start:start + stub.chunk_size]},
+                        }],
+                    }
+                    self._write_chunk(f'data: {json.dumps(event)}\n\n'.encode())
+                self._write_chunk(b'data: [DONE]\n\n')
+                self.wfile.write(b'0\r\n\r\n')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                with stub._lock:
+                    stub.requests += 1
+                    stub.connections.add(self.client_address)
+                    rate_limited = stub.fail_with_429 > 0
+                    if rate_limited:
+                        stub.fail_with_429 -= 1
+
+                if rate_limited:
+                    self._send_json(429, {'error': {'message': 'rate limited'}}, {'Retry-After': stub.retry_after})
+                    return
+
+                if stub.latency_ms:
+                    time.sleep(stub.latency_ms / 1000)
+
+                content = stub.reply(request.get('messages', []))
+                if request.get('stream'):
+                    self._send_stream(request, content)
+                    return
+                if stub.token_latency_ms:
+                    # A blocking completion still waits for every token to be generated
+                    chunks = max(1, -(-len(content) // stub.chunk_size))
+                    time.sleep(stub.token_latency_ms * (chunks - 1) / 1000)
+                self._send_json(200, {
+                    'id': f'stub-{stub.requests}',
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': request.get('model', 'stub'),
+                    'choices': [{
+                        'index': 0,
+                        'finish_reason': 'stop',
+                        'message': {'role': 'assistant', 'content': content},
+                    }],
+                    'usage': {
+                        'prompt_tokens': sum(len(m.get('content', '').split()) for m in request.get('messages', [])),
+                        'completion_tokens': len(content.split()),
+                        'total_tokens': 0,
+                    },
+                })
+
+        return Handler
+
+
+def parse_sse(body):
+    """[(event, data)] of a Server-Sent Events body (bytes or str), comments skipped"""
+    if isinstance(body, bytes):
+        body = body.decode()
+    events = []
+    for block in body.split('\n\n'):
+        lines = [line for line in block.split('\n') if line and not line.startswith(':')]
+        if lines:
+            events.append((lines[0][len('event: '):], json.loads(lines[1][len('data: '):])))
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-ms', type=int, default=0)
+    parser.add_argument('--token-latency-ms', type=int, default=0)
+    args = parser.parse_args()
+
+    server = StubLLMServer(port=args.port, latency_ms=args.latency_ms, token_latency_ms=args.token_latency_ms)
+    print(f"🤖 Stub LLM server listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
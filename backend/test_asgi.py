@@ -0,0 +1,221 @@
+import pytest
+import asyncio
+import json
+import time
+import httpx
+from sqlalchemy import literal, select
+from asgi import app, database
+from models import SessionLocal, get_engine
+from src import llm
+from src.async_db import AsyncDatabase, async_database_url
+from src.llm import AsyncLLMClient, close_async_llm_client
+from stub_llm_server import parse_sse
+
+@pytest.fixture
+def stub_options():
+    return {'latency_ms': 300}
+
+def run(scenario):
+    """Run scenario(client) against the ASGI app on a fresh event loop"""
+    async def main():
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+                return await scenario(client)
+        finally:
+            # Pooled connections and the model client belong to this loop
+            await close_async_llm_client()
+            await database.dispose()
+    return asyncio.run(main())
+
+def test_model_calls_run_concurrently(stub):
+    """Test that concurrent translations wait on the model together, not one after another"""
+    async def scenario(client):
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post('/translate', json={'content': f'Hello {i}', 'targetLang': 'es'}) for i in range(10)
+        ])
+        return responses, time.perf_counter() - started
+
+    responses, elapsed = run(scenario)
+    assert [response.status_code for response in responses] == [200] * 10
+    assert responses[3].json()['content'].endswith('Content: Hello 3')
+    # Ten sequential 300 ms calls would take 3 s
+    assert elapsed < 1.5
+    assert stub.requests == 10
+
+def test_generated_note_is_saved(stub):
+    """Test that /generate-note saves through the async session and the note is served by the Flask routes"""
+    async def scenario(client):
+        created = await client.post('/generate-note', json={'input': 'Lunch with Ana'})
+        fetched = await client.get(f"/notes/{created.json()['id']}")
+        return created, fetched
+
+    created, fetched = run(scenario)
+    assert created.status_code == 201
+    note = created.json()
+    assert note['title'] == 'Stub Note' and note['tags'] == ['stub']
+    assert fetched.status_code == 200 and fetched.json()['id'] == note['id']
+    assert 'server-timing' in created.headers
+
+def test_note_translation_stream(stub):
+    """Test the SSE variant for a stored note, the 404 and the request validation"""
+    async def scenario(client):
+        note = (await client.post('/notes', json={'title': 'Stream me', 'content': 'Hello'})).json()
+        streamed = await client.post(f"/notes/{note['id']}/translate/stream", json={'targetLang': 'es'})
+        missing = await client.post('/notes/999999999/translate', json={'targetLang': 'es'})
+        invalid = await client.post('/translate', content=b'not json')
+        return note, streamed, missing, invalid
+
+    note, streamed, missing, invalid = run(scenario)
+    assert streamed.headers['content-type'] == 'text/event-stream'
+    events = parse_sse(streamed.text)
+    assert events[0] == ('title', {'title': 'Stub Note'})
+    event, done = events[-1]
+    assert event == 'done' and done['originalId'] == note['id']
+    assert missing.status_code == 404
+    assert invalid.status_code == 400
+
+def test_other_routes_go_through_flask(stub):
+    """Test that list, import (a streamed request body) and CORS work through the WSGI bridge"""
+    async def scenario(client):
+        async def body():
+            for i in range(3):
+                yield json.dumps({'title': f'bridged {i}', 'content': 'x'}).encode() + b'\n'
+        imported = await client.post('/notes/import', content=body(), headers={'Content-Type': 'application/x-ndjson'})
+        listed = await client.get('/notes?limit=2', headers={'Origin': 'http://localhost:3000'})
+        translated = await client.post('/translate', json={'content': 'Hi', 'targetLang': 'es'},
+                                       headers={'Origin': 'http://localhost:3000'})
+        return imported, listed, translated
+
+    imported, listed, translated = run(scenario)
+    assert imported.status_code == 200 and imported.json()['imported'] == 3
+    assert listed.status_code == 200 and len(listed.json()) == 2
+    assert listed.headers['access-control-allow-origin'] == 'http://localhost:3000'
+    assert translated.headers['access-control-allow-origin'] == 'http://localhost:3000'
+
+def chunked(data, size=1000):
+    """Request body sent as several ASGI messages"""
+    async def body():
+        for start in range(0, len(data), size):
+            yield data[start:start + size]
+    return body()
+
+def test_bodies_larger_than_one_message(stub):
+    """Test that a JSON body split over many ASGI messages reaches both the async and the Flask routes whole"""
+    content = 'long text ' * 2000
+    async def scenario(client):
+        payload = json.dumps({'title': 'Chunked', 'content': content}).encode()
+        created = await client.post('/notes', content=chunked(payload), headers={'Content-Type': 'application/json'})
+        payload = json.dumps({'content': content, 'targetLang': 'es'}).encode()
+        translated = await client.post('/translate', content=chunked(payload))
+        return created, translated
+
+    created, translated = run(scenario)
+    assert created.status_code == 201 and created.json()['content'] == content
+    assert translated.status_code == 200 and translated.json()['content'].endswith(content)
+
+@pytest.mark.parametrize('origin', [
+    'http://localhost:3000', 'http://localhost:3001', 'https://notes.vercel.app',
+    'https://note-taking-app-preview.vercel.app', 'https://example.com',
+])
+def test_cors_matches_flask(stub, origin):
+    """Test that the async routes allow exactly the origins flask-cors allows on the Flask routes"""
+    async def scenario(client):
+        headers = {'Origin': origin}
+        flask = await client.get('/notes?limit=1', headers=headers)
+        asynchronous = await client.post('/translate', json={'content': 'Hi', 'targetLang': 'es'}, headers=headers)
+        preflight = await client.options('/translate', headers={**headers, 'Access-Control-Request-Method': 'POST'})
+        return flask, asynchronous, preflight
+
+    flask, asynchronous, preflight = run(scenario)
+    cors = ('access-control-allow-origin', 'access-control-expose-headers')
+    assert [asynchronous.headers.get(name) for name in cors] == [flask.headers.get(name) for name in cors]
+    assert preflight.headers.get('access-control-allow-origin') == flask.headers.get('access-control-allow-origin')
+
+def call_until_disconnect(path, body, chunks_before_disconnect):
+    """
+    Drive the ASGI app with a client that goes away after receiving the given
+    number of body chunks; returns the messages sent and the seconds the app took
+    """
+    async def main():
+        messages, gone, requested = [], asyncio.Event(), []
+
+        async def receive():
+            if not requested:
+                requested.append(True)
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+            await gone.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            messages.append(message)
+            if sum(message['type'] == 'http.response.body' for message in messages) >= chunks_before_disconnect:
+                gone.set()
+
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'scheme': 'http',
+            'method': 'POST' if body else 'GET', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+            'root_path': '', 'headers': [(b'content-type', b'application/json')],
+            'server': ('test', 80), 'client': ('127.0.0.1', 50000),
+        }
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(app(scope, receive, send), 10)
+            return messages, time.perf_counter() - started
+        finally:
+            await close_async_llm_client()
+            await database.dispose()
+    return asyncio.run(main())
+
+def test_disconnect_stops_async_stream(stub):
+    """Test that a client leaving an SSE stream ends the handler instead of waiting out the model"""
+    stub.token_latency_ms = 100
+    body = json.dumps({'content': 'x' * 200, 'targetLang': 'es'}).encode()
+    messages, elapsed = call_until_disconnect('/translate/stream', body, chunks_before_disconnect=1)
+    assert messages[0]['status'] == 200
+    assert not any(b'event: done' in message.get('body', b'') for message in messages)
+    # The full reply streams in about 30 chunks 100 ms apart
+    assert elapsed < 1.5
+
+def test_disconnect_releases_flask_stream():
+    """Test that a client leaving a streamed Flask response still closes it and returns its connection"""
+    messages, _ = call_until_disconnect('/notes', b'', chunks_before_disconnect=1)
+    assert messages[0]['status'] == 200
+    assert get_engine().pool.checkedout() == 0
+
+def test_thread_fallback(monkeypatch):
+    """Test that sessions run in worker threads when no async driver is used"""
+    monkeypatch.setenv('ASYNC_DB_DRIVER', 'thread')
+    fallback = AsyncDatabase(get_engine(), SessionLocal)
+    assert fallback.driver == 'thread'
+    assert asyncio.run(fallback.run(lambda db, value: db.execute(select(literal(value))).scalar(), 7)) == 7
+
+def test_async_database_url():
+    """Test the async driver chosen for each database URL"""
+    assert async_database_url('sqlite://') is None
+    assert async_database_url('sqlite:///:memory:') is None
+    assert async_database_url('mysql://user@host/db') is None
+    pytest.importorskip('aiosqlite')
+    assert async_database_url('sqlite:///notes.db') == 'sqlite+aiosqlite:///notes.db'
+
+def test_async_client_honors_retry_after(stub, monkeypatch):
+    """Test that the async client retries a 429 after Retry-After like the sync one"""
+    sleeps = []
+
+    async def record(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(llm, '_async_sleep', record)
+    stub.fail_with_429 = 2
+    stub.retry_after = '3'
+
+    async def call():
+        client = AsyncLLMClient()
+        try:
+            return await client.call_llm_model([{'role': 'user', 'content': 'hi'}], max_retries=3)
+        finally:
+            await client.aclose()
+
+    response = asyncio.run(call())
+    assert response.error is None
+    assert sleeps == [3.0, 3.0]
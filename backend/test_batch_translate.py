@@ -0,0 +1,81 @@
+import pytest
+import json
+from app import app
+from src.batch_translate import plan_work
+from stub_llm_server import parse_sse
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def fake_translation(messages):
+    """Upper-case translation; answers packed prompts with an items array"""
+    user = messages[-1]['content']
+    if user.startswith('['):
+        notes = json.loads(user)
+        return json.dumps({'items': [
+            {'id': note['id'], 'title': note['title'].upper(), 'content': note['content'].upper()}
+            for note in notes
+        ]})
+    content = user.split('\nContent: ', 1)[1]
+    return json.dumps({'title': 'SINGLE', 'content': content.upper()})
+
+@pytest.fixture
+def stub_options():
+    return {'reply': fake_translation}
+
+def item(note_id, text, lang='es'):
+    return {'id': note_id, 'title': f'Note {note_id}', 'text': text, 'targetLang': lang}
+
+def test_plan_packs_short_notes_per_language():
+    """Test that short notes share prompts per language and long ones go alone"""
+    items = [item(1, 'short'), item(2, 'short'), item(3, 'x' * 4000), item(1, 'short', 'fr')]
+    units = plan_work(items, budget=200, max_items=10)
+    kinds = sorted((kind, tuple(i['id'] for i in unit), unit[0]['targetLang']) for kind, unit in units)
+    assert kinds == [('pack', (1,), 'fr'), ('pack', (1, 2), 'es'), ('single', (3,), 'es')]
+
+def test_plan_respects_budget_and_item_cap():
+    """Test that packs are split on token budget and item count"""
+    items = [item(i, 'y' * 100) for i in range(7)]
+    units = plan_work(items, budget=100, max_items=3)
+    assert [len(unit) for _, unit in units] == [2, 2, 2, 1]
+    units = plan_work(items, budget=10000, max_items=3)
+    assert [len(unit) for _, unit in units] == [3, 3, 1]
+
+def test_translate_batch_endpoint(client, stub):
+    """Test per-item results, packing into fewer model calls and missing notes"""
+    ids = []
+    for i in range(3):
+        response = client.post('/notes',
+                              data=json.dumps({'title': f'batch {i}', 'content': f'hello {i}', 'tags': []}),
+                              content_type='application/json')
+        ids.append(json.loads(response.data)['id'])
+
+    response = client.post('/notes/translate-batch',
+                          data=json.dumps({'noteIds': ids + [999999], 'targetLangs': ['es', 'fr']}),
+                          content_type='application/json')
+    assert response.mimetype == 'text/event-stream'
+    events = parse_sse(response.data)
+
+    assert events[0] == ('job', {'total': 8, 'notFound': [999999]})
+    items = [data for event, data in events if event == 'item']
+    done = {(data['noteId'], data['targetLang']): data for data in items if data['status'] == 'done'}
+    assert len(done) == 6
+    assert done[(ids[1], 'fr')]['content'] == 'HELLO 1'
+    assert events[-1] == ('done', {'done': 6, 'error': 0, 'not_found': 2})
+    # Three short notes × two languages need only one call per language
+    assert stub.requests == 2
+
+def test_translate_batch_validation(client):
+    """Test request validation"""
+    bad_requests = [
+        {'noteIds': [], 'targetLangs': ['es']},
+        {'noteIds': [1], 'targetLangs': []},
+        {'noteIds': ['1'], 'targetLangs': ['es']},
+        {'noteIds': list(range(1000)), 'targetLangs': ['es']},
+    ]
+    for body in bad_requests:
+        response = client.post('/notes/translate-batch', data=json.dumps(body), content_type='application/json')
+        assert response.status_code == 400
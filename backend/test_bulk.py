@@ -0,0 +1,54 @@
+import pytest
+import json
+import uuid
+from app import app
+from src.bulk import parse_note_line
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_parse_note_line():
+    """Test that exported notes parse back into column values"""
+    row = parse_note_line(json.dumps({'id': 7, 'title': 'T', 'content': 'C', 'tags': ['a'],
+                                      'eventDate': '2024-03-01', 'eventTime': '09:30:00',
+                                      'updatedAt': '2024-03-01T10:00:00+02:00'}))
+    assert row['tags'] == '["a"]'
+    assert row['event_date'].isoformat() == '2024-03-01'
+    assert row['updated_at'].isoformat() == '2024-03-01T08:00:00'
+    assert 'id' not in row
+    for bad in ['[]', '{"content": "no title"}', '{"title": "t", "tags": "a"}', 'not json']:
+        with pytest.raises(ValueError):
+            parse_note_line(bad)
+
+def test_import_then_export_round_trip(client):
+    """Test that imported notes are written in batches and come back in the export"""
+    marker = uuid.uuid4().hex
+    lines = [json.dumps({'title': f'bulk {marker} {i}', 'content': f'body "{i}"\nline', 'tags': [marker]})
+             for i in range(25)]
+    body = '\n'.join(lines[:10] + ['{"content": "missing title"}', ''] + lines[10:]) + '\n'
+
+    response = client.post('/notes/import', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    summary = json.loads(response.data)
+    assert summary['imported'] == 25
+    assert summary['failed'] == 1
+    assert summary['errors'] == [{'line': 11, 'error': 'title is required'}]
+    assert 'rowsPerSecond' in summary
+
+    response = client.get('/notes/export')
+    assert response.mimetype == 'application/x-ndjson'
+    exported = [json.loads(line) for line in response.data.decode().splitlines()]
+    ids = [note['id'] for note in exported]
+    assert ids == sorted(ids)
+    mine = [note for note in exported if note['tags'] == [marker]]
+    assert [note['title'] for note in mine] == [f'bulk {marker} {i}' for i in range(25)]
+    assert mine[3]['content'] == 'body "3"\nline'
+
+def test_import_rejects_all_invalid(client):
+    """Test that a body with no valid notes is a 400"""
+    response = client.post('/notes/import', data='{"title": ""}\n', content_type='application/x-ndjson')
+    assert response.status_code == 400
+    assert json.loads(response.data)['failed'] == 1
@@ -0,0 +1,116 @@
+import pytest
+import json
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert, select
+from app import app
+from models import Base, Note, NoteChange, SessionLocal, migrate_changes
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def create(client, title):
+    response = client.post('/notes', data=json.dumps({'title': title, 'content': 'x', 'tags': ['sync']}),
+                           content_type='application/json')
+    return json.loads(response.data)
+
+def cursor_now(client):
+    return client.get('/notes?limit=1').headers['X-Change-Cursor']
+
+def changes(client, since, **params):
+    query = '&'.join(f'{key}={value}' for key, value in params.items())
+    return json.loads(client.get(f'/notes/changes?since={since}&{query}').data)
+
+def test_changes_since_cursor(client):
+    """Test that only notes written after the cursor come back, each once, in change order"""
+    old = create(client, f'old {uuid.uuid4().hex}')
+    since = cursor_now(client)
+    first = create(client, f'first {uuid.uuid4().hex}')
+    second = create(client, f'second {uuid.uuid4().hex}')
+    client.put(f"/notes/{first['id']}", data=json.dumps({'title': 'first edited', 'content': 'y', 'tags': []}),
+               content_type='application/json')
+
+    result = changes(client, since)
+    assert [note['id'] for note in result['notes']] == [second['id'], first['id']]
+    assert result['notes'][1]['title'] == 'first edited'
+    assert old['id'] not in [note['id'] for note in result['notes']]
+    assert result['deleted'] == []
+    assert result['hasMore'] is False
+
+    again = changes(client, result['cursor'])
+    assert again == {'notes': [], 'deleted': [], 'cursor': result['cursor'], 'hasMore': False}
+
+def test_deletes_leave_tombstones(client):
+    """Test that a deleted note is reported by id and no longer as a changed note"""
+    note = create(client, f'doomed {uuid.uuid4().hex}')
+    since = cursor_now(client)
+    client.delete(f"/notes/{note['id']}")
+
+    result = changes(client, since)
+    assert result['deleted'] == [note['id']]
+    assert result['notes'] == []
+
+    # A client that saw the create earlier gets the delete, not the create
+    result = changes(client, int(since) - 1)
+    assert note['id'] in result['deleted']
+    assert note['id'] not in [change['id'] for change in result['notes']]
+
+def test_changes_paging_and_fields(client):
+    """Test that limit pages through changes and fields projects them (always with id)"""
+    since = cursor_now(client)
+    created = [create(client, f'page {i} {uuid.uuid4().hex}')['id'] for i in range(3)]
+
+    page = changes(client, since, limit=2, fields='title')
+    assert page['hasMore'] is True
+    assert [note['id'] for note in page['notes']] == created[:2]
+    assert set(page['notes'][0]) == {'id', 'title'}
+    page = changes(client, page['cursor'], limit=2, fields='title')
+    assert page['hasMore'] is False
+    assert [note['id'] for note in page['notes']] == created[2:]
+
+def test_unchanged_save_records_nothing(client):
+    """Test that an ORM flush that leaves a note as it was does not bump the change sequence"""
+    note = create(client, f'same {uuid.uuid4().hex}')
+    since = cursor_now(client)
+    db = SessionLocal()
+    try:
+        loaded = db.get(Note, note['id'])
+        loaded.title = note['title']
+        db.commit()
+    finally:
+        db.close()
+    assert changes(client, since)['notes'] == []
+
+def test_imported_notes_are_changes(client):
+    """Test that bulk-imported notes show up in the changes feed"""
+    since = cursor_now(client)
+    title = f'imported {uuid.uuid4().hex}'
+    body = '\n'.join(json.dumps({'title': f'{title} {i}', 'content': 'x'}) for i in range(3))
+    client.post('/notes/import', data=body, content_type='application/x-ndjson')
+    result = changes(client, since)
+    assert [note['title'] for note in result['notes']] == [f'{title} {i}' for i in range(3)]
+
+def test_invalid_since(client):
+    """Test that malformed cursors are rejected"""
+    assert client.get('/notes/changes?since=abc').status_code == 400
+    assert client.get('/notes/changes?since=-1').status_code == 400
+    assert client.get('/notes/changes?fields=bogus').status_code == 400
+
+def test_migrate_changes_seeds_existing_notes(tmp_path):
+    """Test that databases from before the change log get one entry per note, oldest edit first"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Note.__table__), [
+            {'title': 'newer', 'content': 'x', 'updated_at': now},
+            {'title': 'older', 'content': 'x', 'updated_at': now - timedelta(days=1)},
+        ])
+    assert migrate_changes(engine) == 2
+    assert migrate_changes(engine) == 0
+    with engine.connect() as conn:
+        rows = conn.execute(select(NoteChange.note_id, NoteChange.deleted).order_by(NoteChange.seq)).all()
+    assert rows == [(2, False), (1, False)]
@@ -0,0 +1,26 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def import_app(tmp_path):
+    """Import app.py in a fresh interpreter; what it loaded and created"""
+    database = tmp_path / 'cold.db'
+    script = (
+        "import json, sys\n"
+        f"sys.path.insert(0, {BACKEND_DIR!r})\n"
+        "import app, models\n"
+        "print(json.dumps({'openai': 'openai' in sys.modules, 'engine': models._engine is not None}))\n"
+    )
+    child = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, capture_output=True, text=True,
+                           env=dict(os.environ, DATABASE_URL=f'sqlite:///{database}'))
+    assert child.returncode == 0, child.stderr
+    return json.loads(child.stdout.strip().splitlines()[-1]), database.exists()
+
+def test_import_is_lazy(tmp_path):
+    """Test that importing the app neither loads the OpenAI SDK nor opens the database"""
+    loaded, database_created = import_app(tmp_path)
+    assert loaded == {'openai': False, 'engine': False}
+    assert not database_created
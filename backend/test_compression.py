@@ -0,0 +1,93 @@
+import pytest
+import gzip
+import json
+import uuid
+import zlib
+from flask import Response
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from app import app
+from models import Base, Note, NOTE_FIELDS, get_engine
+from src.compression import compress_response, compress_stream
+from src.serialization import stream_note_rows
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def create(client, content):
+    response = client.post('/notes', data=json.dumps({'title': f'zip {uuid.uuid4().hex}', 'content': content}),
+                           content_type='application/json')
+    return json.loads(response.data)
+
+def test_large_response_is_gzipped(client):
+    """Test that a large JSON body is gzipped when the client accepts it"""
+    note = create(client, 'lorem ipsum ' * 500)
+    response = client.get(f"/notes/{note['id']}", headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.data)) == note
+    assert response.headers['ETag'].startswith('W/')
+
+    # The weakened ETag still revalidates
+    response = client.get(f"/notes/{note['id']}", headers={
+        'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']
+    })
+    assert response.status_code == 304
+
+def test_small_or_unaccepted_responses_are_not_compressed(client):
+    """Test that small bodies and clients without Accept-Encoding get identity responses"""
+    note = create(client, 'short')
+    assert 'Content-Encoding' not in client.get(f"/notes/{note['id']}", headers={'Accept-Encoding': 'gzip'}).headers
+    note = create(client, 'lorem ipsum ' * 500)
+    response = client.get(f"/notes/{note['id']}")
+    assert 'Content-Encoding' not in response.headers
+    assert json.loads(response.data) == note
+
+def test_streamed_list_is_compressed_and_complete(client):
+    """Test that the full note list streams, and decodes to the same notes when gzipped"""
+    create(client, 'streamed')
+    plain = client.get('/notes')
+    assert plain.is_streamed
+    notes = json.loads(plain.data)
+    response = client.get('/notes', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert json.loads(gzip.decompress(response.data)) == notes
+
+def test_streamed_list_holds_one_connection(client):
+    """Test that the request session gives back its connection before the list streams"""
+    create(client, 'streamed')
+    response = client.get('/notes', buffered=False)
+    chunks = response.iter_encoded()
+    assert next(chunks) == b'['
+    assert get_engine().pool.checkedout() == 1
+    response.close()
+    assert get_engine().pool.checkedout() == 0
+
+def test_compress_stream_flushes_every_chunk():
+    """Test that each compressed chunk decodes on its own, without waiting for the end"""
+    decoder = zlib.decompressobj(31)
+    decoded = [decoder.decompress(chunk) for chunk in compress_stream(iter([b'[1,', '2,', b'3]']), 'gzip')]
+    assert decoded[:3] == [b'[1,', b'2,', b'3]']
+
+def test_event_streams_are_not_compressed():
+    """Test that Server-Sent Events pass through untouched"""
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = compress_response(Response('data: x\n\n' * 500, mimetype='text/event-stream'))
+    assert 'Content-Encoding' not in response.headers
+
+def test_stream_note_rows_batches(tmp_path):
+    """Test that rows are encoded one batch at a time into one valid JSON array"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'stream.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Note.__table__), [{'title': f'n{i}', 'content': 'x', 'tags': '["t"]'} for i in range(5)])
+    fields = ['id', 'title', 'tags']
+    statement = select(*[NOTE_FIELDS[name] for name in fields]).order_by(Note.id)
+    chunks = list(stream_note_rows(sessionmaker(bind=engine), statement, fields, batch_size=2))
+    assert len(chunks) == 5  # '[', three batches, ']'
+    assert json.loads(b''.join(chunks)) == [{'id': i + 1, 'title': f'n{i}', 'tags': ['t']} for i in range(5)]
+    assert json.loads(b''.join(stream_note_rows(sessionmaker(bind=engine), statement.where(Note.id < 0), fields))) == []
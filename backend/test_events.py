@@ -0,0 +1,100 @@
+import pytest
+import json
+import random
+from datetime import date, time
+from sqlalchemy import text
+from app import app
+from models import Note, get_engine
+from src import llm
+from src.events import parse_event_date, parse_event_time
+from src.llm import reset_llm_client
+from stub_llm_server import StubLLMServer
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def create_event(client, title, event_date, event_time=None):
+    response = client.post('/notes', data=json.dumps({'title': title, 'content': 'x'}),
+                           content_type='application/json')
+    note = json.loads(response.data)
+    response = client.patch(f"/notes/{note['id']}", data=json.dumps({'eventDate': event_date, 'eventTime': event_time}),
+                            content_type='application/json')
+    return json.loads(response.data)
+
+def test_model_dates_are_parsed_at_write_time():
+    """Test that generated date/time strings become DATE/TIME values, unreadable ones NULL"""
+    note = Note.from_generated({'title': 't', 'content': 'c', 'tags': [],
+                                'event_date': '2024-03-05', 'event_time': '2:30 PM'})
+    assert note.event_date == date(2024, 3, 5)
+    assert note.event_time == time(14, 30)
+    note = Note.from_generated({'title': 't', 'content': 'c', 'tags': [],
+                                'event_date': 'next tuesday', 'event_time': 'noonish'})
+    assert note.event_date is None and note.event_time is None
+
+    assert parse_event_date('March 5, 2024') == date(2024, 3, 5)
+    assert parse_event_date('2024-03-05T09:00:00') == date(2024, 3, 5)
+    assert parse_event_time('09:15') == time(9, 15)
+    assert parse_event_time('9 a.m.') == time(9, 0)
+
+def test_generate_note_stores_event(client, monkeypatch):
+    """Test that /generate-note stores the model's event date and time"""
+    reply = json.dumps({'title': 'Dentist', 'content': 'Checkup', 'tags': ['health'],
+                        'event_date': '2387-06-01', 'event_time': '09:30'})
+    with StubLLMServer(reply=lambda messages: reply) as server:
+        monkeypatch.setenv('GITHUB_TOKEN', 'stub-token')
+        monkeypatch.setenv('LLM_ENDPOINT', server.url)
+        monkeypatch.setattr(llm, '_response_cache', None)
+        reset_llm_client()
+        try:
+            response = client.post('/generate-note', data=json.dumps({'input': 'dentist june 1st 9:30'}),
+                                   content_type='application/json')
+        finally:
+            reset_llm_client()
+    assert response.status_code == 201
+    note = json.loads(response.data)
+    assert note['eventDate'] == '2387-06-01' and note['eventTime'] == '09:30:00'
+    events = json.loads(client.get('/events?from=2387-06-01&to=2387-06-01').data)['events']
+    assert {'id': note['id'], 'title': 'Dentist', 'eventDate': '2387-06-01', 'eventTime': '09:30:00'} in events
+
+def test_events_range(client):
+    """Test that /events returns the inclusive range in date and time order"""
+    # A year of its own per run: notes from earlier runs stay in the shared database
+    year = random.randint(2400, 9999)
+    late = create_event(client, 'late', f'{year}-01-10', '18:00:00')
+    early = create_event(client, 'early', f'{year}-01-10', '08:00:00')
+    first = create_event(client, 'first', f'{year}-01-01')
+    outside = create_event(client, 'outside', f'{year}-02-01')
+    created = {note['id'] for note in (late, early, first, outside)}
+
+    data = json.loads(client.get(f'/events?from={year}-01-01&to={year}-01-10').data)
+    ids = [event['id'] for event in data['events'] if event['id'] in created]
+    assert ids == [first['id'], early['id'], late['id']]
+    assert {'id': first['id'], 'title': 'first', 'eventDate': f'{year}-01-01', 'eventTime': None} in data['events']
+
+    data = json.loads(client.get(f'/events?from={year}-01-01&to={year}-01-10&limit=2').data)
+    assert len(data['events']) == 2 and data['hasMore'] is True
+
+def test_events_errors(client):
+    """Test that bad ranges and limits get 400"""
+    assert client.get('/events?from=01/01/2391').status_code == 400
+    assert client.get('/events?from=2391-02-01&to=2391-01-01').status_code == 400
+    assert client.get('/events?limit=0').status_code == 400
+    assert client.get('/events').status_code == 200
+
+def test_range_uses_index():
+    """Test that the range query is an index range scan, not a table scan"""
+    engine = get_engine()
+    if engine.dialect.name != 'sqlite':
+        pytest.skip('plan check is SQLite-specific')
+    with engine.connect() as conn:
+        plan = conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id, title, event_date, event_time FROM notes "
+            "WHERE event_date >= '2391-01-01' AND event_date <= '2391-01-10' "
+            "ORDER BY event_date, event_time, id LIMIT 201"
+        )).all()
+    details = ' '.join(row[-1] for row in plan)
+    assert 'USING INDEX ix_notes_event_date_time' in details
+    assert 'TEMP B-TREE' not in details
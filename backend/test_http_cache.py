@@ -0,0 +1,50 @@
+import pytest
+import json
+import uuid
+from app import app
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def create(client, title):
+    response = client.post('/notes', data=json.dumps({'title': title, 'content': 'x', 'tags': ['etag']}),
+                           content_type='application/json')
+    return json.loads(response.data)
+
+def test_note_conditional_get(client):
+    """Test that an unchanged note revalidates to an empty 304 and edits change the ETag"""
+    note = create(client, f'etag {uuid.uuid4().hex}')
+    response = client.get(f"/notes/{note['id']}")
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    response = client.get(f"/notes/{note['id']}", headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+    client.put(f"/notes/{note['id']}", data=json.dumps({'title': 'changed', 'content': 'y', 'tags': []}),
+               content_type='application/json')
+    response = client.get(f"/notes/{note['id']}", headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_collection_etag_tracks_writes_and_query(client):
+    """Test that list ETags change on create/delete and differ per query string"""
+    response = client.get('/notes?limit=5')
+    etag = response.headers['ETag']
+    assert client.get('/notes?limit=5', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/notes?limit=6', headers={'If-None-Match': etag}).status_code == 200
+    tags_etag = client.get('/tags').headers['ETag']
+
+    note = create(client, f'etag {uuid.uuid4().hex}')
+    response = client.get('/notes?limit=5', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert client.get('/tags', headers={'If-None-Match': tags_etag}).status_code == 200
+
+    client.delete(f"/notes/{note['id']}")
+    assert client.get('/notes?limit=5', headers={'If-None-Match': etag}).status_code == 200
@@ -0,0 +1,170 @@
+import pytest
+import json
+import uuid
+from datetime import datetime, timedelta
+from app import app
+from models import Job, SessionLocal
+from src import jobs
+from worker import HANDLERS, Worker
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+def test_generate_note_job(client, stub):
+    """Test that a queued generate_note job is run by the worker and its result polled"""
+    text = f'remember the jobs test {uuid.uuid4().hex}'
+    response = client.post('/jobs',
+                          data=json.dumps({'kind': 'generate_note', 'payload': {'input': text}}),
+                          content_type='application/json')
+    assert response.status_code == 202
+    job = json.loads(response.data)
+    assert job['status'] == 'queued'
+    assert response.headers['Location'] == f"/jobs/{job['id']}"
+    assert stub.requests == 0
+
+    assert Worker(handlers={'generate_note': HANDLERS['generate_note']}).run(drain=True) >= 1
+
+    job = json.loads(client.get(f"/jobs/{job['id']}").data)
+    assert job['status'] == 'done'
+    assert job['attempts'] == 1
+    assert text in job['result']['content']
+    note = json.loads(client.get(f"/notes/{job['result']['id']}").data)
+    assert note['content'] == job['result']['content']
+
+def test_job_events_stream_until_done(client, stub):
+    """Test that /jobs/<id>/events ends with the finished job"""
+    note = json.loads(client.post('/notes',
+                                  data=json.dumps({'title': 'Job note', 'content': 'hello', 'tags': []}),
+                                  content_type='application/json').data)
+    response = client.post('/jobs',
+                          data=json.dumps({'kind': 'translate_note',
+                                           'payload': {'noteId': note['id'], 'targetLang': 'es'}}),
+                          content_type='application/json')
+    job_id = json.loads(response.data)['id']
+    Worker(handlers={'translate_note': HANDLERS['translate_note']}).run(drain=True)
+
+    response = client.get(f'/jobs/{job_id}/events')
+    assert response.mimetype == 'text/event-stream'
+    blocks = [block for block in response.data.decode().split('\n\n') if block.startswith('event:')]
+    assert blocks[-1].startswith('event: done')
+    result = json.loads(blocks[-1].split('data: ', 1)[1])
+    assert result['status'] == 'done'
+    assert result['result']['originalId'] == note['id']
+
+def test_failed_jobs_retry_then_error(db):
+    """Test that failures are retried with backoff and permanent failures stop at once"""
+    kind = f'test-{uuid.uuid4().hex[:8]}'
+    calls = []
+
+    def flaky(payload, session_factory):
+        calls.append(payload)
+        if payload.get('permanent'):
+            raise jobs.JobFailed('bad input')
+        raise RuntimeError('model unavailable')
+
+    retried = jobs.enqueue(db, Job, kind, {}, max_attempts=2)
+    permanent = jobs.enqueue(db, Job, kind, {'permanent': True})
+    worker = Worker(handlers={kind: flaky})
+    assert worker.run(drain=True) == 2
+
+    db.expire_all()
+    assert db.get(Job, permanent.id).status == 'error'
+    job = db.get(Job, retried.id)
+    assert job.status == 'queued'
+    assert job.error == 'model unavailable'
+    assert job.run_after > datetime.utcnow()
+
+    job.run_after = datetime.utcnow()
+    db.commit()
+    assert worker.run(drain=True) == 1
+    db.expire_all()
+    job = db.get(Job, retried.id)
+    assert (job.status, job.attempts) == ('error', 2)
+    assert len(calls) == 3
+
+def test_worker_survives_database_errors(db, monkeypatch):
+    """Test that failed claims and failed completions are logged and the worker keeps going"""
+    kind = f'test-{uuid.uuid4().hex[:8]}'
+    job = jobs.enqueue(db, Job, kind, {})
+    worker = Worker(handlers={kind: lambda payload, session_factory: {'ok': True}}, poll_interval=0.01)
+    failures = {'claim': 1, 'complete': 1}
+    claim, complete = worker._claim, jobs.complete
+
+    def flaky(name, fn):
+        def call(*args, **kwargs):
+            if failures[name]:
+                failures[name] -= 1
+                raise RuntimeError('database is locked')
+            return fn(*args, **kwargs)
+        return call
+
+    monkeypatch.setattr(worker, '_claim', flaky('claim', claim))
+    monkeypatch.setattr(jobs, 'complete', flaky('complete', complete))
+    assert worker.run(drain=True) == 1
+    assert failures == {'claim': 0, 'complete': 0}
+    db.expire_all()
+    assert db.get(Job, job.id).status == 'running'
+
+    # The unrecorded job is handed out again once its lease expires
+    later = datetime.utcnow() + timedelta(seconds=jobs.LEASE_SECONDS + 1)
+    jobs.requeue_stale(db, Job, now=later)
+    db.get(Job, job.id).run_after = datetime.utcnow()
+    db.commit()
+    assert worker.run(drain=True) == 1
+    db.expire_all()
+    assert db.get(Job, job.id).status == 'done'
+
+def test_claims_are_exclusive_and_stale_leases_requeued(db):
+    """Test that a job is leased to one worker and returned when the lease expires"""
+    kind = f'test-{uuid.uuid4().hex[:8]}'
+    job = jobs.enqueue(db, Job, kind, {})
+    claimed = jobs.claim_next(db, Job, 'worker-a', kinds=[kind])
+    assert claimed.id == job.id
+    assert claimed.locked_by == 'worker-a'
+    assert jobs.claim_next(db, Job, 'worker-b', kinds=[kind]) is None
+
+    later = datetime.utcnow() + timedelta(seconds=jobs.LEASE_SECONDS + 1)
+    assert jobs.requeue_stale(db, Job, now=later) >= 1
+    claimed = jobs.claim_next(db, Job, 'worker-b', kinds=[kind], now=later)
+    assert (claimed.id, claimed.attempts) == (job.id, 2)
+
+def test_outcome_of_a_lost_lease_is_dropped(db):
+    """Test that a worker that lost its job to another one cannot complete or fail it"""
+    kind = f'test-{uuid.uuid4().hex[:8]}'
+    job = jobs.enqueue(db, Job, kind, {})
+    jobs.claim_next(db, Job, 'worker-a', kinds=[kind])
+    later = datetime.utcnow() + timedelta(seconds=jobs.LEASE_SECONDS + 1)
+    jobs.requeue_stale(db, Job, now=later)
+    jobs.claim_next(db, Job, 'worker-b', kinds=[kind], now=later)
+
+    saved = []
+    assert not jobs.complete(db, Job, job.id, 'worker-a', jobs.SaveOnComplete(lambda session: saved.append(1)))
+    assert not jobs.fail(db, Job, job.id, 'worker-a', 'too late')
+    assert saved == []
+    assert jobs.complete(db, Job, job.id, 'worker-b', {'ok': True})
+    db.expire_all()
+    finished = db.get(Job, job.id)
+    assert (finished.status, json.loads(finished.result), finished.error) == ('done', {'ok': True}, None)
+
+def test_job_validation(client):
+    """Test job request validation and unknown ids"""
+    bad_requests = [
+        {'kind': 'unknown', 'payload': {}},
+        {'kind': 'generate_note', 'payload': {}},
+        {'kind': 'translate_note', 'payload': {'noteId': 1}},
+        {'kind': 'generate_note', 'payload': 'text'},
+    ]
+    for body in bad_requests:
+        response = client.post('/jobs', data=json.dumps(body), content_type='application/json')
+        assert response.status_code == 400
+    assert client.get('/jobs/999999').status_code == 404
+    assert client.get('/jobs/999999/events').status_code == 404
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models import Base, LLMCacheEntry
+from src import llm
+from src.llm import LLMResponse
+from src.llm_cache import LLMCache, make_cache_key
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+def test_cache_key_is_order_independent():
+    """Test that the key depends on the parts, not their order"""
+    assert make_cache_key(a=1, b='x') == make_cache_key(b='x', a=1)
+    assert make_cache_key(a=1, b='x') != make_cache_key(a=1, b='y')
+
+def test_memory_lru_eviction():
+    """Test that the least recently used entry is evicted first"""
+    cache = LLMCache(memory_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.stats()['memoryEvictions'] == 1
+
+def test_ttl_expiry(session_factory):
+    """Test that entries expire in both tiers"""
+    clock = FakeClock()
+    cache = LLMCache(session_factory, LLMCacheEntry, ttl_seconds=60, clock=clock)
+    cache.set('k', {'title': 't'})
+    clock.now += 30
+    assert cache.get('k') == {'title': 't'}
+    clock.now += 31
+    assert cache.get('k') is None
+
+def test_db_tier_survives_new_instance(session_factory):
+    """Test that a fresh process is served from the database tier"""
+    LLMCache(session_factory, LLMCacheEntry).set('k', {'title': 't'})
+
+    cache = LLMCache(session_factory, LLMCacheEntry)
+    assert cache.get('k') == {'title': 't'}
+    assert cache.get('k') == {'title': 't'}
+    stats = cache.stats()
+    assert stats['dbHits'] == 1
+    assert stats['memoryHits'] == 1
+
+def test_db_size_eviction(session_factory):
+    """Test that pruning keeps only the newest db_entries rows"""
+    clock = FakeClock()
+    cache = LLMCache(session_factory, LLMCacheEntry, db_entries=3, clock=clock)
+    for i in range(5):
+        clock.now += 1
+        cache.set(f'k{i}', i)
+    db = session_factory()
+    try:
+        assert cache.prune(db) == 2
+        keys = sorted(entry.key for entry in db.query(LLMCacheEntry).all())
+    finally:
+        db.close()
+    assert keys == ['k2', 'k3', 'k4']
+
+def test_translate_text_uses_cache(monkeypatch):
+    """Test that a repeated translation does not call the model again"""
+    calls = []
+
+    class FakeClient:
+        def call_llm_model(self, messages, temperature=1.0, top_p=1.0, max_retries=3):
+            calls.append(messages)
+            return LLMResponse(content='{"title": "Hola", "content": "Hola mundo"}')
+
+    monkeypatch.setattr(llm, 'get_llm_client', FakeClient)
+    monkeypatch.setattr(llm, '_response_cache', LLMCache())
+
+    first = llm.translate_text('Hello world', 'es', title='Hi', cache_scope='note:1@v1')
+    second = llm.translate_text('Hello world', 'es', title='Hi', cache_scope='note:1@v1')
+    assert first == second == {'title': 'Hola', 'content': 'Hola mundo'}
+    assert len(calls) == 1
+
+    # An edited note (new updated_at) must not be served the old translation
+    llm.translate_text('Hello world', 'es', title='Hi', cache_scope='note:1@v2')
+    assert len(calls) == 2
@@ -0,0 +1,50 @@
+import pytest
+from src import llm
+from src.llm import LLMClient, get_llm_client
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(llm, '_sleep', recorded.append)
+    return recorded
+
+def test_shared_client_is_reused(stub):
+    """Test that every call goes through one client and one keep-alive connection"""
+    assert get_llm_client() is get_llm_client()
+
+    for i in range(3):
+        result = llm.translate_text(f'Hello {i}', 'es')
+        assert result['content']
+    assert stub.requests == 3
+    assert len(stub.connections) == 1
+
+def test_retry_after_is_honored(stub, sleeps):
+    """Test that a 429 is retried after the server's Retry-After delay"""
+    stub.fail_with_429 = 2
+    stub.retry_after = '3'
+    response = get_llm_client().call_llm_model([{'role': 'user', 'content': 'hi'}], max_retries=3)
+    assert response.error is None
+    assert stub.requests == 3
+    assert sleeps == [3.0, 3.0]
+
+def test_retries_are_bounded(stub, sleeps):
+    """Test that max_retries limits attempts and the error is reported"""
+    stub.fail_with_429 = 10
+    response = get_llm_client().call_llm_model([{'role': 'user', 'content': 'hi'}], max_retries=2)
+    assert response.error is not None
+    assert stub.requests == 3
+    assert len(sleeps) == 2
+
+def test_connection_errors_back_off_with_jitter(monkeypatch, sleeps):
+    """Test exponential backoff when the endpoint is unreachable"""
+    monkeypatch.setenv('GITHUB_TOKEN', 'stub-token')
+    monkeypatch.setenv('LLM_ENDPOINT', 'http://127.0.0.1:9')
+    client = LLMClient()
+    try:
+        response = client.call_llm_model([{'role': 'user', 'content': 'hi'}], max_retries=3)
+    finally:
+        client.close()
+    assert response.error is not None
+    assert len(sleeps) == 3
+    for attempt, delay in enumerate(sleeps):
+        assert 0 <= delay <= llm.RETRY_BASE_DELAY_SECONDS * 2 ** attempt
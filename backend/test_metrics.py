@@ -0,0 +1,68 @@
+import pytest
+import json
+import re
+from app import app
+from src import llm
+from src.metrics import Histogram, llm_tokens, request_db_queries, request_duration
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def create(client):
+    response = client.post('/notes', data=json.dumps({'title': 'metrics', 'content': 'x'}),
+                           content_type='application/json')
+    return json.loads(response.data)
+
+def test_server_timing_header(client):
+    """Test that responses report DB time, query count and total time"""
+    note = create(client)
+    timing = client.get(f"/notes/{note['id']}").headers['Server-Timing']
+    match = re.match(r'db;dur=[\d.]+;desc="(\d+) queries", app;dur=[\d.]+$', timing)
+    assert match and int(match.group(1)) >= 1
+
+def test_route_histograms(client):
+    """Test that requests are recorded per route template, not per URL"""
+    note = create(client)
+    route = ('GET', '/notes/<int:note_id>', '200')
+    before = request_duration.count(*route)
+    queries_before = request_db_queries.count('GET', '/notes/<int:note_id>')
+    for _ in range(3):
+        client.get(f"/notes/{note['id']}").close()
+    assert request_duration.count(*route) == before + 3
+    assert request_db_queries.count('GET', '/notes/<int:note_id>') == queries_before + 3
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    body = response.get_data(as_text=True)
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/notes/<int:note_id>",status="200"}' in body
+    assert 'db_query_duration_seconds_count ' in body
+
+def test_llm_latency_and_tokens(client, stub):
+    """Test that model calls add to the token counters and the request's timing"""
+    model = llm.DEFAULT_MODEL
+    before = llm_tokens.value(model, 'prompt'), llm_tokens.value(model, 'completion')
+    response = client.post('/translate', data=json.dumps({'title': 'Hi', 'content': 'Hello', 'targetLang': 'fr'}),
+                           content_type='application/json')
+    assert response.status_code == 200
+    assert 'llm;dur=' in response.headers['Server-Timing']
+    assert llm_tokens.value(model, 'prompt') > before[0]
+    assert llm_tokens.value(model, 'completion') > before[1]
+    assert f'llm_request_duration_seconds_count{{model="{model}",mode="complete",outcome="ok"}}' in \
+        client.get('/metrics').get_data(as_text=True)
+
+def test_histogram_buckets_are_cumulative():
+    """Test the Prometheus rendering of a histogram"""
+    histogram = Histogram('sample_seconds', 'Sample', ('route',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, '/x')
+    lines = histogram.render()
+    assert 'sample_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'sample_seconds_bucket{route="/x",le="1"} 3' in lines
+    assert 'sample_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'sample_seconds_sum{route="/x"} 4.25' in lines
+    assert 'sample_seconds_count{route="/x"} 4' in lines
@@ -0,0 +1,96 @@
+import pytest
+import json
+import os
+from datetime import date, datetime
+from sqlalchemy import create_engine, insert, select, text
+import migrate_to_postgres as migrator
+from models import Base, Note
+
+def seed(url, count):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # Sparse ids, as left behind by deleted notes
+        conn.execute(insert(Note.__table__), [
+            {'id': i * 3, 'title': f'Note {i}', 'content': f'content "{i}"\nline', 'tags': '["a"]',
+             'event_date': date(2024, 1, 1 + i % 28) if i % 2 else None,
+             'updated_at': datetime(2024, 1, 1, 12, 0, i % 60, 123456)}
+            for i in range(1, count + 1)
+        ])
+    engine.dispose()
+
+@pytest.fixture
+def urls(tmp_path):
+    source = f"sqlite:///{tmp_path / 'source.db'}"
+    seed(source, 40)
+    return source, f"sqlite:///{tmp_path / 'target.db'}", str(tmp_path / 'checkpoint.json')
+
+def target_ids(url):
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        ids = [row[0] for row in conn.execute(select(Note.id).order_by(Note.id))]
+    engine.dispose()
+    return ids
+
+def test_parallel_migration_preserves_ids(urls):
+    """Test that a chunked parallel migration copies every row with its id and verifies"""
+    source, target, checkpoint = urls
+    assert migrator.migrate_sqlite_to_postgres(source, target, chunk_size=7, workers=3, checkpoint_path=checkpoint)
+    assert target_ids(target) == [i * 3 for i in range(1, 41)]
+    assert not os.path.exists(checkpoint)
+
+def test_migration_resumes_from_checkpoint(urls, monkeypatch):
+    """Test that a failed run keeps finished chunks and the next run copies only the rest"""
+    source, target, checkpoint = urls
+    copy_chunk = migrator.copy_chunk
+    copied = []
+
+    def failing_copy(source_engine, target_engine, table, first_id, last_id):
+        if len(copied) == 2:
+            raise RuntimeError('connection lost')
+        copied.append(first_id)
+        return copy_chunk(source_engine, target_engine, table, first_id, last_id)
+
+    monkeypatch.setattr(migrator, 'copy_chunk', failing_copy)
+    assert not migrator.migrate_sqlite_to_postgres(source, target, chunk_size=10, checkpoint_path=checkpoint)
+    with open(checkpoint) as f:
+        assert json.load(f)['tables']['notes'] == [[3, 30], [33, 60]]
+
+    resumed = []
+    def counting_copy(source_engine, target_engine, table, first_id, last_id):
+        resumed.append(first_id)
+        return copy_chunk(source_engine, target_engine, table, first_id, last_id)
+
+    monkeypatch.setattr(migrator, 'copy_chunk', counting_copy)
+    assert migrator.migrate_sqlite_to_postgres(source, target, chunk_size=10, checkpoint_path=checkpoint)
+    assert resumed == [63, 93]
+    assert len(target_ids(target)) == 40
+
+def test_migration_refuses_non_empty_target(urls):
+    """Test that existing target rows are not overwritten without --overwrite"""
+    source, target, checkpoint = urls
+    seed(target, 1)
+    assert not migrator.migrate_sqlite_to_postgres(source, target, checkpoint_path=checkpoint)
+    assert migrator.migrate_sqlite_to_postgres(source, target, checkpoint_path=checkpoint, overwrite=True)
+
+def test_migration_from_database_without_version_column(tmp_path):
+    """Test that a notes.db created before notes.version existed migrates with version 1"""
+    source = f"sqlite:///{tmp_path / 'old.db'}"
+    engine = create_engine(source)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE notes (id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, content TEXT NOT NULL, "
+            "tags TEXT, event_date DATE, event_time TIME, updated_at DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO notes (id, title, content, tags, updated_at) "
+            "VALUES (4, 'Old', 'from before versions', '[\"a\"]', '2024-01-01 12:00:00.000000')"
+        ))
+    engine.dispose()
+
+    target = f"sqlite:///{tmp_path / 'target.db'}"
+    assert migrator.migrate_sqlite_to_postgres(source, target, checkpoint_path=str(tmp_path / 'checkpoint.json'))
+    engine = create_engine(target)
+    with engine.connect() as conn:
+        assert conn.execute(select(Note.id, Note.title, Note.version)).all() == [(4, 'Old', 1)]
+    engine.dispose()
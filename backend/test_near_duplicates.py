@@ -0,0 +1,113 @@
+import pytest
+import json
+import random
+import uuid
+from app import app
+from models import NoteBucket, NoteSignature, SessionLocal
+from src.near_duplicates import BANDS, encode_signature, minhash, shingle_hashes, similarity
+
+WORDS = ("alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike november oscar papa "
+         "quebec romeo sierra tango uniform victor whiskey xray yankee zulu").split()
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def create(client, title, content):
+    response = client.post('/notes', data=json.dumps({'title': title, 'content': content}),
+                           content_type='application/json')
+    return json.loads(response.data)
+
+def long_text(marker, words=60):
+    """Words drawn from a generator seeded by marker, so texts for different markers share few shingles"""
+    rng = random.Random(marker)
+    return ' '.join([marker] + [f'{rng.choice(WORDS)}{rng.randrange(1000)}' for _ in range(words)])
+
+def stored(note_id):
+    with SessionLocal() as db:
+        signature = db.get(NoteSignature, note_id)
+        buckets = db.query(NoteBucket).filter(NoteBucket.note_id == note_id).count()
+        return signature, buckets
+
+def test_similarity_estimates_jaccard():
+    """Test that identical texts score 1 and disjoint texts close to 0"""
+    first = encode_signature(minhash(shingle_hashes(long_text('one'))))
+    assert similarity(first, first) == 1.0
+    other = encode_signature(minhash(shingle_hashes(' '.join(f'word{i}' for i in range(60)))))
+    assert similarity(first, other) < 0.1
+    assert minhash(shingle_hashes('')) is None
+
+def test_finds_near_identical_note(client):
+    """Test that a lightly edited copy is similar and an unrelated note is not"""
+    marker = uuid.uuid4().hex
+    text = long_text(marker)
+    original = create(client, f'Report {marker}', text)
+    copy = create(client, f'Report {marker}', text.replace(text.split()[1], 'omega', 1))
+    other = create(client, f'Groceries {marker}', 'milk eggs coffee beans bread and butter for the week')
+
+    response = client.get(f"/notes/{original['id']}/similar")
+    assert response.status_code == 200
+    results = json.loads(response.data)
+    ids = [result['id'] for result in results]
+    assert copy['id'] in ids and other['id'] not in ids and original['id'] not in ids
+    match = results[ids.index(copy['id'])]
+    assert 0.7 <= match['similarity'] < 1
+    assert set(match) == {'id', 'title', 'updatedAt', 'similarity'}
+
+def test_similar_validation(client):
+    """Test the 404 for a missing note and the 400 for a bad threshold"""
+    assert client.get('/notes/999999999/similar').status_code == 404
+    note = create(client, 'Threshold check', 'some words here')
+    assert client.get(f"/notes/{note['id']}/similar?threshold=2").status_code == 400
+    assert client.get(f"/notes/{note['id']}/similar?threshold=abc").status_code == 400
+    assert client.get('/notes/duplicates?threshold=0').status_code == 400
+
+def test_duplicates_report_groups_copies(client):
+    """Test that planted copies form one cluster in the duplicates report"""
+    marker = uuid.uuid4().hex
+    text = long_text(marker, words=80)
+    planted = [create(client, f'Minutes {marker}', text)['id']]
+    planted.append(create(client, f'Minutes {marker}', text + ' addendum')['id'])
+    planted.append(create(client, f'Minutes {marker} copy', text)['id'])
+    create(client, f'Unrelated {marker}', 'a completely different note about gardening tools')
+
+    response = client.get('/notes/duplicates?limit=500')
+    assert response.status_code == 200
+    report = json.loads(response.data)
+    clusters = [cluster for cluster in report['clusters']
+                if any(note['id'] in planted for note in cluster['notes'])]
+    assert len(clusters) == 1
+    assert sorted(note['id'] for note in clusters[0]['notes']) == sorted(planted)
+    assert clusters[0]['minSimilarity'] >= 0.8
+    assert report['totalClusters'] >= 1 and report['duplicateNotes'] >= 3
+
+def test_signatures_follow_note_writes(client):
+    """Test that signatures are replaced when the text changes and removed on delete"""
+    note = create(client, 'Signature lifecycle', long_text(uuid.uuid4().hex))
+    signature, buckets = stored(note['id'])
+    assert len(signature.signature) == 4 * 128 and buckets == BANDS
+
+    client.patch(f"/notes/{note['id']}", data=json.dumps({'tags': ['only-tags']}), content_type='application/json')
+    assert stored(note['id'])[0].text_hash == signature.text_hash
+
+    client.patch(f"/notes/{note['id']}", data=json.dumps({'content': ''}), content_type='application/json')
+    changed, buckets = stored(note['id'])
+    assert changed.text_hash != signature.text_hash and buckets == BANDS
+
+    client.delete(f"/notes/{note['id']}")
+    assert stored(note['id']) == (None, 0)
+
+def test_imported_notes_are_signed(client):
+    """Test that notes written by the bulk import get signatures"""
+    marker = uuid.uuid4().hex
+    body = '\n'.join(json.dumps({'title': f'import {marker}', 'content': long_text(marker)}) for _ in range(2))
+    assert client.post('/notes/import', data=body, content_type='application/x-ndjson').status_code == 200
+
+    exported = [json.loads(line) for line in client.get('/notes/export').data.decode().splitlines()]
+    ids = [note['id'] for note in exported if note['title'] == f'import {marker}']
+    assert len(ids) == 2
+    assert all(stored(note_id)[1] == BANDS for note_id in ids)
+    similar = json.loads(client.get(f'/notes/{ids[0]}/similar').data)
+    assert [result['id'] for result in similar] == [ids[1]]
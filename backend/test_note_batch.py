@@ -0,0 +1,110 @@
+import pytest
+import json
+import uuid
+from app import app
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def create(client, tags=()):
+    response = client.post('/notes', data=json.dumps({
+        'title': f'batch {uuid.uuid4().hex}', 'content': 'x', 'tags': list(tags)
+    }), content_type='application/json')
+    return json.loads(response.data)
+
+def batch(client, operations, **options):
+    response = client.post('/notes/batch', data=json.dumps({'operations': operations, **options}),
+                           content_type='application/json')
+    return response.status_code, json.loads(response.data)
+
+def test_mixed_batch(client):
+    """Test that creates, updates and deletes apply together with one result per operation"""
+    keep, doomed = create(client), create(client)
+    title = f'created {uuid.uuid4().hex}'
+    status, data = batch(client, [
+        {'op': 'create', 'note': {'title': title, 'tags': ['new']}},
+        {'op': 'update', 'id': keep['id'], 'note': {'content': 'updated', 'eventDate': '2024-02-03'}},
+        {'op': 'delete', 'id': doomed['id']},
+    ])
+    assert status == 200
+    created, updated, deleted = data['results']
+    assert created['status'] == 'created' and created['note']['title'] == title
+    assert created['note']['tags'] == ['new'] and created['note']['content'] == ''
+    assert updated['status'] == 'updated' and updated['note']['content'] == 'updated'
+    assert updated['note']['eventDate'] == '2024-02-03'
+    assert updated['note']['version'] == keep['version'] + 1
+    assert deleted == {'op': 'delete', 'id': doomed['id'], 'status': 'deleted'}
+    assert data['counts'] == {'created': 1, 'updated': 1, 'deleted': 1}
+
+    assert json.loads(client.get(f"/notes/{keep['id']}").data)['content'] == 'updated'
+    assert client.get(f"/notes/{doomed['id']}").status_code == 404
+    assert client.get(f"/notes/{created['id']}").status_code == 200
+
+def test_creates_with_different_fields(client):
+    """Test that creates supplying different fields keep each note's own values"""
+    for notes in (
+        [{'title': 'plain'}, {'title': 'dated', 'eventDate': '2024-05-06', 'eventTime': '09:30:00'}],
+        [{'title': 'dated', 'eventDate': '2024-05-06', 'eventTime': '09:30:00'}, {'title': 'plain', 'content': 'c'}],
+    ):
+        status, data = batch(client, [{'op': 'create', 'note': note} for note in notes])
+        assert status == 200
+        created = {result['note']['title']: result['note'] for result in data['results']}
+        assert created['dated']['eventDate'] == '2024-05-06' and created['dated']['eventTime'] == '09:30:00'
+        assert created['plain']['eventDate'] is None and created['plain']['tags'] == []
+
+def test_bulk_retag_updates_index_and_changes(client):
+    """Test that retagging many notes keeps tag filters and the changes feed in step"""
+    notes = [create(client, ['old']) for _ in range(5)]
+    since = client.get('/notes?limit=1').headers['X-Change-Cursor']
+    tag = f'retag-{uuid.uuid4().hex[:8]}'
+    status, data = batch(client, [{'op': 'update', 'id': note['id'], 'note': {'tags': [tag]}} for note in notes])
+    assert status == 200
+    assert data['counts'] == {'updated': 5}
+    ids = sorted(note['id'] for note in notes)
+    assert sorted(note['id'] for note in json.loads(client.get(f'/notes?tag={tag}').data)) == ids
+    changes = json.loads(client.get(f'/notes/changes?since={since}').data)
+    assert sorted(note['id'] for note in changes['notes']) == ids
+
+def test_failed_operations_are_skipped(client):
+    """Test that missing notes, stale versions and invalid operations are reported, the rest applied"""
+    note, other = create(client), create(client)
+    status, data = batch(client, [
+        {'op': 'delete', 'id': 999999999},
+        {'op': 'update', 'id': note['id'], 'note': {'title': 'stale'}, 'version': note['version'] + 5},
+        {'op': 'create', 'note': {'content': 'no title'}},
+        {'op': 'rename', 'id': note['id']},
+        {'op': 'update', 'id': other['id'], 'note': {'title': 'applied'}, 'version': other['version']},
+    ])
+    assert status == 200
+    statuses = [result['status'] for result in data['results']]
+    assert statuses == ['not_found', 'conflict', 'invalid', 'invalid', 'updated']
+    assert data['results'][1]['note']['title'] == note['title']
+    assert json.loads(client.get(f"/notes/{note['id']}").data)['title'] == note['title']
+
+def test_atomic_batch_rolls_back(client):
+    """Test that with atomic=true one failing operation prevents every write"""
+    note = create(client)
+    title = f'never {uuid.uuid4().hex}'
+    status, data = batch(client, [
+        {'op': 'create', 'note': {'title': title}},
+        {'op': 'delete', 'id': note['id']},
+        {'op': 'update', 'id': note['id'] + 10**9, 'note': {'title': 'missing'}},
+    ], atomic=True)
+    assert status == 400
+    assert [result['status'] for result in data['results']] == ['rolled_back', 'rolled_back', 'not_found']
+    assert client.get(f"/notes/{note['id']}").status_code == 200
+    assert title not in [n['title'] for n in json.loads(client.get('/notes?limit=200').data)]
+
+def test_duplicate_ids_and_bad_bodies(client):
+    """Test that a note named twice is rejected and malformed bodies get 400"""
+    note = create(client)
+    status, data = batch(client, [{'op': 'delete', 'id': note['id']},
+                                  {'op': 'update', 'id': note['id'], 'note': {'title': 'x'}}])
+    assert status == 400
+    assert [result['status'] for result in data['results']] == ['invalid', 'invalid']
+    assert client.get(f"/notes/{note['id']}").status_code == 200
+    assert client.post('/notes/batch', data='{}', content_type='application/json').status_code == 400
+    assert batch(client, [])[0] == 400
@@ -0,0 +1,112 @@
+import pytest
+import json
+import uuid
+from sqlalchemy import create_engine, text
+from app import app
+from models import ensure_columns
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def create(client):
+    response = client.post('/notes', data=json.dumps({
+        'title': f'patch {uuid.uuid4().hex}', 'content': 'original', 'tags': ['keep']
+    }), content_type='application/json')
+    return json.loads(response.data)
+
+def patch(client, note_id, body, **headers):
+    return client.patch(f'/notes/{note_id}', data=json.dumps(body), content_type='application/json', headers=headers)
+
+def test_patch_updates_only_supplied_fields(client):
+    """Test that omitted fields, including tags, are left alone and the version is bumped"""
+    note = create(client)
+    response = patch(client, note['id'], {'content': 'edited', 'eventDate': '2024-06-01', 'eventTime': '14:30:00'})
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['title'] == note['title']
+    assert data['content'] == 'edited'
+    assert data['tags'] == ['keep']
+    assert data['eventDate'] == '2024-06-01'
+    assert data['eventTime'] == '14:30:00'
+    assert data['version'] == note['version'] + 1
+    assert json.loads(client.get(f"/notes/{note['id']}").data) == data
+
+    data = json.loads(patch(client, note['id'], {'eventDate': None}).data)
+    assert data['eventDate'] is None
+    assert data['eventTime'] == '14:30:00'
+
+def test_patch_tags_update_index_and_changes(client):
+    """Test that patched tags are normalized, filterable and show up in the changes feed"""
+    note = create(client)
+    since = client.get('/notes?limit=1').headers['X-Change-Cursor']
+    tag = f'patched-{uuid.uuid4().hex[:8]}'
+    data = json.loads(patch(client, note['id'], {'tags': [f' {tag} ', tag]}).data)
+    assert data['tags'] == [tag]
+    assert [n['id'] for n in json.loads(client.get(f'/notes?tag={tag}').data)] == [note['id']]
+    changes = json.loads(client.get(f'/notes/changes?since={since}').data)
+    assert [n['id'] for n in changes['notes']] == [note['id']]
+
+def test_stale_version_conflicts(client):
+    """Test that a write based on an old version gets 409 with the current note"""
+    note = create(client)
+    assert patch(client, note['id'], {'title': 'tab one', 'version': note['version']}).status_code == 200
+    response = patch(client, note['id'], {'title': 'tab two', 'version': note['version']})
+    assert response.status_code == 409
+    data = json.loads(response.data)
+    assert data['note']['title'] == 'tab one'
+    assert json.loads(client.get(f"/notes/{note['id']}").data)['title'] == 'tab one'
+
+def test_if_match(client):
+    """Test that If-Match with the note's ETag succeeds once and then fails with 412"""
+    note = create(client)
+    etag = client.get(f"/notes/{note['id']}").headers['ETag']
+    response = patch(client, note['id'], {'title': 'first'}, **{'If-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert patch(client, note['id'], {'title': 'second'}, **{'If-Match': etag}).status_code == 412
+    assert patch(client, note['id'], {'title': 'second'}, **{'If-Match': '"garbage"'}).status_code == 412
+    assert patch(client, note['id'], {'title': 'any'}, **{'If-Match': '*'}).status_code == 200
+
+def test_if_match_of_another_note(client):
+    """Test that the ETag of another note at the same version fails with 412"""
+    note, other = create(client), create(client)
+    assert note['version'] == other['version']
+    other_etag = client.get(f"/notes/{other['id']}").headers['ETag']
+    response = patch(client, note['id'], {'title': 'wrong note'}, **{'If-Match': other_etag})
+    assert response.status_code == 412
+    assert json.loads(client.get(f"/notes/{note['id']}").data)['title'] != 'wrong note'
+
+def test_put_keeps_version_and_tags(client):
+    """Test that PUT bumps the version and no longer clears tags it was not given"""
+    note = create(client)
+    response = client.put(f"/notes/{note['id']}", data=json.dumps({'title': 'put', 'content': 'x'}),
+                          content_type='application/json')
+    data = json.loads(response.data)
+    assert data['tags'] == ['keep']
+    assert data['version'] == note['version'] + 1
+
+def test_patch_errors(client):
+    """Test validation errors and missing notes"""
+    note = create(client)
+    assert patch(client, 999999999, {'title': 'x'}).status_code == 404
+    assert patch(client, note['id'], {}).status_code == 400
+    assert patch(client, note['id'], {'title': ''}).status_code == 400
+    assert patch(client, note['id'], {'tags': 'a,b'}).status_code == 400
+    assert patch(client, note['id'], {'eventDate': '01/06/2024'}).status_code == 400
+    assert patch(client, note['id'], {'color': 'red'}).status_code == 400
+    assert patch(client, note['id'], {'title': 'x', 'version': 'one'}).status_code == 400
+
+def test_ensure_columns_adds_version(tmp_path):
+    """Test that a notes table from before the version column gets it, defaulting to 1"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE notes (id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, "
+                          "content TEXT NOT NULL, tags TEXT, event_date DATE, event_time TIME, updated_at DATETIME)"))
+        conn.execute(text("INSERT INTO notes (title, content) VALUES ('old', 'x')"))
+    ensure_columns(engine)
+    ensure_columns(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT version FROM notes")).scalar() == 1
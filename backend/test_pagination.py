@@ -0,0 +1,56 @@
+import pytest
+import json
+from app import app
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def create_notes(client, count):
+    for i in range(count):
+        client.post('/notes',
+                   data=json.dumps({'title': f'Page note {i}', 'content': 'x' * 150, 'tags': ['page']}),
+                   content_type='application/json')
+
+def test_keyset_pages_cover_full_list(client):
+    """Test that following cursors visits every note exactly once, in order"""
+    create_notes(client, 5)
+    full = json.loads(client.get('/notes?fields=id').data)
+
+    seen = []
+    cursor = None
+    while True:
+        url = '/notes?limit=2&fields=id' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url)
+        assert response.status_code == 200
+        page = json.loads(response.data)
+        assert len(page) <= 2
+        seen.extend(note['id'] for note in page)
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+
+    assert seen == [note['id'] for note in full]
+
+def test_field_projection(client):
+    """Test that only requested fields are returned"""
+    create_notes(client, 1)
+    response = client.get('/notes?limit=1&fields=id,title,preview,tags,updatedAt')
+    data = json.loads(response.data)
+    assert set(data[0].keys()) == {'id', 'title', 'preview', 'tags', 'updatedAt'}
+    assert len(data[0]['preview']) <= 100
+    assert isinstance(data[0]['tags'], list)
+
+def test_default_fields_match_note_shape(client):
+    """Test that unprojected list items keep the full note shape"""
+    create_notes(client, 1)
+    data = json.loads(client.get('/notes?limit=1').data)
+    assert set(data[0].keys()) == {'id', 'title', 'content', 'tags', 'eventDate', 'eventTime', 'updatedAt', 'version'}
+
+def test_invalid_pagination_arguments(client):
+    """Test that bad cursors, limits and fields are rejected"""
+    assert client.get('/notes?cursor=not-a-cursor').status_code == 400
+    assert client.get('/notes?limit=0').status_code == 400
+    assert client.get('/notes?fields=id,password').status_code == 400
@@ -0,0 +1,48 @@
+import pytest
+import json
+from app import app
+from src.pool import TimedNullPool, TimedQueuePool, get_engine_options
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_engine_options_from_env(monkeypatch):
+    """Test that pool settings are read from the environment"""
+    monkeypatch.setenv('DB_POOL_SIZE', '3')
+    monkeypatch.setenv('DB_MAX_OVERFLOW', '0')
+    monkeypatch.setenv('DB_POOL_PRE_PING', 'false')
+    options = get_engine_options('postgresql+pg8000://user@host/db')
+    assert options['poolclass'] is TimedQueuePool
+    assert options['pool_size'] == 3
+    assert options['max_overflow'] == 0
+    assert options['pool_pre_ping'] is False
+
+def test_serverless_defaults(monkeypatch):
+    """Test that Vercel instances default to a minimal pool"""
+    monkeypatch.delenv('DB_POOL_SIZE', raising=False)
+    monkeypatch.setenv('VERCEL', '1')
+    options = get_engine_options('postgresql+pg8000://user@host/db')
+    assert options['pool_size'] == 1
+
+def test_null_pool_mode(monkeypatch):
+    """Test external pooler mode"""
+    monkeypatch.setenv('DB_POOL_MODE', 'null')
+    options = get_engine_options('postgresql+pg8000://user@host/db')
+    assert options['poolclass'] is TimedNullPool
+    assert 'pool_size' not in options
+
+    monkeypatch.setenv('DB_POOL_MODE', 'bogus')
+    with pytest.raises(ValueError):
+        get_engine_options('postgresql+pg8000://user@host/db')
+
+def test_sessions_released_after_request(client):
+    """Test that the request-scoped session returns its connection on teardown"""
+    client.get('/notes?limit=1')
+    response = client.get('/stats/pool')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['checkouts'] >= 1
+    assert data['checkedOut'] == 0
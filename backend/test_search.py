@@ -0,0 +1,64 @@
+import pytest
+import json
+import uuid
+from app import app
+from src.search import build_match_query
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def unique_word():
+    return 'zq' + uuid.uuid4().hex[:10]
+
+def create(client, title, content):
+    response = client.post('/notes',
+                          data=json.dumps({'title': title, 'content': content, 'tags': []}),
+                          content_type='application/json')
+    assert response.status_code == 201
+    return json.loads(response.data)['id']
+
+def search(client, query):
+    response = client.get(f'/notes/search?q={query}')
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+def test_build_match_query():
+    """Test that free text becomes a prefix query with all terms required"""
+    assert build_match_query('Budget rev', 'sqlite') == '"budget" "rev"*'
+    assert build_match_query('Budget rev', 'postgresql') == 'budget & rev:*'
+    assert build_match_query('"); DROP --', 'sqlite') == '"drop"*'
+    assert build_match_query('  ', 'sqlite') == ''
+
+def test_search_ranks_title_matches_first(client):
+    """Test that a title match outranks a content-only match"""
+    word = unique_word()
+    content_id = create(client, 'Unrelated', f'Some text mentioning {word} once')
+    title_id = create(client, f'{word} planning', 'Body text')
+
+    data = search(client, word)
+    assert [note['id'] for note in data] == [title_id, content_id]
+
+def test_search_prefix_and_case_insensitive(client):
+    """Test that partially typed words match"""
+    word = unique_word()
+    note_id = create(client, 'Prefix test', f'Content with {word.upper()}')
+
+    data = search(client, word[:-3])
+    assert note_id in [note['id'] for note in data]
+
+def test_search_index_follows_updates_and_deletes(client):
+    """Test that the index stays in sync with updates and deletes"""
+    old_word, new_word = unique_word(), unique_word()
+    note_id = create(client, 'Sync test', f'Contains {old_word}')
+
+    client.put(f'/notes/{note_id}',
+               data=json.dumps({'title': 'Sync test', 'content': f'Contains {new_word}', 'tags': []}),
+               content_type='application/json')
+    assert search(client, old_word) == []
+    assert [note['id'] for note in search(client, new_word)] == [note_id]
+
+    client.delete(f'/notes/{note_id}')
+    assert search(client, new_word) == []
@@ -0,0 +1,95 @@
+import pytest
+import json
+import uuid
+from app import app, semantic_index
+from models import NoteEmbedding, SessionLocal
+from src.embeddings import HashingEmbedder, decode_vector, encode_vector
+from src.vector_index import search_without_index
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def create(client, title, content, tags=()):
+    response = client.post('/notes', data=json.dumps({'title': title, 'content': content, 'tags': list(tags)}),
+                           content_type='application/json')
+    return json.loads(response.data)
+
+def stored_embedding(note_id):
+    with SessionLocal() as db:
+        return db.get(NoteEmbedding, note_id)
+
+def search(client, query, limit=5):
+    return json.loads(client.get(f'/notes/semantic-search?q={query}&limit={limit}').data)
+
+def test_embeddings_follow_note_writes(client):
+    """Test that vectors are stored on create, replaced when the text changes and dropped on delete"""
+    note = create(client, 'Embedding lifecycle', 'first text')
+    embedding = stored_embedding(note['id'])
+    assert embedding is not None and len(embedding.vector) == 4 * 256
+
+    client.patch(f"/notes/{note['id']}", data=json.dumps({'tags': ['only-tags']}), content_type='application/json')
+    assert stored_embedding(note['id']).text_hash == embedding.text_hash
+
+    client.patch(f"/notes/{note['id']}", data=json.dumps({'content': 'second text'}), content_type='application/json')
+    assert stored_embedding(note['id']).text_hash != embedding.text_hash
+
+    client.delete(f"/notes/{note['id']}")
+    assert stored_embedding(note['id']) is None
+
+def test_finds_differently_phrased_notes(client):
+    """Test that related word forms rank a note above an unrelated one, with a cosine score"""
+    # Fixed texts: the hashing embedder is deterministic, so no random token can collide with the query
+    target = create(client, 'Quarterly planning meeting', 'Discuss the roadmap and hiring')
+    unrelated = create(client, 'Groceries', 'Milk, eggs and coffee beans')
+    try:
+        results = search(client, 'meetings about the roadmap', limit=100)
+        # Other notes in the shared database may rank anywhere; only the order of these two is checked
+        ours = [result for result in results if result['id'] in (target['id'], unrelated['id'])]
+        assert ours[0]['id'] == target['id']
+        assert 0 < ours[0]['score'] <= 1
+        assert ours[0]['title'] == target['title'] and 'tags' in ours[0]
+        assert all(result['score'] < ours[0]['score'] for result in ours[1:])
+    finally:
+        client.delete(f"/notes/{target['id']}")
+        client.delete(f"/notes/{unrelated['id']}")
+    assert search(client, '') == []
+
+def test_index_follows_changes(client):
+    """Test that notes written or deleted after the index loaded are picked up"""
+    search(client, 'warm up the index')
+    marker = uuid.uuid4().hex[:10]
+    note = create(client, f'Volcano trip {marker}', 'Hiking the crater rim')
+    assert search(client, f'volcano {marker}')[0]['id'] == note['id']
+
+    client.patch(f"/notes/{note['id']}", data=json.dumps({'title': 'Beach day', 'content': 'Sand'}),
+                 content_type='application/json')
+    assert note['id'] not in [result['id'] for result in search(client, f'volcano {marker}')]
+
+    client.delete(f"/notes/{note['id']}")
+    assert note['id'] not in [result['id'] for result in search(client, 'beach day sand', limit=50)]
+
+def test_fallback_matches_index(client):
+    """Test that the pure-Python scan ranks like the NumPy index, equal scores by note id"""
+    if semantic_index is None:
+        pytest.skip('numpy not installed')
+    marker = uuid.uuid4().hex[:10]
+    # Two notes with the same text score the same; no earlier run used these words
+    twins = [create(client, f'Fallback check {marker}', f'Compare search paths {marker}')['id'] for _ in range(2)]
+    indexed = semantic_index.search(f'fallback {marker}', 3)
+    with SessionLocal() as db:
+        scanned = search_without_index(db, NoteEmbedding.__table__, f'fallback {marker}', 3)
+    assert [note_id for note_id, _ in indexed][:2] == sorted(twins)
+    assert [note_id for note_id, _ in scanned] == [note_id for note_id, _ in indexed]
+    assert [score for _, score in scanned] == pytest.approx([score for _, score in indexed], abs=1e-3)
+
+def test_hashing_embedder():
+    """Test that vectors are deterministic, unit length and survive the float32 blob round trip"""
+    embedder = HashingEmbedder(64)
+    first, second = embedder.embed(['The team meeting', 'The team meeting'])
+    assert first == second
+    assert sum(value * value for value in first) == pytest.approx(1.0)
+    assert list(decode_vector(encode_vector(first))) == pytest.approx(first, abs=1e-6)
+    assert embedder.embed(['the and of'])[0] == [0.0] * 64
@@ -0,0 +1,52 @@
+import pytest
+import json
+import uuid
+from datetime import date, datetime, time
+from app import app
+from models import note_row_to_dict
+from src.serialization import encode_note_rows
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+FIELDS = ['id', 'title', 'tags', 'eventDate', 'eventTime', 'updatedAt']
+
+def test_encoded_rows_match_note_row_to_dict():
+    """Test that the fast encoder produces the same notes as note_row_to_dict"""
+    rows = [
+        (1, 'Grüße "quoted"', '["work", "home"]', date(2024, 5, 1), time(9, 30), datetime(2024, 5, 1, 8, 0, 0, 123456)),
+        (2, 'no tags', None, None, None, datetime(2024, 5, 2)),
+        (3, 'empty', '[]', None, None, datetime(2024, 5, 3)),
+    ]
+    assert json.loads(encode_note_rows(rows, FIELDS)) == [note_row_to_dict(row, FIELDS) for row in rows]
+    assert json.loads(encode_note_rows([], FIELDS)) == []
+
+def test_encoded_rows_projection():
+    """Test projections with tags only, without tags, and with extra trailing sort columns"""
+    row = ('["a"]', 'title', datetime(2024, 1, 1), 7)
+    assert json.loads(encode_note_rows([row], ['tags'])) == [{'tags': ['a']}]
+    assert json.loads(encode_note_rows([row[1:]], ['title'])) == [{'title': 'title'}]
+
+def test_legacy_tag_values():
+    """Test that tags that are not a JSON array encode as an empty list"""
+    assert json.loads(encode_note_rows([(1, 'not json')], ['id', 'tags'])) == [{'id': 1, 'tags': []}]
+
+def test_list_response_is_fast_path_json(client):
+    """Test that GET /notes still returns the note shape with ISO dates"""
+    title = f'fast {uuid.uuid4().hex}'
+    client.post('/notes', data=json.dumps({'title': title, 'content': 'x', 'tags': ['fast']}),
+                content_type='application/json')
+    response = client.get('/notes?limit=5')
+    assert response.mimetype == 'application/json'
+    note = next(note for note in json.loads(response.data) if note['title'] == title)
+    assert note['tags'] == ['fast']
+    assert datetime.fromisoformat(note['updatedAt'])
+
+def test_jsonify_uses_iso_dates():
+    """Test that the app's JSON provider writes dates as ISO 8601, not HTTP dates"""
+    with app.app_context():
+        body = app.json.dumps({'b': datetime(2024, 1, 2, 3, 4, 5), 'a': date(2024, 1, 2)})
+    assert json.loads(body) == {'a': '2024-01-02', 'b': '2024-01-02T03:04:05'}
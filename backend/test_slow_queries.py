@@ -0,0 +1,63 @@
+import pytest
+import json
+import app as app_module
+from sqlalchemy import create_engine, text
+from app import app
+from models import get_engine
+from src.slow_queries import SlowQueryLog
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_slow_statements_are_logged_with_plans(tmp_path):
+    """Test that statements over the threshold are written with redacted parameters and a plan"""
+    log_file = tmp_path / 'slow.log'
+    log = SlowQueryLog(threshold_ms=0, log_file=str(log_file))
+    db = create_engine('sqlite://')
+    log.install(db)
+    with db.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (name) VALUES (:name)"), [{'name': 'a'}, {'name': 'b'}])
+        conn.execute(text("SELECT * FROM items WHERE name = :name"), {'name': 'secret-value'}).all()
+        conn.execute(text("SELECT * FROM items WHERE id = :id"), {'id': 1}).all()
+
+    by_id, by_name, insert = log.recent()[:3]
+    assert by_name['statement'] == 'SELECT * FROM items WHERE name = ?'
+    assert by_name['parameters'] == ['str']
+    assert by_name['fullScan'] is True
+    assert by_id['fullScan'] is False
+    assert insert['executemany'] == 2
+
+    records = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [record['statement'] for record in records][-3:] == [insert['statement'], by_name['statement'],
+                                                                by_id['statement']]
+    assert 'secret-value' not in log_file.read_text()
+
+def test_fast_statements_are_ignored():
+    """Test that statements under the threshold are not recorded"""
+    log = SlowQueryLog(threshold_ms=10_000)
+    db = create_engine('sqlite://')
+    log.install(db)
+    with db.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert log.recent() == []
+
+def test_debug_endpoint(client, monkeypatch):
+    """Test that the endpoint lists recent slow statements with the route that ran them"""
+    assert json.loads(client.get('/debug/slow-queries').data) == {'enabled': False}
+
+    log = SlowQueryLog(threshold_ms=0)
+    monkeypatch.setattr(app_module, 'slow_query_log', log)
+    log.install(get_engine())
+    try:
+        client.get('/notes?limit=5')
+    finally:
+        log.uninstall(get_engine())
+    data = json.loads(client.get('/debug/slow-queries').data)
+    assert data['enabled'] is True and data['thresholdMs'] == 0
+    assert data['queries']
+    assert all(query['route'] == 'GET /notes' for query in data['queries'])
+    assert all('plan' in query or 'planError' in query for query in data['queries'])
@@ -0,0 +1,83 @@
+import pytest
+import json
+from app import app
+from src import llm
+from src.llm import reset_llm_client
+from src.json_stream import JSONFieldStreamer
+from stub_llm_server import parse_sse
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+@pytest.fixture
+def stub_options():
+    reply = json.dumps({'title': 'Hola "Mundo"', 'content': 'Línea uno\nLínea dos', 'tags': ['a'],
+                        'event_date': None, 'event_time': None})
+    return {'reply': lambda messages: reply, 'chunk_size': 3}
+
+def test_streamer_handles_arbitrary_chunking():
+    """Test that fields decode the same however the JSON is split"""
+    document = json.dumps({'title': 'Café \U0001F600', 'content': 'a\\"b\nc', 'tags': ['x', '}'], 'n': None})
+    for size in range(1, 8):
+        streamer = JSONFieldStreamer()
+        fields = {}
+        for start in range(0, len(document), size):
+            for key, delta, complete in streamer.feed(document[start:start + size]):
+                fields[key] = fields.get(key, '') + delta
+        assert fields == {'title': 'Café \U0001F600', 'content': 'a\\"b\nc'}
+        assert streamer.done
+
+def test_streamer_reports_title_before_content():
+    """Test that the title completes before any content arrives"""
+    streamer = JSONFieldStreamer()
+    events = streamer.feed('```json\n{"title": "Hi", "content": "Hel')
+    assert events == [('title', 'Hi', True), ('content', 'Hel', False)]
+    assert streamer.feed('lo"}') == [('content', 'lo', True)]
+
+def test_translate_stream(client, stub):
+    """Test that /translate/stream emits title, content deltas and a final result"""
+    response = client.post('/translate/stream',
+                          data=json.dumps({'content': 'Hello', 'targetLang': 'es'}),
+                          content_type='application/json')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    events = parse_sse(response.data)
+
+    assert events[0] == ('title', {'title': 'Hola "Mundo"'})
+    deltas = [data['delta'] for event, data in events if event == 'content']
+    assert len(deltas) > 1
+    assert ''.join(deltas) == 'Línea uno\nLínea dos'
+    assert events[-1] == ('done', {'title': 'Hola "Mundo"', 'content': 'Línea uno\nLínea dos'})
+
+def test_generate_note_stream_saves_note(client, stub):
+    """Test that the streamed note is saved and returned in the done event"""
+    response = client.post('/generate-note/stream',
+                          data=json.dumps({'input': 'Lunch with Ana'}),
+                          content_type='application/json')
+    event, note = parse_sse(response.data)[-1]
+    assert event == 'done'
+    assert note['title'] == 'Hola "Mundo"'
+    assert note['tags'] == ['a']
+
+    saved = json.loads(client.get(f"/notes/{note['id']}").data)
+    assert saved['content'] == 'Línea uno\nLínea dos'
+
+def test_stream_errors_become_events(client, monkeypatch):
+    """Test that model failures are reported in-band"""
+    monkeypatch.setenv('GITHUB_TOKEN', 'stub-token')
+    monkeypatch.setenv('LLM_ENDPOINT', 'http://127.0.0.1:9')
+    monkeypatch.setattr(llm, '_response_cache', None)
+    monkeypatch.setattr(llm, '_sleep', lambda seconds: None)
+    reset_llm_client()
+    try:
+        response = client.post('/translate/stream',
+                              data=json.dumps({'content': 'Hello', 'targetLang': 'es'}),
+                              content_type='application/json')
+    finally:
+        reset_llm_client()
+    event, data = parse_sse(response.data)[-1]
+    assert event == 'error'
+    assert 'API call failed' in data['error']
@@ -0,0 +1,74 @@
+import pytest
+import json
+import uuid
+from sqlalchemy import create_engine, insert, select
+from app import app
+from models import Base, Note, NoteTag, Tag, migrate_tags
+from src.tags import normalize_tags
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def create(client, title, tags):
+    response = client.post('/notes', data=json.dumps({'title': title, 'content': 'x', 'tags': tags}),
+                           content_type='application/json')
+    return json.loads(response.data)
+
+def titles(client, query):
+    return sorted(note['title'] for note in json.loads(client.get(f'/notes?{query}').data))
+
+def test_normalize_tags():
+    """Test that tags are trimmed, de-duplicated and stripped of non-strings"""
+    assert normalize_tags([' a ', 'b', 'a', '', 3, None, 'b ']) == ['a', 'b']
+
+def test_tag_filter_follows_writes(client):
+    """Test that ?tag= filters in SQL and tracks creates, updates and deletes"""
+    red, blue = f'red-{uuid.uuid4().hex[:8]}', f'blue-{uuid.uuid4().hex[:8]}'
+    both = create(client, 'both', [red, blue, red])
+    only_red = create(client, 'red', [red])
+    create(client, 'blue', [blue])
+
+    assert both['tags'] == [red, blue]
+    assert titles(client, f'tag={red}') == ['both', 'red']
+    assert titles(client, f'tag={red}&tag={blue}') == ['both']
+    assert titles(client, f'tag={red}&limit=1&fields=id,title') == ['red']
+
+    client.put(f"/notes/{only_red['id']}", data=json.dumps({'title': 'red', 'content': 'x', 'tags': [blue]}),
+               content_type='application/json')
+    client.delete(f"/notes/{both['id']}")
+    assert titles(client, f'tag={red}') == []
+    assert titles(client, f'tag={blue}') == ['blue', 'red']
+
+def test_tag_counts(client):
+    """Test that /tags aggregates counts per tag"""
+    tag = f'count-{uuid.uuid4().hex[:8]}'
+    for i in range(3):
+        create(client, f'counted {i}', [tag])
+    counts = {item['name']: item['count'] for item in json.loads(client.get('/tags').data)}
+    assert counts[tag] == 3
+
+def test_import_indexes_tags(client):
+    """Test that bulk-imported notes are reachable through the tag filter"""
+    tag = f'imported-{uuid.uuid4().hex[:8]}'
+    body = '\n'.join(json.dumps({'title': f'imp {i}', 'content': 'x', 'tags': [tag]}) for i in range(5))
+    client.post('/notes/import', data=body, content_type='application/x-ndjson')
+    assert len(titles(client, f'tag={tag}')) == 5
+
+def test_migrate_tags_backfills_existing_notes(tmp_path):
+    """Test that databases with only the JSON column get their tag links backfilled"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Note.__table__), [
+            {'title': 'a', 'content': 'x', 'tags': '["work", "home"]'},
+            {'title': 'b', 'content': 'x', 'tags': '["work"]'},
+            {'title': 'c', 'content': 'x', 'tags': 'not json'},
+        ])
+    assert migrate_tags(engine) == 3
+    assert migrate_tags(engine) == 0
+    with engine.connect() as conn:
+        links = conn.execute(select(Tag.name, NoteTag.note_id).join(NoteTag, NoteTag.tag_id == Tag.id)).all()
+    assert sorted(links) == [('home', 1), ('work', 1), ('work', 2)]
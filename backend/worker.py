@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Background worker for queued LLM jobs (POST /jobs).
+Claims jobs from the jobs table and runs them on a bounded thread pool, so at
+most --concurrency model calls are in flight per worker process.
+
+Usage:
+    python worker.py                    # run until interrupted
+    python worker.py --concurrency 8
+    python worker.py --once             # drain runnable jobs and exit
+"""
+
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from models import Job, Note, SessionLocal
+from src import jobs
+from src.llm import generate_structured_notes, translate_text
+
+CONCURRENCY = int(os.getenv('JOB_WORKER_CONCURRENCY', 4))
+POLL_INTERVAL_SECONDS = float(os.getenv('JOB_POLL_INTERVAL_SECONDS', 1.0))
+
+logger = logging.getLogger('notes.worker')
+
+
+def handle_generate_note(payload, session_factory):
+    """Generate a note; it is saved together with the job's completion, so a lost lease saves nothing"""
+    generated = generate_structured_notes(payload['input'], payload.get('language', 'en'))
+
+    def save(db):
+        note = Note.from_generated(generated)
+        db.add(note)
+        db.flush()
+        return note.to_dict()
+
+    return jobs.SaveOnComplete(save)
+
+
+def handle_translate_note(payload, session_factory):
+    db = session_factory()
+    try:
+        note = db.get(Note, payload['noteId'])
+        if note is None:
+            raise jobs.JobFailed('Note not found')
+        text, title, cache_scope = note.content, note.title, f"note:{note.id}@{note.updated_at.isoformat()}"
+    finally:
+        db.close()
+
+    translated = translate_text(
+        text=text,
+        target_language=payload['targetLang'],
+        title=title,
+        cache_scope=cache_scope
+    )
+    return {
+        'title': translated['title'],
+        'content': translated['content'],
+        'originalId': payload['noteId']
+    }
+
+
+HANDLERS = {
+    'generate_note': handle_generate_note,
+    'translate_note': handle_translate_note,
+}
+
+
+class Worker:
+    def __init__(self, session_factory=None, handlers=None, concurrency=CONCURRENCY,
+                 poll_interval=POLL_INTERVAL_SECONDS, worker_id=None):
+        self.session_factory = session_factory or SessionLocal
+        self.handlers = handlers or HANDLERS
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def _claim(self):
+        db = self.session_factory()
+        try:
+            job = jobs.claim_next(db, Job, self.worker_id, kinds=self.handlers.keys())
+            return None if job is None else (job.id, job.kind, job.to_dict()['payload'])
+        finally:
+            db.close()
+
+    def _requeue_stale(self):
+        db = self.session_factory()
+        try:
+            return jobs.requeue_stale(db, Job)
+        finally:
+            db.close()
+
+    def _run(self, job_id, kind, payload):
+        # No session is held while the handler waits on the model
+        try:
+            result = self.handlers[kind](payload, self.session_factory)
+            outcome = (jobs.complete, (result,))
+        except jobs.JobFailed as e:
+            outcome = (jobs.fail, (str(e), False))
+        except Exception as e:
+            outcome = (jobs.fail, (str(e), True))
+
+        update, args = outcome
+        db = self.session_factory()
+        try:
+            if not update(db, Job, job_id, self.worker_id, *args):
+                logger.warning('Lost the lease on job %s, its outcome was dropped', job_id)
+        finally:
+            db.close()
+
+    def run(self, drain=False):
+        """
+        Process jobs until stop() is called, or with drain=True until no
+        runnable job is left. Returns the number of jobs processed.
+        """
+        processed = 0
+        in_flight = {}  # future -> job id
+        last_sweep = 0.0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='job') as executor:
+            while not self._stop.is_set():
+                # Database errors (a locked SQLite file, a dropped connection) are
+                # logged and retried on the next poll rather than ending the loop
+                if time.monotonic() - last_sweep > jobs.LEASE_SECONDS / 2:
+                    try:
+                        self._requeue_stale()
+                    except Exception:
+                        logger.exception('Requeueing stale jobs failed')
+                    last_sweep = time.monotonic()
+
+                claim_failed = False
+                while len(in_flight) < self.concurrency:
+                    try:
+                        claimed = self._claim()
+                    except Exception:
+                        logger.exception('Claiming a job failed')
+                        claim_failed = True
+                        break
+                    if claimed is None:
+                        break
+                    in_flight[executor.submit(self._run, *claimed)] = claimed[0]
+                    processed += 1
+
+                if not in_flight:
+                    if drain and not claim_failed:
+                        break
+                    self._stop.wait(self.poll_interval)
+                    continue
+
+                finished, _ = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job_id = in_flight.pop(future)
+                    try:
+                        future.result()
+                    except Exception:
+                        # The job keeps its lease and is requeued once it expires
+                        logger.exception('Recording the outcome of job %s failed', job_id)
+        return processed
+
+    def start_in_thread(self):
+        thread = threading.Thread(target=self.run, name='job-worker', daemon=True)
+        thread.start()
+        return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL_SECONDS)
+    parser.add_argument('--once', action='store_true', help='drain runnable jobs and exit')
+    args = parser.parse_args()
+
+    if SessionLocal is None:
+        print("❌ Database not available, cannot process jobs")
+        return
+
+    worker = Worker(concurrency=args.concurrency, poll_interval=args.poll_interval)
+    print(f"👷 Worker {worker.worker_id} processing jobs (concurrency {worker.concurrency})")
+    try:
+        processed = worker.run(drain=args.once)
+        print(f"✅ Processed {processed} jobs")
+    except KeyboardInterrupt:
+        worker.stop()
+        print("👋 Worker stopped")
+
+
+if __name__ == '__main__':
+    main()
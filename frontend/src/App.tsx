@@ -1,29 +1,45 @@
-import React, { useState, useEffect, useCallback } from 'react';
-import { Note, CreateNoteRequest, UpdateNoteRequest } from './types/Note';
-import { apiService } from './services/api';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
+import { Note, NoteSummary, NoteChanges, CreateNoteRequest, UpdateNoteRequest } from './types/Note';
+import { apiService, ApiError } from './services/api';
 import NoteList from './components/NoteList';
 import NoteEditor from './components/NoteEditor';
 import SearchBar from './components/SearchBar';
 import GenerateNoteModal from './components/GenerateNoteModal';
 import './App.css';
 
+const SYNC_INTERVAL_MS = 30000;
+
+// Put changed notes first (they are the most recently edited) and drop deleted ones
+const applyChanges = (notes: NoteSummary[], changes: NoteChanges): NoteSummary[] => {
+  if (changes.notes.length === 0 && changes.deleted.length === 0) return notes;
+  const removed = new Set([...changes.deleted, ...changes.notes.map(note => note.id)]);
+  const changed = [...changes.notes].reverse();
+  return [...changed, ...notes.filter(note => !removed.has(note.id))];
+};
+
 function App() {
-  const [notes, setNotes] = useState<Note[]>([]);
-  const [filteredNotes, setFilteredNotes] = useState<Note[]>([]);
+  const [notes, setNotes] = useState<NoteSummary[]>([]);
+  const [filteredNotes, setFilteredNotes] = useState<NoteSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [selectedNote, setSelectedNote] = useState<Note | null>(null);
   const [searchQuery, setSearchQuery] = useState('');
   const [isLoading, setIsLoading] = useState(true);
   const [isSaving, setIsSaving] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [isGenerateModalOpen, setIsGenerateModalOpen] = useState(false);
+  // Position in the server's change feed that `notes` reflects
+  const changeCursor = useRef<string | null>(null);
 
   const loadNotes = async () => {
     try {
       setIsLoading(true);
       setError(null);
-      const fetchedNotes = await apiService.getNotes();
-      setNotes(fetchedNotes);
-      setFilteredNotes(fetchedNotes);
+      const page = await apiService.getNotesPage();
+      setNotes(page.notes);
+      setFilteredNotes(page.notes);
+      setNextCursor(page.nextCursor);
+      changeCursor.current = page.changeCursor;
     } catch (err) {
       setError('Failed to load notes. Please check if the backend is running.');
       console.error('Error loading notes:', err);
@@ -32,6 +48,42 @@ function App() {
     }
   };
 
+  const loadMoreNotes = async () => {
+    if (!nextCursor || isLoadingMore) return;
+    try {
+      setIsLoadingMore(true);
+      const page = await apiService.getNotesPage({ cursor: nextCursor });
+      setNotes(prevNotes => {
+        const loadedIds = new Set(prevNotes.map(note => note.id));
+        return [...prevNotes, ...page.notes.filter(note => !loadedIds.has(note.id))];
+      });
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Error loading more notes:', err);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
+  // Pull writes made elsewhere (other tabs, devices, background jobs) as deltas
+  const syncChanges = useCallback(async () => {
+    const since = changeCursor.current;
+    if (since === null) return;
+    try {
+      let changes = await apiService.getChanges(since);
+      while (true) {
+        const delta = changes;
+        setNotes(prevNotes => applyChanges(prevNotes, delta));
+        setSelectedNote(prevNote => prevNote && delta.deleted.includes(prevNote.id) ? null : prevNote);
+        changeCursor.current = delta.cursor;
+        if (!delta.hasMore) break;
+        changes = await apiService.getChanges(delta.cursor);
+      }
+    } catch (err) {
+      console.error('Error syncing notes:', err);
+    }
+  }, []);
+
   const searchNotes = useCallback(async (query: string) => {
     try {
       const searchResults = await apiService.searchNotes(query);
@@ -41,7 +93,7 @@ function App() {
       // Fallback to client-side filtering
       const filtered = notes.filter(note =>
         note.title.toLowerCase().includes(query.toLowerCase()) ||
-        note.content.toLowerCase().includes(query.toLowerCase())
+        (note.content ?? note.preview ?? '').toLowerCase().includes(query.toLowerCase())
       );
       setFilteredNotes(filtered);
     }
@@ -52,6 +104,16 @@ function App() {
     loadNotes();
   }, []);
 
+  // Sync when the window regains focus and periodically while it is open
+  useEffect(() => {
+    window.addEventListener('focus', syncChanges);
+    const timer = window.setInterval(syncChanges, SYNC_INTERVAL_MS);
+    return () => {
+      window.removeEventListener('focus', syncChanges);
+      window.clearInterval(timer);
+    };
+  }, [syncChanges]);
+
   // Filter notes based on search query
   useEffect(() => {
     if (searchQuery.trim()) {
@@ -61,8 +123,16 @@ function App() {
     }
   }, [searchQuery, notes, searchNotes]);
 
-  const handleSelectNote = (note: Note) => {
-    setSelectedNote(note);
+  const handleSelectNote = async (note: NoteSummary) => {
+    // List items are projected without content, so load the full note
+    try {
+      setError(null);
+      const fullNote = await apiService.getNote(note.id);
+      setSelectedNote(fullNote);
+    } catch (err) {
+      setError('Failed to load note. Please try again.');
+      console.error('Error loading note:', err);
+    }
   };
 
   const handleSaveNote = async (noteData: CreateNoteRequest | UpdateNoteRequest) => {
@@ -73,7 +143,7 @@ function App() {
       let savedNote: Note;
       if (selectedNote) {
         // Update existing note
-        savedNote = await apiService.updateNote(selectedNote.id, noteData);
+        savedNote = await apiService.updateNote(selectedNote.id, { ...noteData, version: selectedNote.version });
         setNotes(prevNotes =>
           prevNotes.map(note => note.id === selectedNote.id ? savedNote : note)
         );
@@ -85,7 +155,15 @@ function App() {
         setSelectedNote(savedNote);
       }
     } catch (err) {
-      setError('Failed to save note. Please try again.');
+      if (err instanceof ApiError && err.status === 409 && selectedNote) {
+        // Edited elsewhere since it was opened: show the latest version instead of overwriting it
+        setError('This note was changed in another tab or device. The latest version has been loaded.');
+        apiService.getNote(selectedNote.id).then(setSelectedNote, reloadErr => {
+          console.error('Error reloading note:', reloadErr);
+        });
+      } else {
+        setError('Failed to save note. Please try again.');
+      }
       console.error('Error saving note:', err);
     } finally {
       setIsSaving(false);
@@ -162,6 +240,9 @@ function App() {
           selectedNoteId={selectedNote?.id || null}
           onSelectNote={handleSelectNote}
           onDeleteNote={handleDeleteNote}
+          hasMore={!searchQuery.trim() && nextCursor !== null}
+          isLoadingMore={isLoadingMore}
+          onLoadMore={loadMoreNotes}
         />
       </div>
       <div className="main-content">
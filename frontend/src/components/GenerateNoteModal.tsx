@@ -26,17 +26,24 @@ const GenerateNoteModal: React.FC<GenerateNoteModalProps> = ({ isOpen, onClose,
   const [input, setInput] = useState('');
   const [language, setLanguage] = useState('en');
   const [isGenerating, setIsGenerating] = useState(false);
+  const [previewTitle, setPreviewTitle] = useState('');
+  const [previewContent, setPreviewContent] = useState('');
 
   const handleGenerate = async () => {
     if (!input.trim()) return;
 
     setIsGenerating(true);
+    setPreviewTitle('');
+    setPreviewContent('');
     try {
       const request: GenerateNoteRequest = { 
         input: input.trim(), 
         language 
       };
-      const note = await apiService.generateNote(request);
+      const note = await apiService.generateNoteStream(request, {
+        onTitle: setPreviewTitle,
+        onContent: (delta) => setPreviewContent(prev => prev + delta),
+      });
       onNoteGenerated(note);
       setInput('');
       onClose();
@@ -45,6 +52,8 @@ const GenerateNoteModal: React.FC<GenerateNoteModalProps> = ({ isOpen, onClose,
       alert('Note generation failed. Please try again.');
     } finally {
       setIsGenerating(false);
+      setPreviewTitle('');
+      setPreviewContent('');
     }
   };
 
@@ -99,6 +108,13 @@ const GenerateNoteModal: React.FC<GenerateNoteModalProps> = ({ isOpen, onClose,
               rows={4}
             />
           </div>
+
+          {isGenerating && (previewTitle || previewContent) && (
+            <div className="generate-preview">
+              {previewTitle && <h4>{previewTitle}</h4>}
+              <p>{previewContent}</p>
+            </div>
+          )}
         </div>
         
         <div className="modal-footer">
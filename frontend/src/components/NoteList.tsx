@@ -1,15 +1,29 @@
 import React from 'react';
-import { Note } from '../types/Note';
+import { NoteSummary } from '../types/Note';
 import './NoteList.css';
 
 interface NoteListProps {
-  notes: Note[];
+  notes: NoteSummary[];
   selectedNoteId: number | null;
-  onSelectNote: (note: Note) => void;
+  onSelectNote: (note: NoteSummary) => void;
   onDeleteNote: (id: number) => void;
+  hasMore?: boolean;
+  isLoadingMore?: boolean;
+  onLoadMore?: () => void;
 }
 
-const NoteList: React.FC<NoteListProps> = ({ notes, selectedNoteId, onSelectNote, onDeleteNote }) => {
+// Start fetching the next page this many pixels before the end of the list
+const LOAD_MORE_THRESHOLD = 200;
+
+const NoteList: React.FC<NoteListProps> = ({
+  notes,
+  selectedNoteId,
+  onSelectNote,
+  onDeleteNote,
+  hasMore = false,
+  isLoadingMore = false,
+  onLoadMore
+}) => {
   const formatDate = (dateString: string) => {
     return new Date(dateString).toLocaleDateString('en-US', {
       month: 'short',
@@ -19,12 +33,21 @@ const NoteList: React.FC<NoteListProps> = ({ notes, selectedNoteId, onSelectNote
     });
   };
 
+  const handleScroll = (e: React.UIEvent<HTMLDivElement>) => {
+    const { scrollTop, scrollHeight, clientHeight } = e.currentTarget;
+    if (hasMore && !isLoadingMore && onLoadMore && scrollHeight - scrollTop - clientHeight < LOAD_MORE_THRESHOLD) {
+      onLoadMore();
+    }
+  };
+
+  const previewText = (note: NoteSummary) => note.preview ?? note.content ?? '';
+
   return (
     <div className="note-list">
       <div className="note-list-header">
-        <h2>Notes ({notes.length})</h2>
+        <h2>Notes ({notes.length}{hasMore ? '+' : ''})</h2>
       </div>
-      <div className="note-list-content">
+      <div className="note-list-content" onScroll={handleScroll}>
         {notes.length === 0 ? (
           <div className="empty-state">
             <p>No notes yet. Create your first note!</p>
@@ -50,8 +73,8 @@ const NoteList: React.FC<NoteListProps> = ({ notes, selectedNoteId, onSelectNote
                 </button>
               </div>
               <p className="note-preview">
-                {note.content.substring(0, 100)}
-                {note.content.length > 100 && '...'}
+                {previewText(note).substring(0, 100)}
+                {previewText(note).length >= 100 && '...'}
               </p>
               <div className="note-meta">
                 <span className="note-date">{formatDate(note.updatedAt)}</span>
@@ -66,6 +89,13 @@ const NoteList: React.FC<NoteListProps> = ({ notes, selectedNoteId, onSelectNote
             </div>
           ))
         )}
+        {hasMore && (
+          <div className="load-more">
+            <button onClick={onLoadMore} disabled={isLoadingMore}>
+              {isLoadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
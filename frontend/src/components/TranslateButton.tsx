@@ -31,11 +31,23 @@ const TranslateButton: React.FC<TranslateButtonProps> = ({ noteId, onTranslate,
     if (!selectedLanguage) return;
 
     setIsTranslating(true);
+    // Close the picker right away so the translation can be watched as it streams in
+    setIsOpen(false);
     try {
       const request: TranslateRequest = { targetLang: selectedLanguage };
-      const response = await apiService.translateNote(noteId, request);
+      let title = '';
+      let content = '';
+      const response = await apiService.translateNoteStream(noteId, request, {
+        onTitle: (translatedTitle) => {
+          title = translatedTitle;
+          onTranslate(title, content);
+        },
+        onContent: (delta) => {
+          content += delta;
+          onTranslate(title, content);
+        },
+      });
       onTranslate(response.title, response.content);
-      setIsOpen(false);
     } catch (error) {
       console.error('Translation failed:', error);
       alert('Translation failed. Please try again.');
@@ -1,29 +1,167 @@
-import { Note, CreateNoteRequest, UpdateNoteRequest, TranslateRequest, TranslateResponse, GenerateNoteRequest } from '../types/Note';
+import { Note, NotePage, NoteChanges, NoteListParams, NoteStreamHandlers, TagCount, CreateNoteRequest, UpdateNoteRequest, TranslateRequest, TranslateResponse, GenerateNoteRequest } from '../types/Note';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || '/api';
 
+export const NOTE_PAGE_SIZE = 50;
+export const NOTE_LIST_FIELDS = ['id', 'title', 'preview', 'tags', 'updatedAt'];
+const ETAG_CACHE_ENTRIES = 100;
+
+export class ApiError extends Error {
+  constructor(public status: number) {
+    super(`HTTP error! status: ${status}`);
+  }
+}
+
+interface CachedResponse {
+  etag: string;
+  body: string;
+  headers: Headers;
+}
+
 class ApiService {
   private async request<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
+    const response = await this.fetchResponse(endpoint, options);
+    return response.json();
+  }
+
+  // GET responses that carried an ETag, replayed when the server answers 304
+  private etagCache = new Map<string, CachedResponse>();
+
+  private async fetchResponse(endpoint: string, options: RequestInit = {}): Promise<Response> {
     const url = `${API_BASE_URL}${endpoint}`;
+    const isGet = !options.method || options.method.toUpperCase() === 'GET';
+    const cached = isGet ? this.etagCache.get(url) : undefined;
     const response = await fetch(url, {
+      ...options,
       headers: {
         'Content-Type': 'application/json',
+        ...(cached ? { 'If-None-Match': cached.etag } : {}),
         ...options.headers,
       },
-      ...options,
     });
 
+    if (response.status === 304 && cached) {
+      return new Response(cached.body, { status: 200, headers: cached.headers });
+    }
+
     if (!response.ok) {
-      throw new Error(`HTTP error! status: ${response.status}`);
+      throw new ApiError(response.status);
     }
 
-    return response.json();
+    const etag = response.headers.get('ETag');
+    if (isGet && etag) {
+      void this.rememberResponse(url, etag, response.clone());
+    }
+
+    return response;
+  }
+
+  private async rememberResponse(url: string, etag: string, response: Response): Promise<void> {
+    const body = await response.text();
+    this.etagCache.delete(url);
+    this.etagCache.set(url, { etag, body, headers: response.headers });
+    // Evict the least recently stored entry
+    if (this.etagCache.size > ETAG_CACHE_ENTRIES) {
+      const oldest = this.etagCache.keys().next().value;
+      if (oldest !== undefined) {
+        this.etagCache.delete(oldest);
+      }
+    }
+  }
+
+  // POSTs to a Server-Sent Events endpoint, forwarding title/content events
+  // as they arrive and resolving with the payload of the final `done` event
+  private async streamEvents<T>(endpoint: string, body: unknown, handlers: NoteStreamHandlers): Promise<T> {
+    const response = await this.fetchResponse(endpoint, {
+      method: 'POST',
+      body: JSON.stringify(body),
+      headers: { Accept: 'text/event-stream' },
+    });
+    if (!response.body) {
+      throw new Error('Streaming is not supported by this browser');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let result: T | null = null;
+
+    // Returns the final payload for a `done` event
+    const handleBlock = (block: string): T | undefined => {
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) {
+          event = line.slice(7);
+        } else if (line.startsWith('data: ')) {
+          data += line.slice(6);
+        }
+      }
+      if (!data) return undefined;
+      const payload = JSON.parse(data);
+      switch (event) {
+        case 'title':
+          handlers.onTitle?.(payload.title);
+          break;
+        case 'content':
+          handlers.onContent?.(payload.delta);
+          break;
+        case 'done':
+          return payload as T;
+        case 'error':
+          throw new Error(payload.error);
+      }
+      return undefined;
+    };
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const finished = handleBlock(buffer.slice(0, boundary));
+        if (finished !== undefined) {
+          result = finished;
+        }
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+      }
+    }
+
+    if (result === null) {
+      throw new Error('Stream ended before completion');
+    }
+    return result;
   }
 
   async getNotes(): Promise<Note[]> {
     return this.request<Note[]>('/notes');
   }
 
+  async getNotesPage({ limit = NOTE_PAGE_SIZE, cursor, fields = NOTE_LIST_FIELDS, tags = [] }: NoteListParams = {}): Promise<NotePage> {
+    const params = new URLSearchParams({ limit: String(limit), fields: fields.join(',') });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+    tags.forEach(tag => params.append('tag', tag));
+    const response = await this.fetchResponse(`/notes?${params.toString()}`);
+    return {
+      notes: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor'),
+      changeCursor: response.headers.get('X-Change-Cursor'),
+    };
+  }
+
+  async getChanges(since: string, fields: string[] = NOTE_LIST_FIELDS): Promise<NoteChanges> {
+    const params = new URLSearchParams({ since, fields: fields.join(',') });
+    return this.request<NoteChanges>(`/notes/changes?${params.toString()}`);
+  }
+
+  async getTags(): Promise<TagCount[]> {
+    return this.request<TagCount[]>('/tags');
+  }
+
   async getNote(id: number): Promise<Note> {
     return this.request<Note>(`/notes/${id}`);
   }
@@ -35,9 +173,11 @@ class ApiService {
     });
   }
 
+  // Sends only the given fields; include `version` to fail with a 409 ApiError
+  // instead of overwriting an edit made elsewhere since the note was loaded
   async updateNote(id: number, note: UpdateNoteRequest): Promise<Note> {
     return this.request<Note>(`/notes/${id}`, {
-      method: 'PUT',
+      method: 'PATCH',
       body: JSON.stringify(note),
     });
   }
@@ -72,6 +212,14 @@ class ApiService {
       body: JSON.stringify(request),
     });
   }
+
+  async translateNoteStream(id: number, request: TranslateRequest, handlers: NoteStreamHandlers): Promise<TranslateResponse> {
+    return this.streamEvents<TranslateResponse>(`/notes/${id}/translate/stream`, request, handlers);
+  }
+
+  async generateNoteStream(request: GenerateNoteRequest, handlers: NoteStreamHandlers): Promise<Note> {
+    return this.streamEvents<Note>('/generate-note/stream', request, handlers);
+  }
 }
 
 export const apiService = new ApiService();
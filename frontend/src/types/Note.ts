@@ -6,6 +6,44 @@ export interface Note {
   eventDate?: string;
   eventTime?: string;
   updatedAt: string;
+  // Bumped by every write; sent back on updates to detect concurrent edits
+  version: number;
+}
+
+// List items are fetched with a field projection, so content may be absent
+export interface NoteSummary {
+  id: number;
+  title: string;
+  tags: string[];
+  updatedAt: string;
+  preview?: string;
+  content?: string;
+}
+
+export interface NotePage {
+  notes: NoteSummary[];
+  nextCursor: string | null;
+  // Pass to getChanges() to receive writes made after this page was read
+  changeCursor: string | null;
+}
+
+export interface NoteChanges {
+  notes: NoteSummary[];
+  deleted: number[];
+  cursor: string;
+  hasMore: boolean;
+}
+
+export interface NoteListParams {
+  limit?: number;
+  cursor?: string | null;
+  fields?: string[];
+  tags?: string[];
+}
+
+export interface TagCount {
+  name: string;
+  count: number;
 }
 
 export interface CreateNoteRequest {
@@ -18,8 +56,10 @@ export interface UpdateNoteRequest {
   title?: string;
   content?: string;
   tags?: string[];
-  eventDate?: string;
-  eventTime?: string;
+  eventDate?: string | null;
+  eventTime?: string | null;
+  // The version being edited; a stale one is rejected with 409
+  version?: number;
 }
 
 export interface TranslateRequest {
@@ -36,3 +76,9 @@ export interface GenerateNoteRequest {
   input: string;
   language?: string;
 }
+
+// Callbacks for streamed translate/generate responses
+export interface NoteStreamHandlers {
+  onTitle?: (title: string) => void;
+  onContent?: (delta: string) => void;
+}